@@ -21,7 +21,7 @@ setuptools.setup(
     #  packages=['swat_em'],
     package_data={'swat_em': ['themes/*', 'ui/*', 'ui/icons/*',
                               'ui/bitmaps/*', 'doc', 'doc/*',
-                              'template/*']},
+                              'template/*', 'fonts/*']},
     platforms="any",
     install_requires=['numpy', 'QtPy', 'pyqtgraph', 'xlsxwriter'],
     classifiers=[
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+Provides an asyncio interface for the generation and analysis of
+windings, for example for web services. The CPU bound work is done by a
+pool of worker processes, the event loop only waits for the results:
+
+    from swat_em import aio
+
+    async def main():
+        wdg = await aio.analyse({"Q": 12, "P": 10, "m": 3, "layers": 2})
+        async for row in aio.sweep(range(12, 100, 3), range(2, 40, 2), 3, [2]):
+            print(row["Q"], row["P"], row["kw1"])
+        await aio.shutdown()
+
+A winding is given by the parameters of the winding generator (dict
+with the arguments of datamodel.genwdg) or as datamodel object.
+Identical requests which are running at the same time are analysed
+only once and get the same datamodel object. The analysis results are
+transported by shared memory (see sharedresults).
+"""
+import os
+import copy
+import json
+import signal
+import asyncio
+import collections
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from swat_em import sweep as _sweep
+from swat_em import sharedresults
+from swat_em.config import config
+from swat_em.datamodel import datamodel
+
+# parameters of datamodel.genwdg and their default values
+GENWDG_PARAMETERS = {
+    "Q": None,
+    "P": None,
+    "m": None,
+    "layers": None,
+    "w": -1,
+    "turns": 1,
+    "empty_slots": 0,
+}
+
+
+def _init_worker():
+    """
+    Imports and warms up the analysis in a new worker process
+    """
+    # Ctrl+C is handled by the parent process, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, layers=2, w=1)
+
+
+def _get_spec(spec):
+    """
+    Returns the complete parameters of the winding generator
+    """
+    unknown = set(spec) - set(GENWDG_PARAMETERS)
+    if unknown:
+        raise TypeError("Unknown winding parameters: " + ", ".join(sorted(unknown)))
+    ret = dict(GENWDG_PARAMETERS)
+    ret.update(spec)
+    missing = [k for k, v in ret.items() if v is None]
+    if missing:
+        raise TypeError("Missing winding parameters: " + ", ".join(missing))
+    return ret
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in sorted(value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    elif hasattr(value, "tolist"):
+        return _freeze(value.tolist())
+    return value
+
+
+def request_key(spec, cfg=None):
+    """
+    Returns a hashable key of an analysis request. Requests with the
+    same key give the same results.
+
+    Parameters
+    ----------
+    spec :   dict or datamodel
+             parameters of the winding generator or winding
+    cfg :    dict
+             configuration (default: current config)
+
+    Returns
+    -------
+    key :    tuple
+    """
+    if cfg is None:
+        cfg = config
+    cfg = json.dumps(cfg, sort_keys=True, default=str)
+    if isinstance(spec, datamodel):
+        # not the canonical hash (datamodel.get_hash): equivalent windings
+        # with rotated slots or renamed phases have different results
+        return ("wdg", _freeze(spec.machinedata), cfg)
+    return ("genwdg", _freeze(_get_spec(spec)), cfg)
+
+
+def get_datamodel(spec, cfg=None):
+    """
+    Generates (if required) and analyses a winding, this is done in the
+    worker processes
+
+    Parameters
+    ----------
+    spec :   dict or datamodel
+             parameters of the winding generator or winding
+    cfg :    dict
+             configuration (default: current config)
+
+    Returns
+    -------
+    data :   datamodel
+    """
+    if cfg is not None:
+        config.update(cfg)
+    if isinstance(spec, datamodel):
+        data = spec
+    else:
+        data = datamodel()
+        data.genwdg(**_get_spec(spec), analyse=False)
+        if data.get_phases() is None:
+            raise ValueError("No winding possible for {}".format(spec))
+    data.analyse_wdg()
+    return data
+
+
+def _analyse_job(spec, cfg):
+    """
+    worker function, analyses a winding and exports the results
+    """
+    data = get_datamodel(spec, cfg)
+    desc = sharedresults.export_results(data.results)
+    data.reset_results()
+    return data, desc
+
+
+def _import_job(ret):
+    data, desc = ret
+    data.results = sharedresults.import_results(desc)
+    return data
+
+
+class workerpool:
+    """
+    Pool of worker processes for the analysis of windings in asyncio
+    applications. The processes are started on the first request.
+
+    Parameters
+    ----------
+    workers :     integer
+                  number of processes, None: number of cpus
+    max_pending : integer
+                  number of jobs which are submitted to the processes at
+                  once (default: 2 * workers), further requests wait in
+                  the event loop
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers if workers else os.cpu_count()
+        self.max_pending = max_pending if max_pending else 2 * self.workers
+        self._executor = None
+        self._semaphore = None
+        self._inflight = {}
+        self._waiters = collections.Counter()
+
+    def _get_executor(self):
+        if self._executor is None:
+            if os.name == "posix":
+                # the workers must use the resource tracker of this
+                # process for the shared memory blocks
+                from multiprocessing import resource_tracker
+
+                resource_tracker.ensure_running()
+            # no fork: the parent process runs threads (event loop,
+            # executor)
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _drop_executor(self, executor):
+        """
+        Drops a broken executor (a worker process died), the next job
+        starts a new pool
+        """
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    def _submit(self, func, args, convert=None):
+        """
+        Submits a job and returns an asyncio future. 'convert' is
+        called in the thread of the executor with the result of the job,
+        also if the future is cancelled meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        executor = self._get_executor()
+        try:
+            cf = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._drop_executor(executor)
+            executor = self._get_executor()
+            cf = executor.submit(func, *args)
+
+        def set_result(fut, value, error):
+            if fut.done():
+                return
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(value)
+
+        def done(cf):
+            if cf.cancelled():
+                loop.call_soon_threadsafe(fut.cancel)
+                return
+            value, error = None, cf.exception()
+            if isinstance(error, BrokenProcessPool):
+                try:
+                    loop.call_soon_threadsafe(self._drop_executor, executor)
+                except RuntimeError:
+                    pass  # event loop is closed
+            if error is None:
+                value = cf.result()
+                if convert is not None:
+                    try:
+                        value = convert(value)
+                    except Exception as e:
+                        error = e
+            try:
+                loop.call_soon_threadsafe(set_result, fut, value, error)
+            except RuntimeError:
+                pass  # event loop is closed
+
+        cf.add_done_callback(done)
+        fut.add_done_callback(lambda fut: cf.cancel() if fut.cancelled() else None)
+        return fut
+
+    async def _run(self, func, args, convert=None):
+        """
+        Runs a job, the number of pending jobs is limited
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.max_pending))
+        async with self._semaphore[1]:
+            return await self._submit(func, args, convert)
+
+    def _forget(self, key, fut):
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+
+    async def _call(self, key, timeout, func, args, convert=None):
+        """
+        Runs a job or waits for the running job with the same key
+        """
+        key = (asyncio.get_running_loop(), key)
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._run(func, args, convert))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._forget(key, f))
+        self._waiters[key] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] <= 0:
+                del self._waiters[key]
+                if not fut.done():
+                    # nobody waits for the result anymore
+                    fut.cancel()
+                    self._forget(key, fut)
+
+    async def run(self, func, *args, key=None, timeout=None):
+        """
+        Runs a function in a worker process
+
+        Parameters
+        ----------
+        func :    function
+                  function on module level (picklable)
+        args :    arguments of the function
+        key :     hashable
+                  If given, calls with the same key which are running at
+                  the same time are executed only once
+        timeout : float
+                  timeout in seconds. A timeout or the cancellation of
+                  the call drops the job if it hasn't started yet. A
+                  running job isn't interrupted, it occupies its worker
+                  process until it is finished.
+
+        Returns
+        -------
+        return :  return value of the function
+        """
+        if key is None:
+            key = object()
+        return await self._call(key, timeout, func, args)
+
+    async def analyse(self, spec, timeout=None):
+        """
+        Generates (if required) and analyses a winding in a worker
+        process
+
+        Parameters
+        ----------
+        spec :    dict or datamodel
+                  parameters of the winding generator (see
+                  datamodel.genwdg) or winding
+        timeout : float
+                  timeout in seconds (running jobs aren't interrupted,
+                  see 'run')
+
+        Returns
+        -------
+        data :    datamodel
+                  analysed winding. Identical requests which are running
+                  at the same time get the same object, so it should be
+                  copied before it is changed.
+        """
+        if isinstance(spec, datamodel):
+            # old results are not sent to the worker
+            spec = copy.copy(spec)
+            spec.reset_results()
+        else:
+            spec = _get_spec(spec)
+        cfg = dict(config)
+        key = ("analyse", request_key(spec, cfg))
+        return await self._call(key, timeout, _analyse_job, (spec, cfg), _import_job)
+
+    async def sweep(
+        self,
+        Qrange,
+        Prange,
+        m,
+        layers,
+        w_policy="all",
+        empty_slots=0,
+        chunksize=64,
+        skip_duplicates=True,
+    ):
+        """
+        Generates and analyses the windings of a sweep in the worker
+        processes, see sweep.iter_combinations. Only a limited number
+        of chunks is pending. Closing the iterator cancels the pending
+        chunks, chunks which are already analysed are finished.
+
+        Returns
+        -------
+        rows : async iterator of dicts
+               see sweep.get_row
+        """
+        strict_w = w_policy not in ("all", "auto")
+        chunks = _sweep._iter_chunks(
+            _sweep.iter_parameters(Qrange, Prange, layers, w_policy), chunksize
+        )
+        seen = set() if skip_duplicates else None
+        pending = collections.deque()
+        try:
+            while True:
+                for comb in chunks:
+                    args = ((comb, m, empty_slots, skip_duplicates, strict_w),)
+                    job = self._run(_sweep._analyse_chunk, args)
+                    pending.append(asyncio.ensure_future(job))
+                    if len(pending) >= self.max_pending:
+                        break
+                if not pending:
+                    return
+                rows, num = await pending.popleft()
+                for row in rows:
+                    if seen is not None:
+                        if row["hash"] in seen:
+                            continue
+                        seen.add(row["hash"])
+                    yield row
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def start(self):
+        """
+        Starts the worker processes, otherwise they are started by the
+        first requests
+        """
+        jobs = [self._run(_init_worker, ()) for k in range(self.workers)]
+        await asyncio.gather(*jobs)
+
+    async def close(self):
+        """
+        Shuts the worker processes down
+        """
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, executor.shutdown, True
+            )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+_pool = None
+
+
+def get_pool():
+    """
+    Returns the default worker pool of the module functions
+    """
+    global _pool
+    if _pool is None:
+        _pool = workerpool()
+    return _pool
+
+
+async def analyse(spec, timeout=None):
+    """
+    Generates (if required) and analyses a winding with the default
+    worker pool, see workerpool.analyse
+    """
+    return await get_pool().analyse(spec, timeout=timeout)
+
+
+def sweep(Qrange, Prange, m, layers, **kwargs):
+    """
+    Async iterator over the windings of a sweep with the default worker
+    pool, see workerpool.sweep
+    """
+    return get_pool().sweep(Qrange, Prange, m, layers, **kwargs)
+
+
+async def shutdown():
+    """
+    Shuts the default worker pool down
+    """
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
@@ -4,9 +4,12 @@ Provides functions for analyzing windings
 """
 import numpy as np
 import fractions
+import hashlib
 import math
 from collections import Counter, deque
 
+# tolerance of the winding factors of the base winding (see 'calc_kw')
+_BASE_TOL = 1e-9
 
 def calc_q(Q, p, m):
     return fractions.Fraction(Q / (m * 2 * p)).limit_denominator(100)
@@ -246,7 +249,7 @@ def calc_phaseangle_starvoltage(Ei):
     return phaseangle, sequence
 
 
-def calc_kw(Q, S, turns, p, N_nu, config):
+def calc_kw(Q, S, turns, p, N_nu, config, t=1):
     """
     Calculates the windingfactor, the slot voltage vectors. The 
     harmonic numbers are generated automatically.
@@ -264,6 +267,11 @@ def calc_kw(Q, S, turns, p, N_nu, config):
              number of pole pairs
     N_nu:    integer
              length of the harmonic number vector
+    t :      integer
+             periodicity of the winding layout. If t > 1 the relevant
+             harmonic numbers are searched on the base winding (see
+             'get_base_winding'), the results are always calculated
+             for the full winding.
              
     Returns
     -------
@@ -291,16 +299,32 @@ def calc_kw(Q, S, turns, p, N_nu, config):
         if hasattr(turns, "__iter__"):
             turns[k] = np.array(turns[k])[idx]
 
-    k = 1
+    # The winding factor of a periodic winding is the one of the base
+    # winding if the sections are in phase (nu*p/t is an integer),
+    # otherwise it vanishes. Only the candidates are calculated for
+    # the full winding, the tolerance catches rounding differences.
+    S_b = None
+    if t > 1 and config["kw_min"] > _BASE_TOL:
+        S_b = _get_base_layout(S, Q, t, turns)
+    if S_b is not None:
+        S_b = [np.array(s) for s in _flatten(S_b)]
+
+    k = 0
     while len(wf) < N_nu:
+        k += 1
+        if k > 10000:  # break infinity loop if there is no relevant
+            break  # windingfactor of the actual winding layout
+        if S_b is not None:
+            if (k * p) % t != 0:
+                continue
+            _, b = calc_star(Q / t, S_b, turns, p / t, k)
+            if np.any(np.abs(b) < config["kw_min"] - _BASE_TOL):
+                continue
         a, b = calc_star(Q, S2, turns, p, k)
         if np.all(np.abs(b) > config["kw_min"]):
             nu.append(k)
             wf.append(b)
             Ei.append(a)
-        k += 1
-        if k > 10000:  # break infinity loop if there is no relevant
-            break  # windingfactor of the actual winding layout
 
     phase, sequence = calc_phaseangle_starvoltage(Ei)
     for k in range(len(sequence)):
@@ -364,6 +388,123 @@ def calc_kw_by_nu(Q, S, turns, p, nu):
     return wf[0]
 
 
+def compile_layouts(windings):
+    """
+    Compiles several winding layouts to padded arrays for the batch
+    functions (e.g. 'calc_kw_batch').
+
+    Parameters
+    ----------
+    windings : list
+               datamodel objects or tuples (Q, S, turns, p)
+
+    Returns
+    -------
+    return : dict
+             "Q", "p", "m":  arrays with shape (num_windings,)
+             "slots":        slot numbers (without sign),
+                             shape (num_windings, max_phases, max_coil_sides)
+             "sign":         winding direction (+1, -1)
+             "turns":        number of turns
+             "mask":         True for existing coil sides
+    """
+    data = []
+    for wdg in windings:
+        if hasattr(wdg, "get_phases"):
+            wdg = (
+                wdg.get_num_slots(),
+                wdg.get_phases(),
+                wdg.get_turns(),
+                wdg.get_num_polepairs(),
+            )
+        Q, S, turns, p = wdg
+        S2 = _flatten(S)
+        T2 = _flatten(turns) if hasattr(turns, "__iter__") else None
+        data.append((Q, p, S2, T2, turns))
+
+    num = len(data)
+    M = max([len(d[2]) for d in data], default=0)
+    C = max([len(ph) for d in data for ph in d[2]], default=0)
+    comp = {
+        "Q": np.array([d[0] for d in data], dtype=float),
+        "p": np.array([d[1] for d in data], dtype=float),
+        "m": np.array([len(d[2]) for d in data], dtype=int),
+        "slots": np.zeros((num, M, C), dtype=int),
+        "sign": np.zeros((num, M, C), dtype=int),
+        "turns": np.zeros((num, M, C)),
+        "mask": np.zeros((num, M, C), dtype=bool),
+    }
+    for k, (Q, p, S2, T2, turns) in enumerate(data):
+        for km, ph in enumerate(S2):
+            n = len(ph)
+            ph = np.asarray(ph)
+            comp["slots"][k, km, :n] = np.abs(ph)
+            comp["sign"][k, km, :n] = np.sign(ph)
+            comp["turns"][k, km, :n] = T2[km] if T2 is not None else turns
+            comp["mask"][k, km, :n] = True
+    return comp
+
+
+def calc_kw_batch(layouts, nu, signed=True, max_elements=2 ** 22):
+    """
+    Calculates the winding factors of many windings for the given
+    harmonic numbers in a vectorized way. The windings are processed
+    in chunks, so that the temporary arrays doesn't exceed
+    'max_elements' elements.
+
+    Parameters
+    ----------
+    layouts :      dict or list
+                   compiled layouts (see 'compile_layouts') or a list of
+                   windings which gets compiled
+    nu :           list of integers
+                   harmonic numbers
+    signed :       Bool
+                   If True the sign defines the direction of the flux
+                   wave (like 'calc_kw_by_nu'), otherwise the absolute
+                   values are returned. For zero sequence harmonics
+                   (all phases in phase) the direction isn't defined:
+                   'calc_kw_by_nu' returns a sign which depends on
+                   rounding errors, here the sign is always negative.
+    max_elements : integer
+                   maximum size of the temporary arrays
+
+    Returns
+    -------
+    return : ndarray
+             winding factors, shape (num_windings, len(nu), max_phases).
+             Not existing phases are NaN.
+    """
+    if not hasattr(layouts, "keys"):
+        layouts = compile_layouts(layouts)
+    nu = np.atleast_1d(np.asarray(nu, dtype=float))
+    num, M, C = layouts["slots"].shape
+    kw = np.full((num, len(nu), M), np.nan)
+    chunk = max(1, int(max_elements // max(1, len(nu) * M * C)))
+    for k0 in range(0, num, chunk):
+        sl = slice(k0, k0 + chunk)
+        Q = layouts["Q"][sl, None, None, None]
+        p = layouts["p"][sl, None, None, None]
+        slots = layouts["slots"][sl, None, :, :]
+        alpha = 2.0 * np.pi * nu[None, :, None, None] * p / Q * slots
+        alpha = alpha + np.pi * (layouts["sign"][sl, None, :, :] < 0)
+        turns = layouts["turns"][sl, None, :, :] * layouts["mask"][sl, None, :, :]
+        E = np.sum(turns * np.exp(1j * alpha), axis=-1)  # (w, nu, phase)
+        T = np.sum(np.abs(turns), axis=-1)
+        kwc = np.abs(E) / np.where(T > 0, T, 1.0)
+        kwc[np.abs(E) == 0.0] = 0.0
+
+        if signed and M > 1:
+            # direction of the flux wave (see calc_phaseangle_starvoltage)
+            angle = np.round(np.angle(E[:, :, :2], deg=True), 6) % 360
+            angle[np.abs(E[:, :, :2]) == 0.0] = 0.0
+            seq = np.where(angle[:, :, 1] > angle[:, :, 0], 1.0, -1.0)
+            kwc = kwc * seq[:, :, None]
+        exists = np.arange(M)[None, :] < layouts["m"][sl, None]
+        kw[sl] = np.where(exists[:, None, :], kwc, np.nan)
+    return kw
+
+
 def test_phases(S):
     """
     Test if there is data in phases
@@ -419,6 +560,233 @@ def calc_star(Q, S, turns, p, nu):
     return Ei, kw
 
 
+def calc_phasor_matrix(Q, S, p, nu):
+    """
+    Calculates the unit slot voltage phasors of one phase for several
+    harmonic numbers at once. Multiplying the matrix with a vector of
+    turns gives the resulting phasor of the phase for every harmonic.
+
+    Parameters
+    ----------
+    Q :      integer
+             number of slots
+    S :      list or 1D array
+             coil sides of the phase (flattened layers)
+    p :      integer
+             number of pole pairs
+    nu:      list of integers
+             harmonic numbers
+
+    Returns
+    -------
+    return A: 2D complex numpy array
+              unit voltage phasors, A[nu][coil side]
+    """
+    S = np.asarray(S)
+    nu = np.asarray(nu, dtype=float).reshape(-1)
+    alpha = 2.0 * np.pi * p / Q * np.outer(nu, np.abs(S))
+    alpha[:, S < 0] += np.pi
+    return np.exp(1j * alpha)
+
+
+def _round_preserve_sum(x):
+    """
+    Rounds the values of 'x' to integers so that the sum of the rounded
+    values equals the rounded sum of 'x' (largest remainder method)
+    """
+    x = np.asarray(x, dtype=float)
+    r = np.floor(x)
+    missing = int(round(np.sum(x) - np.sum(r)))
+    if missing > 0:
+        idx = np.argsort(-(x - r), kind="stable")[:missing]
+        r[idx] += 1
+    return r
+
+
+def optimize_turns(
+    Q,
+    S,
+    turns,
+    p,
+    nu,
+    weights=None,
+    kw1_min=None,
+    turns_min=1,
+    step=1,
+    integer=True,
+    mmf=False,
+    max_iter=1000,
+):
+    """
+    Optimizes the individual number of turns of the coil sides to
+    suppress the given harmonics. The number of turns is moved stepwise
+    between coil sides of the same winding direction, so the total
+    number of turns per phase and the balance of positive and negative
+    coil sides are kept. Every possible move is evaluated with the
+    precomputed phasor matrix (see 'calc_phasor_matrix') and the best
+    one is applied until there is no further improvement.
+
+    Parameters
+    ----------
+    Q :         integer
+                number of slots
+    S :         list of lists
+                winding layout
+    turns :     number or list of lists (shape of 'S')
+                initial number of turns
+    p :         integer
+                number of pole pairs
+    nu:         list of integers
+                electrical harmonic numbers to suppress
+    weights:    list of floats
+                weighting of the harmonics in the objective function
+                (default: 1.0 for all harmonics)
+    kw1_min:    float
+                minimal fundamental winding factor. If not given the
+                fundamental winding factor of the initial winding is used
+    turns_min:  number
+                minimal number of turns per coil side
+    step:       number
+                number of turns which are moved within one iteration
+    integer:    Bool
+                If True the turns are rounded to integers before the
+                optimization (the total number of turns is kept)
+    mmf:        Bool
+                If True the MMF harmonics (winding factor / nu) are
+                suppressed instead of the winding factors
+    max_iter:   integer
+                max. number of iterations per phase
+
+    Returns
+    -------
+    return turns: list of lists
+                  optimized number of turns (shape of 'S')
+    return kw:    2D numpy array
+                  resulting winding factors kw[nu][phase]
+    return kw1:   list
+                  resulting fundamental winding factor for every phase
+    """
+    nu = list(nu)
+    if weights is None:
+        weights = np.ones(len(nu))
+    weights = np.asarray(weights, dtype=float)
+    if mmf:
+        weights = weights / np.asarray(nu, dtype=float) ** 2
+
+    turns_opt = []
+    kw = []
+    kw1 = []
+    for km, phase in enumerate(S):
+        layer_len = [len(layer) for layer in phase]
+        s = np.array([item for layer in phase for item in layer])
+        if hasattr(turns, "__iter__"):
+            t = np.array([item for layer in turns[km] for item in layer], dtype=float)
+        else:
+            t = np.full(len(s), float(turns))
+
+        pos = s > 0
+        if integer:
+            t2 = np.zeros(len(t))
+            t2[pos] = _round_preserve_sum(t[pos])
+            t2[~pos] = _round_preserve_sum(t[~pos])
+            t = t2
+        T = np.sum(t)
+
+        A = calc_phasor_matrix(Q, s, p, nu)
+        A1 = calc_phasor_matrix(Q, s, p, [1])[0]
+        y = A @ t
+        y1 = A1 @ t
+        if kw1_min is None:
+            kw1_lim = np.abs(y1) / T - 1e-9
+        else:
+            kw1_lim = kw1_min
+        obj = np.sum(weights * np.abs(y) ** 2) / T ** 2
+
+        # moves from coil side i to coil side j with the same direction
+        same_dir = pos[:, None] == pos[None, :]
+        np.fill_diagonal(same_dir, False)
+        dA = A[:, None, :] - A[:, :, None]
+        dA1 = A1[None, :] - A1[:, None]
+        for _ in range(max_iter):
+            valid = same_dir & (t - step >= turns_min)[:, None]
+            Y = y[:, None, None] + step * dA
+            Y1 = y1 + step * dA1
+            f = np.tensordot(weights, np.abs(Y) ** 2, axes=1) / T ** 2
+            f[~valid] = np.inf
+            f[np.abs(Y1) / T < kw1_lim] = np.inf
+            i, j = np.unravel_index(np.argmin(f), f.shape)
+            if not f[i, j] < obj - 1e-12:
+                break
+            t[i] -= step
+            t[j] += step
+            y, y1, obj = Y[:, i, j], Y1[i, j], f[i, j]
+
+        if integer:
+            t = t.astype(int)
+        # restore the shape of the winding layout
+        turns_opt.append([])
+        i = 0
+        for n in layer_len:
+            turns_opt[-1].append(t[i : i + n].tolist())
+            i += n
+        kw.append(np.abs(y) / T)
+        kw1.append(np.abs(y1) / T)
+
+    return turns_opt, np.array(kw).T, kw1
+
+
+def get_base_winding(S, Q, p, t, turns=1):
+    """
+    Returns the base winding (one periodic section) of a winding with
+    the periodicity 't' of the winding layout. All results of the base
+    winding are repeated t times in the full winding. A reduction is
+    only possible if p is a multiple of t and all coil sides have the
+    same number of turns.
+
+    Parameters
+    ----------
+    S :      list of lists
+             winding layout
+    Q :      integer
+             number of slots
+    p :      integer
+             number of pole pairs
+    t :      integer
+             periodicity of the winding layout
+    turns :  number or list of lists (shape of 'S')
+             number of turns
+
+    Returns
+    -------
+    return : tuple or None
+             (S_base, Q_base, p_base), None if there is no reduction
+    """
+    if p % t != 0:
+        return None
+    S_b = _get_base_layout(S, Q, t, turns)
+    if S_b is None:
+        return None
+    return S_b, Q // t, p // t
+
+
+def _get_base_layout(S, Q, t, turns=1):
+    """
+    Returns the winding layout of the first Q/t slots or None if the
+    layout can't be reduced
+    """
+    if t <= 1 or Q % t != 0 or hasattr(turns, "__iter__"):
+        return None
+    Q_b = Q // t
+    S_b = []
+    for ph in S:
+        S_b.append([])
+        for layer in ph:
+            S_b[-1].append([cs for cs in layer if abs(cs) <= Q_b])
+            if len(S_b[-1][-1]) * t != len(layer):
+                return None
+    return S_b
+
+
 def calc_MMK(Q, m, S, turns=1, N=3601, angle=0):
     """
     Calculates the magneto-motoric force (MMK) 
@@ -527,7 +895,7 @@ def calc_radial_force_modes(MMK, m, num_modes=4):
     return modes
 
 
-def DFT(vect):
+def DFT(vect, num=None):
     """
     Harmonic Analyses
     
@@ -535,6 +903,8 @@ def DFT(vect):
     ----------
     vect  : array_like
             curve (time signal)
+    num   : integer
+            number of harmonics (default: half the length of vect)
              
     Returns
     -------
@@ -545,7 +915,9 @@ def DFT(vect):
     N = len(vect)
     yy = 2.0 / N * np.fft.fft(vect)
     yy[0] = np.mean(vect)
-    return yy[: N // 2]
+    if num is None:
+        num = N // 2
+    return yy[:num]
 
 
 def _get_float(txt):
@@ -589,6 +961,188 @@ def Divisors(n):
     return divisors
 
 
+def _least_rotation(seq):
+    """
+    Returns the start index of the lexicographically minimal rotation
+    of the sequence 'seq' (Booth's algorithm, O(n))
+    """
+    n = len(seq)
+    S = list(seq) + list(seq)
+    f = [-1] * (2 * n)
+    k = 0
+    for j in range(1, 2 * n):
+        sj = S[j]
+        i = f[j - k - 1]
+        while i != -1 and sj != S[k + i + 1]:
+            if sj < S[k + i + 1]:
+                k = j - i - 1
+            i = f[i]
+        if sj != S[k + i + 1]:  # i == -1
+            if sj < S[k]:
+                k = j
+            f[j - k] = -1
+        else:
+            f[j - k] = i + 1
+    return k
+
+
+def _layout_tokens(S, Q, turns=1):
+    """
+    Returns the phase number, the sign and the number of turns for
+    every slot and layer of the winding layout, shape (Q, num_layers).
+    The phase number of an empty slot is -1.
+    """
+    num_layers = max(len(ph) for ph in S) if len(S) > 0 else 1
+    phase = -np.ones((Q, num_layers), dtype=int)
+    sign = np.zeros((Q, num_layers), dtype=int)
+    w = np.zeros((Q, num_layers))
+    for km, ph in enumerate(S):
+        for kl, layer in enumerate(ph):
+            for kcs, cs in enumerate(layer):
+                slot = abs(int(cs)) - 1
+                phase[slot, kl] = km
+                sign[slot, kl] = 1 if cs > 0 else -1
+                if hasattr(turns, "__iter__"):
+                    w[slot, kl] = turns[km][kl][kcs]
+                else:
+                    w[slot, kl] = turns
+    return phase, sign, w
+
+
+def _prev_occurrence(phase):
+    """
+    Returns the cyclic distance to the previous coil side of the same
+    phase for the flattened (slot by slot) layout. This encoding is
+    invariant to the naming of the phases.
+    """
+    flat = phase.ravel()
+    N = len(flat)
+    dist = np.zeros(N, dtype=int)
+    for km in np.unique(flat[flat >= 0]):
+        pos = np.flatnonzero(flat == km)
+        dist[pos] = np.diff(pos, prepend=pos[-1] - N)
+    return dist.reshape(phase.shape)
+
+
+def canonical_layout(S, Q, turns=1):
+    """
+    Returns the canonical form of a winding layout. Layouts which are
+    identical up to a rotation of the slots, mirroring, naming of the
+    phases or inversion of all winding directions have the same
+    canonical form. Multiple coil sides in the same slot and layer
+    aren't supported.
+
+    Parameters
+    ----------
+    S :      list of lists
+             winding layout, S[phase][layer][coil side]
+    Q :      integer
+             number of slots
+    turns :  number or list of lists (shape of 'S')
+             number of turns
+
+    Returns
+    -------
+    return : ndarray
+             canonical form, shape (Q, num_layers, 3) with the distance
+             to the previous coil side of the same phase, the sign and
+             the number of turns for every slot and layer
+    """
+    phase, sign, w = _layout_tokens(S, Q, turns)
+    best = None
+    for mirror in [False, True]:
+        if mirror:
+            phase, sign, w = phase[::-1], sign[::-1], w[::-1]
+        code = np.stack([_prev_occurrence(phase), sign, w], axis=-1)
+        for inv in [1, -1]:
+            c = code.copy()
+            c[..., 1] *= inv
+            # ranking of the slots for the minimal rotation
+            _, rank = np.unique(c.reshape(Q, -1), axis=0, return_inverse=True)
+            k = _least_rotation(rank.ravel().tolist())
+            c = np.roll(c, -k, axis=0)
+            if best is None or tuple(c.ravel()) < tuple(best.ravel()):
+                best = c
+    return best
+
+
+def winding_hash(S, Q, p, turns=1):
+    """
+    Returns a hash of the winding based on its canonical form (see
+    'canonical_layout'), the number of slots and pole pairs.
+
+    Returns
+    -------
+    return : string
+             hash (hexadecimal)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array([Q, int(2 * p)], dtype=np.int64).tobytes())
+    c = canonical_layout(S, Q, turns)
+    h.update(np.ascontiguousarray(c, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def _linear_sum_assignment(cost):
+    """
+    Solves the linear sum assignment problem (minimum cost perfect
+    matching) for a square cost matrix with the Hungarian method
+    (shortest augmenting path with potentials). The worst case cost is
+    O(n^3) and the memory O(n^2). For the banded cost matrices of the
+    winding overhang the augmenting paths are short, so the cost is
+    about O(n^2) with vectorized rows (n: coils of one phase and
+    layer pair).
+
+    Parameters
+    ----------
+    cost : array_like
+           square cost matrix
+
+    Returns
+    -------
+    row_ind : ndarray
+              row indices
+    col_ind : ndarray
+              assigned column index for each row
+    """
+    C = np.asarray(cost, dtype=float)
+    n = C.shape[0]
+    if C.ndim != 2 or C.shape[1] != n:
+        raise ValueError("cost matrix must be square")
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    p = np.zeros(n + 1, dtype=int)  # p[j]: row assigned to column j
+    way = np.zeros(n + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            js = np.flatnonzero(~used)
+            cur = C[i0 - 1, js - 1] - u[i0] - v[js]
+            upd = cur < minv[js]
+            minv[js[upd]] = cur[upd]
+            way[js[upd]] = j0
+            j1 = js[np.argmin(minv[js])]
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:  # augmenting path
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    col_ind = np.zeros(n, dtype=int)
+    col_ind[p[1:] - 1] = np.arange(n)
+    return np.arange(n), col_ind
+
+
 class create_wdg_overhang:
     def __init__(self, S, Q, num_layers):
         """
@@ -677,6 +1231,38 @@ class create_wdg_overhang:
             Sn = np.abs(S2[S2 < 0])
         return Sp, Sn
 
+    def get_dist_matrix(self, Sp, Sn):
+        """
+        Returns the distances and directions between all positive
+        coil sides 'Sp' and all negative coil sides 'Sn'
+        (vectorized version of 'diff_and_direct').
+
+        Parameters
+        ----------
+        Sp : array_like
+             Positive coil sides
+        Sn : array_like
+             Negative coil sides
+                 
+        Returns
+        -------
+        diff : ndarray
+               distance in slot count, shape (len(Sp), len(Sn))
+        direct : ndarray
+                 Direction of the coils, shape (len(Sp), len(Sn))
+        """
+        Q = self.Q
+        start = np.asarray(Sp)[:, None]
+        end = np.asarray(Sn)[None, :]
+        d = end - start
+        overflow = np.abs(d) > Q / 2
+        fwd = end > start
+        diff = np.where(fwd, np.where(overflow, Q - d, d), np.where(overflow, Q + d, -d))
+        direct = np.where(fwd != overflow, 1, -1)
+        # prefer positive direction when possible (2p=2)
+        direct[diff == Q / 2] = 1
+        return diff, direct
+
     def get_dist_in_slots(self, S1, S2):
         """
         Returns the distance of the coilsides between S1 and S2.
@@ -693,13 +1279,8 @@ class create_wdg_overhang:
         return : array 
                  distance between S1 and S2 in slot count
         """
-        dist_slots = []
-        direct = []
-        for k in range(len(S2)):
-            a, b = self.diff_and_direct(S1, S2[k])
-            dist_slots.append(a)
-            direct.append(b)
-        return dist_slots, direct
+        dist_slots, direct = self.get_dist_matrix([S1], S2)
+        return list(dist_slots[0]), list(direct[0])
 
     def get_overhang(self, w=None):
         """
@@ -733,72 +1314,68 @@ class create_wdg_overhang:
         def get_connection(Sp, Sn, layer):
             """
             Returns the connection of coils from positive coil sides 'Sp'
-            and negative coil sides 'Sn'
+            and negative coil sides 'Sn'. The coil sides are connected
+            by a minimum cost perfect matching, the cost is ranked
+            lexicographically by the given criteria. The matching is
+            solved for every phase and layer pair separately, so the
+            cost grows linearly with the number of layers and faster
+            than linearly with the number of coils (see
+            '_linear_sum_assignment').
             """
             if len(Sp) != len(Sn):
                 #  raise Exception('Number of positive and negative coils sides must be equal')
                 print("Number of positive and negative coils sides must be equal")
                 return []
+            if len(Sp) == 0:
+                return []
 
-            con = []
-            for kp in range(len(Sp)):
-                dist_slots, direct = self.get_dist_in_slots(Sp[kp], Sn)
-                dist_min = np.argsort(dist_slots)  # idx
-
-                idx = -1
-                if w is None:
-                    idx = dist_min[0]
-
-                    # prefer positive direction
-                    if direct[idx] < 0:
-                        for i in range(1, len(dist_min)):
-                            if dist_min[i] == dist_min[0] and direct[i] > 0:
-                                idx = i
-                                break
+            dist_slots, direct = self.get_dist_matrix(Sp, Sn)
+            negative = (direct < 0).astype(int)
+            if self.w is None:
+                # shortest connection, prefer positive direction
+                keys = [(dist_slots, self.Q), (negative, 1)]
+            else:
+                not_w = (~np.isin(dist_slots, self.w)).astype(int)
+                # is there a step available in positive direction?
+                # this is not applicable for tooth coil windings
+                if layer[0] == layer[1] and self.w != [1]:
+                    keys = [(not_w, 1), (negative, 1), (dist_slots, self.Q)]
                 else:
-                    # shortest step
-                    for i in dist_min:
-                        if dist_slots[i] in self.w:
-                            idx = i
-                            break
-
-                    # is there a step available in positive direction?
-                    # this is not applicable for tooth coil windin
-                    if self.num_layers == 1 and self.w != [1]:
-                        dist_min2 = []
-                        for i in dist_min:
-                            if dist_slots[i] in self.w:
-                                dist_min2.append(i)
-                        for i in dist_min2:
-                            if direct[i] > 0:
-                                idx = i
-                                break
-
-                if idx == -1:
-                    idx = dist_min[0]  # fallback
-                    #  print('fallback')
-
-                start, end = Sp[kp], Sn[idx]
+                    keys = [(not_w, 1), (dist_slots, self.Q), (negative, 1)]
+
+            # the sum of a lower ranked criterion can never outweigh
+            # one unit of a higher ranked criterion
+            n = len(Sp)
+            cost = np.zeros(dist_slots.shape, dtype=np.int64)
+            scale = 1
+            for key, key_max in reversed(keys):
+                cost += key * scale
+                scale *= n * key_max + 1
+
+            _, col = _linear_sum_assignment(cost)
+            con = []
+            for kp in range(n):
+                start, end = Sp[kp], Sn[col[kp]]
                 diff, direct = self.diff_and_direct(start, end)
                 con.append([(start, end), diff, direct, layer])
-                Sn = np.delete(Sn, idx)
             return con
 
+        # layers are connected pairwise: (0, 1), (2, 3), ...
+        # an odd last layer is connected with itself
         head = []
-        if self.num_layers == 1:
-            for km in range(len(self.S)):
-                S1 = np.array(self.S[km][0])
-                Sp, Sn = self.get_pos_neg_coil_sides(S1)
-                head.append(get_connection(Sp, Sn, layer=(0, 0)))
-        elif self.num_layers == 2:
-            for km in range(len(self.S)):
-                S1 = np.array(self.S[km][0])
-                S2 = np.array(self.S[km][1])
-                Sp, Sn = self.get_pos_neg_coil_sides(S1, S2)
-                head.append(get_connection(Sp, Sn, layer=(0, 1)))
-                Sp, Sn = self.get_pos_neg_coil_sides(S2, S1)
-                head[-1] += get_connection(Sp, Sn, layer=(1, 0))
-        else:
-            raise Exception("Number of layers >2 not implemented yet")
+        for km in range(len(self.S)):
+            layers = list(self.S[km]) + [[]] * (self.num_layers - len(self.S[km]))
+            head.append([])
+            for kl in range(0, self.num_layers, 2):
+                S1 = np.array(layers[kl], dtype=int)
+                if kl + 1 == self.num_layers:
+                    Sp, Sn = self.get_pos_neg_coil_sides(S1)
+                    head[-1] += get_connection(Sp, Sn, layer=(kl, kl))
+                else:
+                    S2 = np.array(layers[kl + 1], dtype=int)
+                    Sp, Sn = self.get_pos_neg_coil_sides(S1, S2)
+                    head[-1] += get_connection(Sp, Sn, layer=(kl, kl + 1))
+                    Sp, Sn = self.get_pos_neg_coil_sides(S2, S1)
+                    head[-1] += get_connection(Sp, Sn, layer=(kl + 1, kl))
 
         return head
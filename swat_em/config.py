@@ -36,6 +36,8 @@ def get_init_config():
     config["kw_min"] = 0.01
     config["num_MMF_points"] = 3601
     config["plot_MMF_harmonics"] = 0.15
+    config["single_precision_results"] = False
+    config["num_workers"] = 1  # number of processes for sweeps, None: all cpus
     config["plt"] = {
         "lw": 2.0,
         "lw_thin": 1.0,
@@ -18,6 +18,141 @@ from swat_em.config import config, get_phase_color
 # from swat_em import plots
 
 
+class resultdata:
+    """
+    Container for the analysis results of a winding. The results are
+    accessed like a dictionary (results["kw_el"]) but the harmonic data is
+    stored as dense arrays:
+
+    nu_el, nu_mech:                   ordinal numbers [nu]
+    kw_el, kw_mech:                   winding factors [nu, phase]
+    phaseangle_el, phaseangle_mech:   phase angles [nu, phase]
+    Ei_el, Ei_mech:                   slot voltage vectors [nu, phase, coil side]
+
+    Parameters
+    ----------
+    single_precision : Bool
+                       If True the arrays are stored as float32/complex64
+    """
+
+    __slots__ = (
+        "q",
+        "nu_el",
+        "Ei_el",
+        "kw_el",
+        "phaseangle_el",
+        "nu_mech",
+        "Ei_mech",
+        "kw_mech",
+        "phaseangle_mech",
+        "valid",
+        "error",
+        "wdg_is_symmetric",
+        "wdg_periodic",
+        "t",
+        "a",
+        "lcmQP",
+        "basic_char",
+        "MMK",
+        "wdg_overhang",
+        "text_report",
+        "_num_cs_el",
+        "_num_cs_mech",
+        "_single_precision",
+    )
+    _nu_keys = ("nu_el", "nu_mech")
+    _real_keys = ("kw_el", "kw_mech", "phaseangle_el", "phaseangle_mech")
+    _phasor_keys = ("Ei_el", "Ei_mech")
+
+    def __init__(self, single_precision=False):
+        self._single_precision = single_precision
+
+    @property
+    def float_type(self):
+        return np.float32 if self._single_precision else np.float64
+
+    @property
+    def complex_type(self):
+        return np.complex64 if self._single_precision else np.complex128
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__ or key.startswith("_"):
+            raise KeyError(key)
+        if value is not None:
+            if key in self._nu_keys:
+                value = np.array(value, dtype=int)
+            elif key in self._real_keys:
+                value = np.array(value, dtype=self.float_type)
+            elif key in self._phasor_keys:
+                value = self._pack(key, value)
+        setattr(self, key, value)
+
+    def __getitem__(self, key):
+        if key.startswith("_"):
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+        if value is not None:
+            if key in self._nu_keys:
+                value = value.tolist()
+            elif key in self._phasor_keys:
+                value = self._unpack(key, value)
+        return value
+
+    def __contains__(self, key):
+        return not key.startswith("_") and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [k for k in self.__slots__ if k in self]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        if key in self:
+            delattr(self, key)
+        return value
+
+    def _pack(self, key, Ei):
+        """
+        stores the ragged slot voltage vectors Ei[nu][phase][coil side]
+        as padded 3D array and the number of coil sides per phase
+        """
+        num_nu = len(Ei)
+        num_phases = len(Ei[0]) if num_nu > 0 else 0
+        num_cs = np.zeros(num_phases, dtype=int)
+        if num_nu > 0:
+            num_cs[:] = [len(ei) for ei in Ei[0]]
+        dense = np.zeros(
+            (num_nu, num_phases, num_cs.max() if num_phases else 0),
+            dtype=self.complex_type,
+        )
+        for knu in range(num_nu):
+            for km in range(num_phases):
+                dense[knu, km, : num_cs[km]] = Ei[knu][km]
+        setattr(self, "_num_cs" + key[2:], num_cs)
+        return dense
+
+    def _unpack(self, key, dense):
+        """
+        returns the dense array if all phases have the same number of
+        coil sides, otherwise views without the padding
+        """
+        num_cs = getattr(self, "_num_cs" + key[2:])
+        if np.all(num_cs == dense.shape[2]):
+            return dense
+        return [
+            [dense[knu, km, : num_cs[km]] for km in range(len(num_cs))]
+            for knu in range(dense.shape[0])
+        ]
+
+
 class datamodel:
     """
     Provides a central place for all data. All analysis functions are
@@ -49,7 +184,7 @@ class datamodel:
         txt.append("WINDING DATAMODEL")
         txt.append("=================")
         txt.append("")
-        if self.results["kw_el"] != None:
+        if self.results["kw_el"] is not None:
             txt.append("Title: " + self.get_title())
             txt.append("Number of slots:  {}".format(self.get_num_slots()))
             txt.append("Number of poles:  {}".format(2 * self.get_num_polepairs()))
@@ -68,8 +203,11 @@ class datamodel:
         ret = []
         ret.append(self.machinedata == other.machinedata)
         for rk in self.results_keys:
-            if type(self.results[rk]) == type([]):  # lists are filled with numpy arrays
-                ret.append(np.allclose(self.results[rk], other.results[rk]))
+            if isinstance(self.results[rk], (list, np.ndarray)):
+                ret.append(
+                    np.shape(self.results[rk]) == np.shape(other.results[rk])
+                    and np.allclose(self.results[rk], other.results[rk])
+                )
             else:
                 ret.append(self.results[rk] == other.results[rk])
         return np.all(ret)
@@ -91,9 +229,10 @@ class datamodel:
         """
         Remove all existing results
         """
-        self.results = {}
+        self.results = resultdata(config.get("single_precision_results", False))
         for key in self.results_keys:
             self.results[key] = None
+        self._revision = self.get_revision() + 1
 
     def copy(self):
         """
@@ -111,6 +250,7 @@ class datamodel:
                 title
         """
         self.title = title
+        self.reset_text_report()
 
     def get_title(self):
         """
@@ -147,6 +287,7 @@ class datamodel:
                  Some notes
         """
         self.notes = notes
+        self.reset_text_report()
 
     def set_machinedata(self, Q=None, p=None, m=None, Qes=None):
         """
@@ -196,6 +337,7 @@ class datamodel:
                     turns[k] = [turns[k], []]
 
         self.machinedata["phases"] = S
+        self.reset_wdg_overhang()
         self.set_turns(turns)
         self.set_machinedata(m=len(S))
         self.machinedata["phasenames"] = [
@@ -252,11 +394,14 @@ class datamodel:
     def get_num_layers(self):
         """
         Returns the number of layers of the actual winding layout
+        (the highest layer which contains coil sides)
         """
         l = 1
         for p in self.get_phases():
-            if len(p[1]) > 0:
-                l = 2
+            for kl in range(len(p) - 1, l - 1, -1):
+                if len(p[kl]) > 0:
+                    l = kl + 1
+                    break
         return l
 
     def get_basic_characteristics(self):
@@ -483,6 +628,39 @@ class datamodel:
             i += 1
         return t
 
+    def get_base_winding(self, t=None):
+        """
+        Returns the base winding, which is used to find the relevant
+        harmonic numbers (see analyse.calc_kw). For a winding layout
+        with the periodicity t (and p being a multiple of t) all results
+        are determined by one section of Q/t slots.
+
+        Parameters
+        ----------
+        t : integer
+            periodicity of the winding layout (calculated if not given)
+
+        Returns
+        -------
+        t:   integer
+             number of base windings (1 if there is no reduction)
+        S:   list of lists
+             winding layout of the base winding
+        Q:   integer
+             number of slots of the base winding
+        p:   integer
+             number of pole pairs of the base winding
+        """
+        S = self.get_phases()
+        Q = self.get_num_slots()
+        p = self.get_num_polepairs()
+        if t is None:
+            t = self.calc_num_basic_windings_t()
+        base = analyse.get_base_winding(S, Q, p, t, self.get_turns())
+        if base is None:
+            return 1, S, Q, p
+        return (t,) + base
+
     def get_num_slots(self):
         """
         Returns the number of slots Q
@@ -504,6 +682,7 @@ class datamodel:
             number of slots
         """
         self.machinedata["Q"] = Q
+        self.reset_wdg_overhang()
 
     def get_num_polepairs(self):
         """
@@ -526,6 +705,7 @@ class datamodel:
             number of pole pairs
         """
         self.machinedata["p"] = p
+        self.reset_text_report()
 
     def get_num_phases(self):
         """
@@ -548,6 +728,7 @@ class datamodel:
             number of phases
         """
         self.machinedata["m"] = m
+        self.reset_text_report()
 
     def get_coilspan(self):
         """
@@ -570,9 +751,11 @@ class datamodel:
             coil span
         """
         self.machinedata["wstep"] = w
+        self.reset_wdg_overhang()
 
     def set_num_empty_slots(self, Qes):
         self.machinedata["Qes"] = Qes
+        self.reset_text_report()
 
     def get_num_empty_slots(self):
         if self.machinedata["Qes"] is not None:
@@ -630,6 +813,8 @@ class datamodel:
         m = self.get_num_phases()
         for kl in range(N):
             for km in range(m):
+                if kl >= len(self.machinedata["phases"][km]):
+                    continue
                 col = get_phase_color(km)
                 for kcs in range(len(self.machinedata["phases"][km][kl])):
                     slot = self.machinedata["phases"][km][kl][kcs]
@@ -830,6 +1015,69 @@ class datamodel:
                number of turns 
         """
         self.machinedata["turns"] = turns
+        self.reset_text_report()
+
+    def optimize_turns(
+        self,
+        nu,
+        weights=None,
+        kw1_min=None,
+        turns_min=1,
+        step=1,
+        integer=True,
+        mmf=False,
+        analyse_wdg=True,
+    ):
+        """
+        Optimizes the individual number of turns per coil side to
+        suppress the winding factors (or MMF harmonics) of the given
+        electrical ordinal numbers. The total number of turns per phase is
+        kept and the fundamental winding factor doesn't fall below
+        'kw1_min'. The result is stored with 'set_turns'.
+
+        Parameters
+        ----------
+        nu:         list of integers
+                    electrical ordinal numbers to suppress
+        weights:    list of floats
+                    weighting of the ordinal numbers (default: 1.0)
+        kw1_min:    float
+                    minimal fundamental winding factor. If not given the
+                    actual fundamental winding factor is used
+        turns_min:  number
+                    minimal number of turns per coil side
+        step:       number
+                    number of turns moved within one iteration
+        integer:    Bool
+                    If True the resulting turns are integers
+        mmf:        Bool
+                    If True the MMF harmonics are suppressed instead of
+                    the winding factors
+        analyse_wdg : Bool
+                      If False the winding doesn't get analysed again
+
+        Returns
+        -------
+        turns: list of lists
+               optimized number of turns (shape of the winding layout)
+        """
+        turns, kw, kw1 = analyse.optimize_turns(
+            self.get_num_slots(),
+            self.get_phases(),
+            self.get_turns(),
+            self.get_num_polepairs(),
+            nu,
+            weights=weights,
+            kw1_min=kw1_min,
+            turns_min=turns_min,
+            step=step,
+            integer=integer,
+            mmf=mmf,
+        )
+        self.set_turns(turns)
+        if analyse_wdg:
+            self.analyse_wdg()
+        return turns
 
     def get_q(self):
         """
@@ -879,6 +1127,9 @@ class datamodel:
         #  self.results['t'] = math.gcd(self.machinedata['Q'], self.machinedata['p'])
         self.results["t"] = self.calc_num_basic_windings_t()
 
+        # the harmonic numbers are searched on the base winding
+        t = self.results["t"]
+
         # electrical winding factor
         a, b, c, d = analyse.calc_kw(
             self.machinedata["Q"],
@@ -887,11 +1138,13 @@ class datamodel:
             self.machinedata["p"],
             config["N_nu_el"],
             config,
+            t=t,
         )
         self.results["nu_el"] = a
         self.results["Ei_el"] = b
         self.results["kw_el"] = c
         self.results["phaseangle_el"] = d
+        Ei_el = b
 
         # mechanical winding factor
         a, b, c, d = analyse.calc_kw(
@@ -901,6 +1154,7 @@ class datamodel:
             1.0,
             config["N_nu_mech"],
             config,
+            t=t,
         )
         self.results["nu_mech"] = a
         self.results["Ei_mech"] = b
@@ -909,12 +1163,12 @@ class datamodel:
 
         # winding symmetric?
         self.results["wdg_is_symmetric"] = analyse.wdg_is_symmetric(
-            self.results["Ei_el"], self.machinedata["m"]
+            Ei_el, self.machinedata["m"]
         )
 
         # periodicity of the winding (radial force, parallel connection)?
         self.results["wdg_periodic"] = analyse.wdg_get_periodic(
-            self.results["Ei_el"], self.machinedata["phases"]
+            Ei_el, self.machinedata["phases"]
         )
 
         # MMK
@@ -937,6 +1191,8 @@ class datamodel:
         )
         HA = analyse.DFT(MMK[:-1])
         nu = list(range(len(HA)))
+        MMK = np.asarray(MMK, dtype=self.results.float_type)
+        HA = np.asarray(HA, dtype=self.results.complex_type)
 
         self.results["MMK"] = {}
         self.results["MMK"]["MMK"] = MMK
@@ -945,147 +1201,164 @@ class datamodel:
         self.results["MMK"]["nu"] = nu
         self.results["MMK"]["HA"] = HA
 
-    # def plot_layout(self, filename, res=None, show=False):
-    #     """
-    #     Generates a figure of the winding layout
+    def _plot(self, name, filename, res, show, **kwargs):
+        """
+        Saves a figure of the winding (see render.py) or shows the
+        interactive plot if 'show' is True (needs Qt)
+        """
+        if res is None:
+            res = config["plt"]["res"]
+        if not show:
+            from swat_em import render
+
+            render.save_figure(self, name, filename, res=res, **kwargs)
+            return
+        from swat_em import plots
+
+        if name == "layout":
+            plt = plots._slot_plot(None, None, self)
+            plt.plot_slots(self.get_num_slots())
+            plt.plot(self, show=show, **kwargs)
+        elif name == "polar_layout":
+            plt = plots._polar_layout_plot(None, None, self)
+            plt.plot(self, show=show, **kwargs)
+        elif name == "overhang":
+            plt = plots._overhang_plot(None, None, self)
+            plt.plot(show=show, **kwargs)
+        elif name == "star":
+            plt = plots._slot_star(None, None, self, None)
+            plt.plot(self, show=show, **kwargs)
+        elif name == "windingfactor":
+            plt = plots._windingfactor(None, None, self, None)
+            plt.plot(self, show=show, **kwargs)
+        elif name == "MMK":
+            plt = plots._mmk(None, None, self, None)
+            plt.plot(self, show=show, **kwargs)
+        plt.save(fname=filename, res=res)
+
+    def plot_layout(self, filename, res=None, show=False):
+        """
+        Generates a figure of the winding layout
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     res: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._slot_plot(None, None, self)
-    #     plt.plot_slots(self.get_num_slots())
-    #     plt.plot(self, show=show)
-    #     plt.save(fname=filename, res=res)
-
-    # def plot_overhang(self, filename, res=None, show=False, optimize_overhang=False):
-    #     """
-    #     Generates a figure of the winding layout
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        show: Bool
+              If true the window pops up for interactive usage
+        """
+        self._plot("layout", filename, res, show)
+
+    def plot_overhang(self, filename, res=None, show=False, optimize_overhang=False):
+        """
+        Generates a figure of the winding overhang
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     res: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     optimize_overhang: Bool
-    #           If true swat-em tries to identify shorter winding overhangs
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._overhang_plot(None, None, self)
-    #     plt.plot(show=show, optimize_overhang=optimize_overhang)
-    #     plt.save(fname=filename, res=res)
-
-    # def plot_star(self, filename, res=None, ForceX=True, show=False):
-    #     """
-    #     Generates a figure of the star voltage phasors
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        show: Bool
+              If true the window pops up for interactive usage
+        optimize_overhang: Bool
+              If true swat-em tries to identify shorter winding overhangs
+        """
+        self._plot(
+            "overhang", filename, res, show, optimize_overhang=optimize_overhang
+        )
+
+    def plot_star(self, filename, res=None, ForceX=True, show=False):
+        """
+        Generates a figure of the star voltage phasors
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     res: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     ForceX: Bool
-    #             If true the voltage phasors are rotated in such way, that
-    #             the resulting phasor of the first phase matches the 
-    #             x-axis
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._slot_star(None, None, self, None)
-    #     plt.plot(self, harmonic_idx=0, ForceX=ForceX, show=show)
-    #     plt.save(fname=filename, res=res)
-
-    # def plot_windingfactor(self, filename, res=None, mechanical=True, show=False):
-    #     """
-    #     Generates a figure of the winding layout
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        ForceX: Bool
+                If true the voltage phasors are rotated in such way, that
+                the resulting phasor of the first phase matches the 
+                x-axis
+        show: Bool
+              If true the window pops up for interactive usage
+        """
+        self._plot("star", filename, res, show, harmonic_idx=0, ForceX=ForceX)
+
+    def plot_windingfactor(self, filename, res=None, mechanical=True, show=False):
+        """
+        Generates a figure of the winding factor
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     m: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     mechanical: Bool
-    #                 If true the winding factor is plotted with respect to the
-    #                 mechanical ordinal numbers. If false the electrical 
-    #                 ordinal numbers are used
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._windingfactor(None, None, self, None)
-    #     plt.plot(self, mechanical=mechanical, show=show)
-    #     plt.save(fname=filename, res=res)
-
-    # def plot_MMK(self, filename, res=None, phase=0, show=False):
-    #     """
-    #     Generates a figure of the winding layout
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        mechanical: Bool
+                    If true the winding factor is plotted with respect to the
+                    mechanical ordinal numbers. If false the electrical 
+                    ordinal numbers are used
+        show: Bool
+              If true the window pops up for interactive usage
+        """
+        self._plot("windingfactor", filename, res, show, mechanical=mechanical)
+
+    def plot_MMK(self, filename, res=None, phase=0, show=False):
+        """
+        Generates a figure of the magnetomotive force
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     res: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     phase: float
-    #            phase angle for the current system in electical degree
-    #            in the range 0..360°
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._mmk(None, None, self, None)
-    #     plt.plot(self, phase=phase, show=show)
-    #     plt.save(fname=filename, res=res)
-
-    # def plot_polar_layout(
-    #     self, filename, res=None, optimize_overhang=False, draw_poles=False, show=False
-    # ):
-    #     """
-    #     Generates a figure of the winding layout
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        phase: float
+               phase angle for the current system in electical degree
+               in the range 0..360°
+        show: Bool
+              If true the window pops up for interactive usage
+        """
+        self._plot("MMK", filename, res, show, phase=phase)
+
+    def plot_polar_layout(
+        self, filename, res=None, optimize_overhang=False, draw_poles=False, show=False
+    ):
+        """
+        Generates a figure of the winding layout in polar coordinates
         
-    #     Parameters
-    #     -------
-    #     filename: string
-    #               file-name with extension to save the figure
-    #     res: list 
-    #          Resolution for the figure in pixes for x and y direction
-    #          example: res = [800, 600]
-    #     optimize_overhang: Bool
-    #           If true swat-em tries to identify shorter winding overhangs
-    #     draw_poles: Bool
-    #           If true the poles of the rotor are drawn
-    #     show: Bool
-    #           If true the window pops up for interactive usage
-    #     """
-    #     if res == None:
-    #         res = config["plt"]["res"]
-    #     plt = plots._polar_layout_plot(None, None, self)
-    #     plt.plot(
-    #         self, show=show, optimize_overhang=optimize_overhang, draw_poles=draw_poles
-    #     )
-    #     plt.save(fname=filename, res=res)
+        Parameters
+        -------
+        filename: string
+                  file-name with extension (*.png or *.svg) to save the figure
+        res: list 
+             Resolution for the figure in pixes for x and y direction
+             example: res = [800, 600]
+        optimize_overhang: Bool
+              If true swat-em tries to identify shorter winding overhangs
+        draw_poles: Bool
+              If true the poles of the rotor are drawn
+        show: Bool
+              If true the window pops up for interactive usage
+        """
+        self._plot(
+            "polar_layout",
+            filename,
+            res,
+            show,
+            optimize_overhang=optimize_overhang,
+            draw_poles=draw_poles,
+        )
 
     def save_to_file(self, fname):
         """
@@ -1161,15 +1434,65 @@ class datamodel:
 
     def get_text_report(self):
         """
-        Returns a winding report. 
+        Returns a winding report. The report is cached until the
+        winding is changed.
 
         Return
         ----------
         report :  string
                   Report
         """
-        txt_rep = rep.TextReport(self)
-        return txt_rep.get_report()
+        report = self.results.get("text_report")
+        if report is None:
+            txt_rep = rep.TextReport(self)
+            report = self.results["text_report"] = txt_rep.get_report()
+        return report
+
+    def get_hash(self):
+        """
+        Returns a hash of the winding. Windings which are identical up
+        to a rotation of the slots, mirroring, naming of the phases or
+        inversion of all winding directions have the same hash.
+
+        Returns
+        -------
+        hash: string
+              hash (hexadecimal)
+        """
+        return analyse.winding_hash(
+            self.get_phases(),
+            self.get_num_slots(),
+            self.get_num_polepairs(),
+            self.get_turns(),
+        )
+
+    def reset_wdg_overhang(self):
+        """
+        Remove the cached winding overhang
+        """
+        if hasattr(self, "results"):
+            self.results.pop("wdg_overhang", None)
+        self.reset_text_report()  # the report contains the overhang
+
+    def reset_text_report(self):
+        """
+        Remove the cached text report
+        """
+        if hasattr(self, "results"):
+            self.results.pop("text_report", None)
+        self._revision = self.get_revision() + 1
+
+    def get_revision(self):
+        """
+        Returns a counter, which is increased by every change of the
+        winding which invalidates cached results (for example for
+        results, which are calculated by background jobs)
+
+        Returns
+        -------
+        revision : integer
+        """
+        return getattr(self, "_revision", 0)
 
     def get_wdg_overhang(self, optimize_overhang=False):
         """
@@ -1189,20 +1512,27 @@ class datamodel:
                  stepwidth: distance between from_slot to to_slot
                  direction: winding direction (1: from left to right, -1: from right to left)
                  layer: tuple of the layer of 'from_slot' and 'to_slot' 
+                 The result is cached until the winding layout, the
+                 coil span or the number of slots is changed.
         """
+        w = self.get_coilspan()
+        key = "optimized" if optimize_overhang else str(w)
+        cache = self.results.get("wdg_overhang")
+        if cache is None:
+            cache = self.results["wdg_overhang"] = {}
+        if key in cache:
+            return cache[key]
+
         S = self.get_phases()
         Q = self.get_num_slots()
-        w = self.get_coilspan()
         num_layers = self.get_num_layers()
 
-        # TODO: Test if wdg_overhang is already calculated
-
         ovh = analyse.create_wdg_overhang(S, Q, num_layers)
         if optimize_overhang:
             head = ovh.get_overhang(w=None)
         else:
             head = ovh.get_overhang(w=w)
-
+        cache[key] = head
         return head
 
 
@@ -1292,15 +1622,28 @@ class project:
                 return name
             i += 1
 
-    def add_model(self, data):
+    def add_model(self, data, skip_duplicates=False):
         """
         adds 'data' model to project. Generates a unique title if there
-        is no title in 'data'
-        """
+        is no title in 'data'. If 'skip_duplicates' is True the model
+        isn't added if there is an equivalent winding (see
+        datamodel.get_hash) in the project.
+
+        Returns
+        -------
+        idx: integer
+             index of the added (or the equivalent) model
+        """
+        if skip_duplicates:
+            h = data.get_hash()
+            for k, m in enumerate(self.models):
+                if m.get_hash() == h:
+                    return k
         if data.title == "":
             name = self.gen_model_name()
             data.set_title(name)
         self.models.append(data)
+        return len(self.models) - 1
 
     def get_titles(self):
         """returns the title of all models"""
@@ -1337,10 +1680,78 @@ class project:
         """replaces the model of index 'idx' with 'newmodel' """
         self.models[idx] = newmodel
 
-    def analyse_all_models(self):
-        """analyse/recalculate all existing models"""
-        for m in self.models:
-            m.analyse_wdg()
+    def analyse_all_models(self, workers=1):
+        """
+        analyse/recalculate all existing models
+
+        Parameters
+        ----------
+        workers : integer
+                  number of processes, None: number of cpus. The results
+                  of the processes are transported by shared memory
+                  (see sharedresults)
+        """
+        if workers == 1 or len(self.models) < 2:
+            for m in self.models:
+                m.analyse_wdg()
+        else:
+            from swat_em import sharedresults
+
+            sharedresults.analyse_models(self.models, workers)
+
+    def export_xlsx(self, fname):
+        """
+        Export the results of all models to one Excel xlsx file with a
+        summary sheet and the sheets of every model (see
+        report.export_xlsx)
+
+        Parameters
+        ----------
+        fname :  string
+                 file name
+        """
+        rep.export_xlsx(fname, self.models)
+
+    def export_results(self, fname, keys=None, nu=None):
+        """
+        Export the main results of all models as one table (one row per
+        model) to a CSV, JSON Lines or numpy (*.npz) file, depending on
+        the file extension (see sweep.to_file)
+
+        Parameters
+        ----------
+        fname :  string
+                 file name
+        keys :   list of strings
+                 columns to export (default: sweep.EXPORT_COLUMNS)
+        nu :     list of integers
+                 ordinal numbers for additional winding factor columns
+        """
+        from swat_em import sweep
+
+        sweep.to_file(sweep.iter_models(self.models), fname, keys=keys, nu=nu)
+
+    def export_reports(self, directory, formats=("html",), workers=None):
+        """
+        Writes the reports of all models in parallel processes and an
+        index page 'index.html' with links to the reports (see
+        report.export_reports)
+
+        Parameters
+        ----------
+        directory : string
+                    output directory
+        formats :   list
+                    report formats: 'html', 'txt' and/or 'xlsx'
+        workers :   integer
+                    number of processes, None: number of cpus
+
+        Returns
+        -------
+        fname :     string
+                    file name of the index page
+        """
+        return rep.export_reports(self.models, directory, formats, workers)
 
     def save_to_file(self, fname):
         """
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from qtpy import uic
-from qtpy.QtWidgets import QDialog, QApplication, QMessageBox, QTableWidgetItem
+from qtpy.QtWidgets import QDialog, QApplication, QMessageBox
 from qtpy.QtGui import QIntValidator
-from qtpy import QtGui
 from qtpy import QtCore
 import numpy as np
 import sys
 import os
+import shutil
+import tempfile
 
 import pyqtgraph as pg
 import pyqtgraph.exporters
@@ -19,14 +20,19 @@ pg.setConfigOptions(antialias=True)
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from swat_em import wdggenerator
 from swat_em import datamodel
+from swat_em import sweep
+from swat_em import tablemodels
+from swat_em.plots import pointindex
 from swat_em.config import config, get_phase_color, get_line_color
-from swat_em.report import num2str
 
 if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
     __dir__ = sys._MEIPASS  # for pyinstaller
 else:
     __dir__ = os.path.dirname(os.path.abspath(__file__))
 
+MAX_INDEX_LABELS = 200  # index numbers are shown only for less visible points
+PICK_RADIUS = 6  # tolerance in pixel for clicking on a point
+
 
 class CombSniffer(QDialog):
     def __init__(self):
@@ -64,14 +70,39 @@ class CombSniffer(QDialog):
         self.radioButton_Pfix.toggled.connect(self.change_Pfix)
         self.Button_find.clicked.connect(self.calc)
         self.Button_cp2clipboard_image.clicked.connect(self.cp2clipboard)
-        self.comboBox_xaxis.currentIndexChanged.connect(self.update_plot)
-        self.comboBox_yaxis.currentIndexChanged.connect(self.update_plot)
-        self.checkBox_show_indices.toggled.connect(self.plot_indices)
+        self.pareto_options = [
+            ("all windings", None),
+            ("Pareto: max x, max y", ("max", "max")),
+            ("Pareto: max x, min y", ("max", "min")),
+            ("Pareto: min x, max y", ("min", "max")),
+            ("Pareto: min x, min y", ("min", "min")),
+        ]
+        for txt, _ in self.pareto_options:
+            self.comboBox_pareto.addItem(txt)
 
-        self.tableWidget.itemSelectionChanged.connect(self.on_table_selection)
+        self.comboBox_xaxis.currentIndexChanged.connect(self.change_axis)
+        self.comboBox_yaxis.currentIndexChanged.connect(self.change_axis)
+        self.checkBox_show_indices.toggled.connect(self.plot_indices)
+        self.lineEdit_filter.returnPressed.connect(self.apply_filter)
+        self.comboBox_pareto.currentIndexChanged.connect(self.apply_filter)
+
+        self.table_model = tablemodels.columntablemodel()
+        self.tableWidget.setModel(self.table_model)
+        self.tableWidget.setSortingEnabled(True)
+        self.tableWidget.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.tableWidget.selectionModel().currentRowChanged.connect(
+            self.on_table_selection
+        )
+        self.layout_model = tablemodels.layouttablemodel()
+        self.tableWindingLayout.setModel(self.layout_model)
 
         self.progressBar.setValue(0)
 
+        # results are stored on disk instead of keeping all windings
+        self.store_dir = tempfile.mkdtemp(prefix="swat-em-")
+        self.store = None
+        self.wdg_cache = {}
+
         self.init_plot()
         self.reset_data()
 
@@ -128,105 +159,83 @@ class CombSniffer(QDialog):
         else:
             es = 0
 
-        Qlist = []
-        Plist = []
-        wlist = []
-        layerslist = []
-        for Q_ in Qrange:
-            for P_ in Prange:
-                for l_ in layers:
-                    if l_ == 2:
-                        w = Q_ / P_
-                        if w >= 2:
-                            for w_ in range(1, int(w) + 1):
-                                Qlist.append(Q_)
-                                Plist.append(P_)
-                                wlist.append(w_)
-                                layerslist.append(l_)
-                        else:
-                            Qlist.append(Q_)
-                            Plist.append(P_)
-                            wlist.append(-1)
-                            layerslist.append(l_)
-                    else:
-                        Qlist.append(Q_)
-                        Plist.append(P_)
-                        wlist.append(-1)
-                        layerslist.append(l_)
-
-        num_combinations = len(Qlist)
-        #  print('Num combinations:', num_combinations)
-        #  print('Qlist', Qlist)
-        #  print('Plist', Plist)
-        #  print('wlist', wlist)
-        #  print('layerslist', layerslist)
-
         self.progressBar.setValue(0)
-        self.wdg_list = []
-        self.bc_list = []
-        for k in range(num_combinations):
-            wdg = datamodel()
-            wdg.genwdg(
-                Qlist[k],
-                Plist[k],
-                m=m,
-                layers=layerslist[k],
-                w=wlist[k],
-                empty_slots=es,
-                analyse=False,
-            )
-            kw1 = wdg.get_fundamental_windingfactor()
-            #  print('Q', Qlist[k])
-            #  print('P', Plist[k])
-            #  print('w', wlist[k])
-            #  print('layers', layerslist[k])
-            #  print('kw1', kw1)
-
-            if kw1 is not None:
-                if kw1[0] > 0.01:
-                    bc, bc_str = wdg.get_basic_characteristics()
-                    if bc["sym"]:
-                        self.wdg_list.append(wdg)
-                        self.bc_list.append(bc)
-            self.progressBar.setValue(100 / num_combinations * (k + 1))
-
-        self.data = {}
-        self.data["idx"] = list(range(len(self.wdg_list)))
-        self.data["Q"] = [wdg.get_num_slots() for wdg in self.wdg_list]
-        self.data["P"] = [2 * wdg.get_num_polepairs() for wdg in self.wdg_list]
-        self.data["m"] = [wdg.get_num_phases() for wdg in self.wdg_list]
-        self.data["q"] = [bc["q"] for bc in self.bc_list]
-        self.data["w"] = []
-        for wdg in self.wdg_list:
-            w = wdg.get_coilspan()
-            if type(w) == type([]):
-                self.data["w"].append(np.mean(w))
-            else:
-                self.data["w"].append(w)
+        self.store = sweep.sweep(
+            tempfile.mkdtemp(dir=self.store_dir),
+            Qrange,
+            Prange,
+            m,
+            layers,
+            empty_slots=es,
+            workers=config["num_workers"],
+            callback=lambda val: self.progressBar.setValue(int(val)),
+        )
+        self.wdg_cache = {}
 
-        self.data["kw1"] = [bc["kw1"][0] for bc in self.bc_list]
-        self.data["sigma_d"] = [bc["sigma_d"] for bc in self.bc_list]
-        self.data["a"] = [bc["a"] for bc in self.bc_list]
-        self.data["t"] = [bc["t"] for bc in self.bc_list]
-        self.data["r1"] = [bc["r"][0] for bc in self.bc_list]
-        self.data["lcmQP"] = [bc["lcmQP"] for bc in self.bc_list]
+        self.data_all = {}
+        self.data_all["idx"] = np.arange(len(self.store))
+        for key in self.plot_keys[1:]:
+            self.data_all[key] = self.store[key]
 
         # make shure that keys for data are the same as the
         # items in the combo boxes of the axis to plot
-        assert set(self.data.keys()) == set(self.plot_keys)
+        assert set(self.data_all.keys()) == set(self.plot_keys)
 
-        self.update_data_in_gui()
+        self.apply_filter()
         #  print('data', data)
         #  print('fertig')
         #  print('kw1:', kw1)
 
+    def apply_filter(self):
+        """
+        show only the windings which fulfill the filter expression
+        and (optional) are part of the Pareto front
+        """
+        if self.store is None:
+            return
+        expr = str(self.lineEdit_filter.text()).strip()
+        try:
+            rows = self.store.query(expr) if expr else np.arange(len(self.store))
+        except (ValueError, KeyError) as e:
+            self.textBrowser_wdginfo.setHtml("Invalid filter: {}".format(e))
+            return
+
+        directions = self.pareto_options[self.comboBox_pareto.currentIndex()][1]
+        if directions is not None:
+            x_key = str(self.comboBox_xaxis.currentText())
+            y_key = str(self.comboBox_yaxis.currentText())
+            objectives = [(x_key, directions[0]), (y_key, directions[1])]
+            rows = sweep.pareto_front(self.data_all, objectives, rows)
+
+        self.data = {key: value[rows] for key, value in self.data_all.items()}
+        self.scatter_marker_index = None
+        self.update_data_in_gui()
+
+    def change_axis(self):
+        if self.pareto_options[self.comboBox_pareto.currentIndex()][1] is None:
+            self.update_plot()
+        else:
+            self.apply_filter()
+
+    def get_position(self, idx):
+        """
+        Returns the position of the winding with index 'idx' in the
+        (filtered) data or None if it isn't shown
+        """
+        if idx is None or len(self.data) == 0:
+            return None
+        pos = int(np.searchsorted(self.data["idx"], idx))
+        if pos < len(self.data["idx"]) and self.data["idx"][pos] == idx:
+            return pos
+        return None
+
     def update_data_in_gui(self):
         self.update_plot()
         self.fill_table()
         self.textBrowser_wdginfo.setHtml(
-            "{} valid windings found!<br><br>Click on a point in the \
+            "{} valid windings found ({} shown)!<br><br>Click on a point in the \
         graphic window to get more informations!".format(
-                len(self.wdg_list)
+                len(self.store), len(self.data["idx"])
             )
         )
 
@@ -235,19 +244,16 @@ class CombSniffer(QDialog):
         resetting all data before generating windings
         """
         self.data = {}
+        self.data_all = {}
         self.fig.clear()
         self.indices_text = []
+        self.point_index = None
+        self.marker = None
         self.scatter_marker_index = None
         self.textBrowser_wdginfo.setHtml('Click on "Find Winding"')
-        self.tableWindingLayout.clear()
-        self.tableWindingLayout.setRowCount(0)
-        self.tableWindingLayout.setColumnCount(0)
+        self.layout_model.clear()
 
-        self.tableWidget.blockSignals(True)
-        self.tableWidget.clear()
-        self.tableWidget.setRowCount(0)
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.blockSignals(False)
+        self.table_model.set_data([], {})
 
     def init_plot(self):
         """
@@ -258,12 +264,18 @@ class CombSniffer(QDialog):
         self.fig = pg.PlotWidget()
         self.layout.addWidget(self.fig)
         self.fig.showGrid(x=True, y=True)
+        self.fig.scene().sigMouseClicked.connect(self.on_plot_click)
+        self.fig.getPlotItem().vb.sigRangeChanged.connect(lambda: self.plot_indices())
+        self.marker = None
 
     def update_plot(self):
         """
         plot new data
         """
         self.fig.clear()
+        self.indices_text = []
+        self.point_index = None
+        self.marker = None
         # skip if there is no data to plot
         if len(self.data) == 0:
             return
@@ -273,68 +285,93 @@ class CombSniffer(QDialog):
         self.fig.setLabel("bottom", x_key)
         self.fig.setLabel("left", y_key)
 
-        penlist = [pg.mkPen(None)] * len(self.data[x_key])
-        size = [10] * len(self.data[x_key])
-
+        self.point_index = pointindex(self.data[x_key], self.data[y_key])
         self.scatter = pg.ScatterPlotItem()
-        self.scatter.setData(self.data[x_key], self.data[y_key])
-        self.scatter.setSize(size)
-        self.scatter.setPen(penlist)
-        self.scatter.sigClicked.connect(self.on_plot_click)
+        self.scatter.setData(
+            self.data[x_key], self.data[y_key], size=10, pen=pg.mkPen(None)
+        )
         self.fig.addItem(self.scatter)
-        self.plot_indices()
+
+        # highlighted point
+        self.marker = pg.ScatterPlotItem()
+        self.marker.setData(
+            [], [], size=15, pen=pg.mkPen(get_line_color(1), width=2), brush=None
+        )
+        self.fig.addItem(self.marker)
+        self.plot_marker(self.scatter_marker_index)
+
         self.fig.autoRange()
+        self.plot_indices()
         self.fig.show()
 
     def plot_marker(self, idx):
         """
         highlight point at index 'idx'
         """
-        penlist = [pg.mkPen(None)] * len(self.scatter.getData()[0])
-        size = [10] * len(penlist)
-        if idx is not None:
-            penlist[idx] = pg.mkPen(get_line_color(1), width=2)
-            size[idx] = 15
-        self.scatter.setPen(penlist)
+        if self.marker is None:
+            return
+        pos = self.get_position(idx)
+        if pos is None:
+            self.marker.setData([], [])
+        else:
+            self.marker.setData(
+                [self.point_index.x[pos]], [self.point_index.y[pos]]
+            )
 
     def plot_indices(self):
         """
-        plot the index numbers of all points as strings
+        plot the index numbers of the visible points as strings (only if
+        there are not too many points in the view)
         """
-        # skip if there is no data to plot
-        if len(self.data) == 0:
+        if self.point_index is None:
             return
-
+        idx = np.zeros(0, dtype=int)
         if self.checkBox_show_indices.isChecked():
-            x_key = str(self.comboBox_xaxis.currentText())
-            y_key = str(self.comboBox_yaxis.currentText())
-            for k in range(len(self.data[x_key])):
-                txt = pg.TextItem(str(k), anchor=(0.0, 0.0))
-                txt.setPos(self.data[x_key][k], self.data[y_key][k])
-                txt.setColor("k")
-                self.fig.addItem(txt, ignoreBounds=True)
-                self.indices_text.append(txt)
-        else:
-            for txt in self.indices_text:
-                self.fig.removeItem(txt)
+            (x0, x1), (y0, y1) = self.fig.getPlotItem().vb.viewRange()
+            idx = self.point_index.query_rect(x0, x1, y0, y1)
+            if len(idx) > MAX_INDEX_LABELS:
+                idx = idx[:0]
+
+        # reuse the existing text items
+        while len(self.indices_text) < len(idx):
+            txt = pg.TextItem("", anchor=(0.0, 0.0))
+            txt.setColor("k")
+            self.fig.addItem(txt, ignoreBounds=True)
+            self.indices_text.append(txt)
+        for k, txt in enumerate(self.indices_text):
+            if k < len(idx):
+                i = idx[k]
+                txt.setText(str(self.data["idx"][i]))
+                txt.setPos(self.point_index.x[i], self.point_index.y[i])
+                txt.show()
+            else:
+                txt.hide()
 
-    def on_plot_click(self, plot, points):
+    def on_plot_click(self, event):
         """
         User clicked on the plot
         """
-        idx = []
-        for point in points:
-            x, y = point.pos()
-            idx1 = x == self.scatter.getData()[0]
-            idx2 = y == self.scatter.getData()[1]
-            i = np.logical_and(idx1, idx2)
-            idx.append(np.where(i == True))
-        idx = np.array(idx).flatten()
-        idx = list(set(idx))
+        if self.point_index is None or event.button() != QtCore.Qt.LeftButton:
+            return
+        vb = self.fig.getPlotItem().vb
+        if not vb.sceneBoundingRect().contains(event.scenePos()):
+            return
+        pos = vb.mapSceneToView(event.scenePos())
+        px, py = vb.viewPixelSize()
+        hits = self.point_index.pick(
+            pos.x(), pos.y(), PICK_RADIUS * px, PICK_RADIUS * py
+        )
+        if len(hits) == 0:
+            return
+
+        # all windings at the position of the nearest point
+        x, y = self.point_index.x, self.point_index.y
+        hits = hits[(x[hits] == x[hits[0]]) & (y[hits] == y[hits[0]])]
+        idx = [int(self.data["idx"][i]) for i in np.sort(hits)]
 
         # if there is one ore more points selected
         if len(idx) > 1:
-            DIALOG = select_index(self.wdg_list, idx)
+            DIALOG = select_index(self.get_wdg, idx)
             idx = DIALOG.run()
             if idx is None:
                 return
@@ -352,32 +389,25 @@ class CombSniffer(QDialog):
         img = self.widget.grab()
         QApplication.clipboard().setImage(img.toImage())
 
+    def get_wdg(self, idx):
+        """
+        Returns the winding with index 'idx' from the result store
+        """
+        idx = int(idx)
+        if idx not in self.wdg_cache:
+            self.wdg_cache[idx] = self.store.get_datamodel(idx, analyse=False)
+        return self.wdg_cache[idx]
+
     def combination_selected_in_table(self, sel):
         """
         user selected a cell/winding combination
         """
-        d = self.wdg_list[sel]
+        d = self.get_wdg(sel)
         bc, bc_text = d.get_basic_characteristics()
         self.textBrowser_wdginfo.setHtml(bc_text)
 
-        table = self.tableWindingLayout
-        table.clear()
-        table.setRowCount(d.get_num_layers())
-        table.setColumnCount(d.get_num_slots())
-
-        l, ls, lcol = d.get_layers()
-        for k1 in range(np.shape(l)[0]):
-            for k2 in range(np.shape(l)[1]):
-                table.setItem(k1, k2, QTableWidgetItem(ls[k1, k2]))
-                item = table.item(k1, k2)
-                if item:
-                    item.setBackground(QtGui.QColor(lcol[k1, k2]))
-                table.item(k1, k2).setFlags(
-                    QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
-                )
-
-        for k1 in range(d.get_num_slots()):
-            table.resizeColumnToContents(k1)
+        self.layout_model.set_winding(d)
+        self.tableWindingLayout.resizeColumnsToContents()
 
     def fill_table(self):
         """
@@ -387,42 +417,18 @@ class CombSniffer(QDialog):
         if len(self.data) == 0:
             return
 
-        table = self.tableWidget
-        table.clear()
-        table.setRowCount(len(self.data["Q"]))
-        table.setColumnCount(len(self.data))
-        table.setSortingEnabled(True)
-
-        myFont = QtGui.QFont()
-        myFont.setBold(True)
-        for i, key in enumerate(self.plot_keys):
+        self.table_model.set_data(self.plot_keys, self.data)
+        self.tableWidget.resizeColumnsToContents()
 
-            table_header_item = QTableWidgetItem(key)
-            table_header_item.setFont(myFont)
-            table.setHorizontalHeaderItem(i, table_header_item)
-
-            for k in range(len(self.data[key])):
-                txt = num2str(self.data[key][k], maxlen=8)
-                table.setItem(k, i, QTableWidgetItem(txt))
-
-                #  item = QTableWidgetItem()
-                #  item.setData(QtCore.Qt.DisplayRole, self.data[key][k])
-                #  self.table.setItem(k, i, item)
-
-                table.item(k, i).setFlags(
-                    QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
-                )  # note editable
-            table.resizeColumnToContents(i)
-
-    def on_table_selection(self):
+    def on_table_selection(self, current=None, previous=None):
         """
         user selected a winding in the table
         """
-        #  row = mi.row()
-
-        table = self.tableWidget
-        row = table.currentRow()
-        idx = int(table.item(row, 0).text())
+        index = self.tableWidget.currentIndex()
+        if not index.isValid():
+            return
+        row = self.table_model.source_row(index.row())
+        idx = int(self.data["idx"][row])
         self.combination_selected_in_table(idx)
         self.scatter_marker_index = idx
         self.plot_marker(idx)
@@ -431,15 +437,16 @@ class CombSniffer(QDialog):
         """
         Select winding in the table after selecting a point in the plot
         """
-        table = self.tableWidget
-        for row in range(table.rowCount()):
-            i = int(table.item(row, 0).text())
-            if i == idx:
-                table.setCurrentCell(row, 0)
-                break
+        pos = self.get_position(idx)
+        if pos is not None:
+            row = self.table_model.view_row(pos)
+            index = self.table_model.index(row, 0)
+            self.tableWidget.setCurrentIndex(index)
+            self.tableWidget.scrollTo(index)
 
     def run(self):
         ok = self.exec_()
+        ret = None
         if ok:
             if self.scatter_marker_index is not None:
 
@@ -447,10 +454,9 @@ class CombSniffer(QDialog):
                     overwrite = True
                 else:
                     overwrite = False
-                wdg = self.wdg_list[self.scatter_marker_index]
-                w = self.data["w"][self.scatter_marker_index]
-                if int(w) != w:
-                    w = -1
+                wdg = self.get_wdg(self.scatter_marker_index)
+                w = self.store["w"][self.scatter_marker_index]
+                w = int(w) if int(w) == w else -1
                 ret = {
                     "Q": wdg.get_num_slots(),
                     "P": 2 * wdg.get_num_polepairs(),
@@ -460,8 +466,11 @@ class CombSniffer(QDialog):
                     "overwrite": overwrite,
                     "Qes": wdg.get_num_empty_slots(),
                 }
-                return ret
-        return None
+        self.store = None
+        self.data = {}
+        self.data_all = {}
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        return ret
 
 
 class select_index(QDialog):
@@ -470,10 +479,10 @@ class select_index(QDialog):
     than one point in the plot
     """
 
-    def __init__(self, wdg_list, indices):
+    def __init__(self, get_wdg, indices):
         super().__init__()
         uic.loadUi(os.path.join(__dir__, "ui", "CombSnifferSelIndix.ui"), self)
-        self.wdg_list = wdg_list
+        self.get_wdg = get_wdg
         self.indices = indices
         self.listWidget.currentRowChanged.connect(self.index_changed)
         self.fill_table()
@@ -494,7 +503,7 @@ class select_index(QDialog):
         """
         i = self.listWidget.currentRow()
         i = self.indices[i]
-        bc, bc_text = self.wdg_list[i].get_basic_characteristics()
+        bc, bc_text = self.get_wdg(i).get_basic_characteristics()
         self.textBrowser_wdginfo.setHtml(bc_text)
 
     def run(self):
@@ -1,19 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from qtpy import uic
-from qtpy.QtWidgets import QDialog, QApplication, QMessageBox, QTableWidgetItem
+from qtpy.QtWidgets import QDialog, QApplication, QMessageBox
 from qtpy.QtGui import QIntValidator
-from qtpy import QtGui
-from qtpy import QtCore
 
 #  from qtpy.QtCore import Qt
-import numpy as np
 import sys
 import os
+import fractions
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from swat_em import wdggenerator
 from swat_em import datamodel
+from swat_em import tablemodels
+from swat_em import sweep
 from swat_em.config import config, get_phase_color
 
 if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
@@ -67,6 +67,10 @@ class GenWinding2(QDialog):
         self.radioButton_slayer.toggled.connect(self.update)
         self.spinBox_w.valueChanged.connect(self.update)
 
+        self.layout_model = tablemodels.layouttablemodel()
+        self.tableWindingLayout.setModel(self.layout_model)
+        self.tableWindingLayout.horizontalHeader().setDefaultSectionSize(25)
+
         self.update()  # calc initial winding
 
     def change_layers(self):
@@ -100,8 +104,7 @@ class GenWinding2(QDialog):
         elif self.radioButton_dlayer.isChecked():
             self.layers = 2
 
-        self.table = self.tableWindingLayout
-        self.table.clear()
+        self.layout_model.clear()
         self.textBrowser_wdginfo.clear()
 
         self.data = datamodel()
@@ -119,23 +122,7 @@ class GenWinding2(QDialog):
         self.textBrowser_wdginfo.setHtml(bc_str)
 
         if bc["sym"] and self.data.generator_info["valid"]:
-            self.table.setRowCount(self.layers)
-            self.table.setColumnCount(self.data.get_num_slots())
-
-            l, ls, lcol = self.data.get_layers()
-            for k1 in range(np.shape(l)[0]):
-                for k2 in range(np.shape(l)[1]):
-                    self.table.setItem(k1, k2, QTableWidgetItem(ls[k1, k2]))
-                    item = self.table.item(k1, k2)
-                    if item:
-                        item.setBackground(QtGui.QColor(lcol[k1, k2]))
-                    self.table.item(k1, k2).setFlags(
-                        QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
-                    )
-
-            for k1 in range(self.data.get_num_slots()):
-                #  self.table.resizeColumnToContents(k1)
-                self.table.setColumnWidth(k1, 25)
+            self.layout_model.set_winding(self.data, layers=self.layers)
 
     def run(self):
         ok = self.exec_()
@@ -180,7 +167,13 @@ class GenWindingCombinations(QDialog):
         self.checkBox_toothcoil.toggled.connect(self.generate)
         self.checkBox_empty_slots.toggled.connect(self.generate)
 
-        self.tableCombinations.itemSelectionChanged.connect(self.combination_selected)
+        self.table_model = tablemodels.combinationtablemodel()
+        self.tableCombinations.setModel(self.table_model)
+        self.tableCombinations.selectionModel().selectionChanged.connect(
+            lambda: self.combination_selected()
+        )
+        self.layout_model = tablemodels.layouttablemodel()
+        self.tableWindingLayout.setModel(self.layout_model)
 
         # Fill combobox
         self.comboBox_plotval.addItems(
@@ -194,7 +187,9 @@ class GenWindingCombinations(QDialog):
                 "sigma_d (double linked leakage)",
             ]
         )
-        self.comboBox_plotval.currentIndexChanged.connect(self.update_table)
+        self.comboBox_plotval.currentIndexChanged.connect(
+            lambda: self.table_model.set_value_func(self.get_value_func())
+        )
         #  self.generate()
 
     def generate(self):
@@ -207,9 +202,9 @@ class GenWindingCombinations(QDialog):
         self.P2 = self.spinBox_P2.value()
         self.m = self.spinBox_m.value()
         if self.checkBox_toothcoil.isChecked():
-            wstep = 1
+            w_policy = "toothcoil"
         else:
-            wstep = -1
+            w_policy = "auto"
         if self.checkBox_empty_slots.isChecked():
             empty_slots = -1
         else:
@@ -227,104 +222,57 @@ class GenWindingCombinations(QDialog):
         #  self.Qlist = list(range(self.Q1, self.Q2+1, self.m))
         self.Plist = list(range(self.P1, self.P2 + 1, 2))
 
-        self.data = []
-        for iQ, kQ in enumerate(self.Qlist):
-            self.data.append([])
-            for iP, kP in enumerate(self.Plist):
-                d = datamodel()
-                d.set_machinedata(Q=kQ, m=self.m, p=kP / 2)
-                ret = wdggenerator.genwdg(
-                    kQ, kP, self.m, wstep, self.layers, empty_slots
-                )
-                if ret:
-                    if wstep == 1 and ret["wstep"] != 1:
-                        d.set_valid(False, "", "")
-                    else:
-                        d.set_phases(S=ret["phases"], w=ret["wstep"])
-                        d.set_valid(ret["valid"], ret["error"], ret["info"])
-                        d.set_num_empty_slots(ret["Qes"])
-                        bc, bc_str = d.get_basic_characteristics()
-
-                else:
-                    d.set_valid(False, "", "")
-                self.data[iQ].append(d)
+        rows = sweep.iter_combinations(
+            self.Qlist,
+            self.Plist,
+            self.m,
+            [self.layers],
+            w_policy=w_policy,
+            empty_slots=empty_slots,
+            skip_duplicates=False,
+        )
+        self.data = {(row["Q"], row["P"]): row for row in rows}
+        self.wdg_cache = {}
         self.update_table()
 
     def update_table(self):
-        self.table = self.tableCombinations
-        self.table.clear()
-
-        self.table.setRowCount(len(self.Qlist))
-        self.table.setColumnCount(len(self.Plist))
-
-        for i in range(len(self.Plist)):
-            table_header_item = QTableWidgetItem("2p=" + str(self.Plist[i]))
-            myFont = QtGui.QFont()
-            myFont.setBold(True)
-            table_header_item.setFont(myFont)
-            self.table.setHorizontalHeaderItem(i, table_header_item)
-
-        for i in range(len(self.Qlist)):
-            table_header_item = QTableWidgetItem("Q=" + str(self.Qlist[i]))
-            myFont = QtGui.QFont()
-            myFont.setBold(True)
-            table_header_item.setFont(myFont)
-            self.table.setVerticalHeaderItem(i, table_header_item)
-
-        for iQ, kQ in enumerate(self.Qlist):
-            self.data.append([])
-            for iP, kP in enumerate(self.Plist):
-                if (
-                    self.data[iQ][iP].generator_info["valid"]
-                    and self.data[iQ][iP].results["basic_char"]["sym"]
-                ):
-                    bc = self.data[iQ][iP].results["basic_char"]
-                    if bc["kw1"][0] > 0.01:
-                        idx = self.comboBox_plotval.currentIndex()
-                        if idx == 0:
-                            txt = str(round(bc["kw1"][0], 3))
-                        elif idx == 1:
-                            txt = str(bc["q"])
-                        elif idx == 2:
-                            txt = str(bc["t"])
-                        elif idx == 3:
-                            txt = str(bc["a"])
-                        elif idx == 4:
-                            txt = str(bc["lcmQP"])
-                        elif idx == 5:
-                            txt = str(bc["r"][0])
-                        elif idx == 6:
-                            txt = str(round(bc["sigma_d"], 3))
-
-                        self.table.setItem(iQ, iP, QTableWidgetItem(txt))
-                        q = bc["q"]
-
-                        if self.data[iQ][iP].get_coilspan() == 1:
-                            self.table.item(iQ, iP).setBackground(
-                                QtGui.QColor("#ADD8E6")
-                            )
-                        elif q.denominator == 1:
-                            self.table.item(iQ, iP).setBackground(
-                                QtGui.QColor("#E6C3AD")
-                            )
-                        else:
-                            self.table.item(iQ, iP).setBackground(
-                                QtGui.QColor("#BCFFBC")
-                            )
-                        if self.data[iQ][iP].get_num_empty_slots() != 0:
-                            self.table.item(iQ, iP).setBackground(
-                                QtGui.QColor("#E9AEE2")
-                            )
-                        self.table.item(iQ, iP).setFlags(
-                            QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
-                        )  # note editable
-
-        self.table.resizeColumnsToContents()
+        self.table_model.set_data(
+            self.Qlist, self.Plist, self.data, self.get_value_func()
+        )
+        self.tableCombinations.resizeColumnsToContents()
 
         # reset table with winding layout because there is noting choosed
-        self.tableWindingLayout.clear()
-        self.tableWindingLayout.setRowCount(0)
-        self.tableWindingLayout.setColumnCount(0)
+        self.layout_model.clear()
+
+    def get_value_func(self):
+        """
+        Returns a function, which returns the text of the choosen
+        value for a row of the sweep
+        """
+        idx = self.comboBox_plotval.currentIndex()
+        if idx == 0:
+            return lambda row: str(round(row["kw1"], 3))
+        elif idx == 1:
+            return lambda row: str(fractions.Fraction(row["q_num"], row["q_den"]))
+        elif idx == 2:
+            return lambda row: str(row["t"])
+        elif idx == 3:
+            return lambda row: str(row["a"])
+        elif idx == 4:
+            return lambda row: str(row["lcmQP"])
+        elif idx == 5:
+            return lambda row: str(row["r1"])
+        else:
+            return lambda row: str(round(row["sigma_d"], 3))
+
+    def get_wdg(self, row):
+        """
+        Returns the winding of a row of the sweep as datamodel object
+        """
+        key = (row["Q"], row["P"])
+        if key not in self.wdg_cache:
+            self.wdg_cache[key] = sweep.get_datamodel(row, analyse=False)
+        return self.wdg_cache[key]
 
     def combination_selected(self):
         """
@@ -333,38 +281,19 @@ class GenWindingCombinations(QDialog):
         sel = self.tableCombinations.selectedIndexes()
         if sel:
             sel = sel[0]
-            row = sel.row()
-            column = sel.column()
-            d = self.data[row][column]
-
-            if not d.generator_info["valid"]:
-                self.tableWindingLayout.clear()
-                return None, None
+            row = self.table_model.get_row(sel.row(), sel.column())
+            if row is None:
+                self.layout_model.clear()
+                return None
 
-            bc, bc_text = d.get_basic_characteristics()
+            bc, bc_text = self.get_wdg(row).get_basic_characteristics()
             self.textBrowser_wdginfo.setHtml(bc_text)
 
-            self.table = self.tableWindingLayout
-            self.table.clear()
-            self.table.setRowCount(self.layers)
-            self.table.setColumnCount(d.get_num_slots())
-
-            l, ls, lcol = d.get_layers()
-            for k1 in range(np.shape(l)[0]):
-                for k2 in range(np.shape(l)[1]):
-                    self.table.setItem(k1, k2, QTableWidgetItem(ls[k1, k2]))
-                    item = self.table.item(k1, k2)
-                    if item:
-                        item.setBackground(QtGui.QColor(lcol[k1, k2]))
-                    self.table.item(k1, k2).setFlags(
-                        QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
-                    )
-
-            for k1 in range(d.get_num_slots()):
-                self.table.resizeColumnToContents(k1)
-            return row, column
+            self.layout_model.set_layout(row["layout"])
+            self.tableWindingLayout.resizeColumnsToContents()
+            return row
         else:
-            return None, None
+            return None
 
     def run(self):
         self.generate()
@@ -374,15 +303,16 @@ class GenWindingCombinations(QDialog):
                 overwrite = True
             else:
                 overwrite = False
-            row, column = self.combination_selected()
+            row = self.combination_selected()
             if row is not None:
+                w = row["w"]
                 ret = {}
-                ret["Q"] = self.data[row][column].get_num_slots()
-                ret["P"] = 2 * self.data[row][column].get_num_polepairs()
-                ret["m"] = self.data[row][column].get_num_phases()
-                ret["w"] = self.data[row][column].get_coilspan()
+                ret["Q"] = row["Q"]
+                ret["P"] = row["P"]
+                ret["m"] = row["m"]
+                ret["w"] = int(w) if int(w) == w else -1
                 ret["layers"] = self.layers
-                ret["Qes"] = self.data[row][column].get_num_empty_slots()
+                ret["Qes"] = row["Qes"]
                 ret["overwrite"] = overwrite
                 return ret
             else:
@@ -1,10 +1,9 @@
 from qtpy import uic
-from qtpy import QtGui
-from qtpy.QtWidgets import QDialog, QTableWidgetItem, QMessageBox
+from qtpy.QtWidgets import QDialog, QMessageBox
 from qtpy.QtGui import QDoubleValidator
-import numpy as np
-from swat_em.config import get_phase_color, config
+from swat_em.config import config
 from swat_em.analyse import _get_float
+from swat_em import tablemodels
 import os
 import sys
 
@@ -14,19 +13,6 @@ else:
     __dir__ = os.path.dirname(os.path.abspath(__file__))
 
 
-def get_int_from_str(txt):
-    """
-    converts txt to a integer number and returns this number
-    return None if txt is not a number
-    """
-    try:
-        number = int(txt)
-        if number != 0:
-            return number
-    except:
-        return None
-
-
 class layout(QDialog):
     """
     This is a basic winding editor to define and change the 
@@ -46,8 +32,13 @@ class layout(QDialog):
         self.lineEditFixTurns.setValidator(QDoubleValidator())
 
         self.radioTurnsFix.toggled.connect(self.update_radio_turns)
-        self.tableWindingLayout.cellChanged.connect(self.update_colors)
-        self.tableWindingTurns.cellChanged.connect(self.update_colors)
+        self.table = self.tableWindingLayout
+        self.layout_model = tablemodels.layouttablemodel(editable=True)
+        self.turns_model = tablemodels.turnstablemodel(self.layout_model)
+        self.tableWindingLayout.setModel(self.layout_model)
+        self.tableWindingTurns.setModel(self.turns_model)
+        self.layout_model.dataChanged.connect(lambda: self.update_colors())
+        self.turns_model.dataChanged.connect(lambda: self.update_colors())
         self.update_table()
         self.update_table_turns()
         if type(self.data.get_turns()) == type([]):
@@ -109,148 +100,60 @@ class layout(QDialog):
             self.radioButton_dlayer.setChecked(True)
 
     def update_table(self, layers=None):
-        self.table = self.tableWindingLayout
-        self.table.blockSignals(True)
-        self.table.setColumnCount(self.data.get_num_slots())
-
-        head = ["Layer 1", "Layer 2"]
         if not layers:
             layers = self.data.get_num_layers()
-        self.table.setRowCount(layers)
-        self.table.setVerticalHeaderLabels(head[:layers])
-
-        l, ls, lcol = self.data.get_layers()
-        for k1 in range(np.shape(l)[0]):
-            for k2 in range(np.shape(l)[1]):
-                self.table.setItem(k1, k2, QTableWidgetItem(ls[k1, k2]))
-                item = self.table.item(k1, k2)
-                if item:
-                    item.setBackground(QtGui.QColor(lcol[k1, k2]))
-
-        for k1 in range(self.data.get_num_slots()):
-            self.table.resizeColumnToContents(k1)
-        self.table.blockSignals(False)
+        self.layout_model.set_winding(self.data, layers=layers)
+        self.table.resizeColumnsToContents()
 
     def update_table_turns(self):
-        table = self.tableWindingTurns
-        Nx = self.tableWindingLayout.columnCount()
-        Ny = self.tableWindingLayout.rowCount()
-        table.setRowCount(Ny)
-        table.setColumnCount(Nx)
-
-        head = ["Layer 1", "Layer 2"]
-        layers = self.data.get_num_layers()
-        table.setRowCount(layers)
-        table.setVerticalHeaderLabels(head[:layers])
-
-        phases = self.data.get_phases()
-        turns = self.data.get_turns()
-
-        for km, ph in enumerate(phases):
-            col = get_phase_color(km)
-            for kl in range(len(ph)):
-                layer = ph[kl]
-                for i, cs in enumerate(layer):
-                    if type(turns) == type([]):
-                        item = QTableWidgetItem(str(turns[km][kl][i]))
-                    else:
-                        item = QTableWidgetItem(str(turns))
-                    item.setBackground(QtGui.QColor(col))
-                    if cs > 0:
-                        table.setItem(kl, cs - 1, item)
-                    else:
-                        table.setItem(kl, abs(cs) - 1, item)
-
-        # test if there are cells without a value (occures if Q is changed)
-        for k1 in range(self.data.get_num_layers()):
-            for k2 in range(self.data.get_num_slots()):
-                item = table.item(k1, k2)
-                if item == None:
-                    item = QTableWidgetItem("0")
-                    table.setItem(k1, k2, item)
-
-        for k1 in range(self.data.get_num_slots()):
-            table.resizeColumnToContents(k1)
+        self.turns_model.set_winding(self.data)
+        self.tableWindingTurns.resizeColumnsToContents()
 
     def read_layout(self):
         """
         Read layout from table
         """
         S = []
-        for layer in [0, 1]:
-            for k in range(self.data.get_num_slots()):
-                item = self.table.item(layer, k)
-                if item:
-                    txt = str(item.text())
-                    num = get_int_from_str(txt)
-                    if num:
-                        phase = num
-                        sign = 1 if phase > 0 else -1
-                        while len(S) < abs(phase):
-                            S.append([[], []])
-                        S[abs(phase) - 1][layer].append((k + 1) * sign)
+        layout = self.layout_model.get_layout()
+        num_layers = max(layout.shape[0], 2)
+        for layer in range(layout.shape[0]):
+            for k in range(min(layout.shape[1], self.data.get_num_slots())):
+                phase = int(layout[layer, k])
+                if phase:
+                    sign = 1 if phase > 0 else -1
+                    while len(S) < abs(phase):
+                        S.append([[] for kl in range(num_layers)])
+                    S[abs(phase) - 1][layer].append((k + 1) * sign)
         return S
 
     def read_turns(self):
         """
         Read layout from table
         """
-        table = self.tableWindingTurns
         if self.radioTurnsFix.isChecked():
             return None
         else:
             S = []
-            for layer in range(table.rowCount()):
-                for k in range(self.data.get_num_slots()):
-                    item = self.tableWindingLayout.item(layer, k)  # phase
-                    item2 = table.item(layer, k)  # turns
-                    if item:
-                        txt = str(item.text())
-                        num = get_int_from_str(txt)
-                        if num:
-                            phase = num
-                            sign = 1 if phase > 0 else -1
-                            while len(S) < abs(phase):
-                                S.append([[], []])
-                            fl = _get_float(item2.text())
-                            if fl is not None:
-                                S[abs(phase) - 1][layer].append(fl)
-                            else:
-                                S[abs(phase) - 1][layer].append(0.0)
+            layout = self.layout_model.get_layout()
+            turns = self.turns_model.get_turns()
+            num_layers = max(layout.shape[0], 2)
+            for layer in range(layout.shape[0]):
+                for k in range(min(layout.shape[1], self.data.get_num_slots())):
+                    phase = int(layout[layer, k])
+                    if phase:
+                        while len(S) < abs(phase):
+                            S.append([[] for kl in range(num_layers)])
+                        S[abs(phase) - 1][layer].append(float(turns[layer, k]))
         return S
 
     def update_colors(self):
         """
-        Update the colors in the table if the user defines phases here
-        Also there are some tests for the winding
+        Test the winding if the user defines phases here. The colors in
+        the table are updated by the table models.
         """
         error = []
         warning = []
 
-        for layer in [0, 1]:
-            for k in range(self.data.get_num_slots()):
-                item = self.table.item(layer, k)
-                item2 = self.tableWindingTurns.item(layer, k)
-                if item:
-                    txt = str(item.text())
-                    num = get_int_from_str(txt)
-                    if num:
-                        phase = abs(num)
-                        col = get_phase_color(phase - 1)
-                        item.setBackground(QtGui.QColor(col))
-                        if not self.radioTurnsFix.isChecked():
-                            item2.setBackground(QtGui.QColor(col))
-                            fl = _get_float(item2.text())
-                            if fl is None:
-                                item2.setText("0")
-                    else:
-                        item.setBackground(QtGui.QColor("white"))
-                        if not self.radioTurnsFix.isChecked():
-                            item2.setBackground(QtGui.QColor("white"))
-                            fl = _get_float(item2.text())
-                            if fl is None:
-                                item2.setText("0")
-
         # Test for errors
         S = self.read_layout()
         T = self.read_turns()
@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""
+Provides the geometry (slots, coils, magnets) of the winding plots.
+All outlines are created as numpy arrays in one step without loops over
+the slots. Lines with gaps are returned as one path with a 'connect'
+mask (connect[i] is True if point i is connected to point i+1).
+
+The results are cached by their parameters (number of slots, poles,
+coil spans and plot style) and shared by all plot widgets and
+exporters. The returned arrays are read-only.
+"""
+import functools
+import numpy as np
+
+# number of cached geometries per function
+CACHE_SIZE = 64
+
+
+def _readonly(*arrays):
+    for a in arrays:
+        a.flags.writeable = False
+    return arrays if len(arrays) > 1 else arrays[0]
+
+
+def _wrap_rows(x, y, xmax, dy):
+    """
+    Moves all points with x > xmax to the next row(s) (x - xmax, y - dy).
+    Returns the new coordinates and the row of every point.
+    """
+    row = np.maximum(np.ceil(x / xmax) - 1, 0).astype(int)
+    return x - row * xmax, y - row * dy, row
+
+
+def gen_coil_lines(w, h1=0.75, h2=1.5, db1=0.1, Np1=21):
+    """
+    Create lines of a coil for plotting.
+
+    Parameters
+    ----------
+    w :  integer
+         width of the coil in slots
+    h1:  float
+         height of the coil side in the slot
+    h2:  float
+         max height of the winding overhang
+    db1: float
+         distance of the coil side to the middle of the slot;
+         should be 0..0.2
+    Np1: integer
+         number of plotting points in the line of the winding overhang
+
+    Returns
+    -------
+    x : numpy array
+        x values of the coil for plotting
+    y : numpy array
+        y values of the coil for plotting
+    """
+    x_ = np.linspace(db1, w - db1, Np1)
+    y_ = np.interp(x_, [db1, w / 2, w - db1], [h1, h2, h1])
+    x = np.empty(2 * Np1 + 1)
+    y = np.empty(2 * Np1 + 1)
+    x[:Np1], y[:Np1] = x_, y_
+    x[Np1:-1], y[Np1:-1] = x_[::-1], -y_[::-1]
+    x[-1], y[-1] = x[0], y[0]
+    return x, y
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_slot_lines(Q, bz, hz):
+    """
+    Create lines of a slot for plotting.
+
+    Parameters
+    ----------
+    q :  integer
+         number of slots
+    bz:  float
+         width of the tooth -> Slot width = 1 - bz
+         so bz should be around 0.5
+    hz:  float
+         height of the slots
+
+    Returns
+    -------
+    x : numpy array
+        x values of the slots for plotting (separated by nan)
+    y : numpy array
+        y values of the slots for plotting (separated by nan)
+    """
+    x0, x1 = gen_tooth_rects(Q, bz)
+    x = np.empty((Q + 1, 6))
+    x[:, [0, 1, 4]] = x0[:, None]
+    x[:, [2, 3]] = x1[:, None]
+    x[:, 5] = np.nan
+    y = np.empty((Q + 1, 6))
+    y[:] = [-hz, hz, hz, -hz, -hz, np.nan]
+    return _readonly(x.ravel(), y.ravel())
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_slot_filling(Q, bz, hz):
+    """
+    Create lines of a slot for plotting.
+
+    Parameters
+    ----------
+    q :  integer
+         number of slots
+    bz:  float
+         width of the tooth -> Slot width = 1 - bz
+         so bz should be around 0.5
+    hz:  float
+         height of the slots
+
+    Returns
+    -------
+    x : numpy array
+        x values of the slots for plotting
+    y : numpy array
+        y values (upper lines) of the slots for plotting
+    y_neg : numpy array
+        y values (lower lines) of the slots for plotting
+    """
+    x0, x1 = gen_tooth_rects(Q, bz)
+    x = np.column_stack([x0, x1, np.full(Q + 1, np.nan)]).ravel()
+    y = np.tile([hz, hz, np.nan], Q + 1)
+    return _readonly(x, y, -y)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_tooth_rects(Q, bz):
+    """
+    Create the rectangles of the teeth for plotting (x direction)
+
+    Parameters
+    ----------
+    Q :  integer
+         number of slots
+    bz:  float
+         width of the tooth
+
+    Returns
+    -------
+    x0 : numpy array
+         left border of the teeth
+    x1 : numpy array
+         right border of the teeth
+    """
+    xm = np.arange(Q + 1) - 0.5
+    x0 = np.maximum(xm - bz / 2, -0.5)
+    x1 = np.minimum(xm + bz / 2, Q - 0.5)
+    return _readonly(x0, x1)
+
+
+def get_coils(overhang):
+    """
+    Returns the coils of one phase of the winding overhang
+    (see datamodel.get_wdg_overhang) as hashable key for the geometry
+    functions: tuple of (first slot, coil span)
+    """
+    return tuple(
+        (int(c[0][0] if c[2] > 0 else c[0][1]), float(c[1])) for c in overhang
+    )
+
+
+def gen_coil_paths(coils, Q, h1=0.75, db1=0.1, Np1=21):
+    """
+    Create the lines of all coils of a phase for plotting as one path.
+    The shape of the coils is the same as in 'gen_coil_lines' with the
+    height of the winding overhang h2 = 0.5 + w/6. Parts of the coils
+    beyond the last slot are moved to the beginning.
+
+    Parameters
+    ----------
+    coils : list
+            coils of the winding overhang of one phase
+            (see datamodel.get_wdg_overhang) or the key from 'get_coils'
+    Q :     integer
+            number of slots
+    h1:     float
+            height of the coil side in the slot
+    db1:    float
+            distance of the coil side to the middle of the slot
+    Np1:    integer
+            number of plotting points in the line of the winding overhang
+
+    Returns
+    -------
+    x :       numpy array
+              x values of the coils for plotting
+    y :       numpy array
+              y values of the coils for plotting
+    connect : numpy array
+              connect[i] is True if point i is connected to point i+1
+    """
+    if len(coils) > 0 and len(coils[0]) > 2:
+        coils = get_coils(coils)
+    return _coil_paths(tuple(coils), Q, h1, db1, Np1)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _coil_paths(coils, Q, h1, db1, Np1):
+    if len(coils) == 0:
+        return _readonly(np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool))
+    start, w = np.array(coils, dtype=float).T[:, :, None]
+    h2 = 0.5 + w / 6
+
+    t = np.linspace(0.0, 1.0, Np1)[None, :]
+    x_ = db1 + t * (w - 2 * db1)
+    y_ = h1 + (h2 - h1) * (1 - np.abs(2 * t - 1))
+    x = np.empty((len(coils), 2 * Np1 + 1))
+    y = np.empty((len(coils), 2 * Np1 + 1))
+    x[:, :Np1], y[:, :Np1] = x_, y_
+    x[:, Np1:-1], y[:, Np1:-1] = x_[:, ::-1], -y_[:, ::-1]
+    x[:, -1], y[:, -1] = x_[:, 0], y_[:, 0]
+    x += start - 1
+
+    # split coil on right border
+    wrap = x > Q - 0.5
+    x[wrap] -= Q
+    connect = np.zeros(x.shape, dtype=bool)
+    connect[:, :-1] = wrap[:, :-1] == wrap[:, 1:]
+    return _readonly(x.ravel(), y.ravel(), connect.ravel())
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_slot_rows(Q, Qxmax, sh, sw, so, dy):
+    """
+    Create the outline of the slots for the slot plot. The slots are
+    arranged in rows of 'Qxmax' slots.
+
+    Parameters
+    ----------
+    Q :     integer
+            number of slots
+    Qxmax : integer
+            number of slots per row
+    sh :    float
+            slot height
+    sw :    float
+            slot width
+    so :    float
+            slot opening
+    dy :    float
+            distance of the rows
+
+    Returns
+    -------
+    x :       numpy array
+              x values of the slots for plotting
+    y :       numpy array
+              y values of the slots for plotting
+    connect : numpy array
+              connect[i] is True if point i is connected to point i+1
+    """
+    xs = np.array(
+        [0.0, 0.5 - so / 2, 0.5 - so / 2, 0.5 - sw / 2, 0.5 - sw / 2]
+        + [0.5 + sw / 2, 0.5 + sw / 2, 0.5 + so / 2, 0.5 + so / 2, 1.0]
+    )
+    ys = np.array([1.0, 1.0, sh, sh, 0.0, 0.0, sh, sh, 1.0, 1.0])
+    k = np.arange(Q)
+    col, row = k % Qxmax, k // Qxmax
+    x = xs[None, :] + col[:, None]
+    y = ys[None, :] - dy * row[:, None]
+    connect = np.ones(x.shape, dtype=bool)
+    connect[col == Qxmax - 1, -1] = False
+    connect[-1, -1] = False
+    return _readonly(x.ravel(), y.ravel(), connect.ravel())
+
+
+def gen_slot_positions(slots, Qxmax, dy):
+    """
+    Returns the position of the middle of the slots in the slot plot
+    (see 'gen_slot_rows')
+
+    Parameters
+    ----------
+    slots : array_like
+            slot numbers (beginning with 1)
+    Qxmax : integer
+            number of slots per row
+    dy :    float
+            distance of the rows
+
+    Returns
+    -------
+    x :     numpy array
+    y :     numpy array
+    """
+    slots = np.asarray(slots, dtype=float)
+    x, y, row = _wrap_rows(slots, np.zeros(slots.shape), Qxmax, dy)
+    return x - 0.5, y
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_poles_linear(Q, P, alpha_m, Qxmax, dy, y0=1.1, Np=50):
+    """
+    Create the lines of the magnets for the slot plot
+
+    Parameters
+    ----------
+    Q :       integer
+              number of slots
+    P :       integer
+              number of poles
+    alpha_m : float
+              relative width of the magnets
+    Qxmax :   integer
+              number of slots per row
+    dy :      float
+              distance of the rows
+    y0 :      float
+              y position of the magnets in the first row
+    Np :      integer
+              number of plotting points per magnet
+
+    Returns
+    -------
+    lines : list
+            (x, y, connect) for the positive and the negative poles
+    """
+    x = np.linspace(0, Q / P * alpha_m, Np)
+    x += (1 - alpha_m) * Q / P / 2
+    lines = []
+    for kpole in [0, 1]:  # positive and negative Pole
+        shift = 2 * Q / P * np.arange(P // 2) + kpole * Q / P
+        x1 = (x[None, :] + shift[:, None]).ravel()
+        x1, y1, row = _wrap_rows(x1, np.full(x1.shape, y0), Qxmax, dy)
+        connect = np.ones(x1.shape, dtype=bool)
+        connect[Np - 1 :: Np] = False  # end of a magnet
+        connect[:-1][row[1:] != row[:-1]] = False  # end of a row
+        lines.append(_readonly(x1, y1, connect))
+    return lines
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def gen_poles_polar(P, alpha_m, r, Np=100):
+    """
+    Create the lines of the magnets for the polar plot
+
+    Parameters
+    ----------
+    P :       integer
+              number of poles
+    alpha_m : float
+              relative width of the magnets
+    r :       float
+              radius of the magnets
+    Np :      integer
+              number of plotting points per magnet
+
+    Returns
+    -------
+    lines : list
+            (x, y, connect) for the positive and the negative poles
+    """
+    alpha = np.linspace(0, 2 * np.pi / P * alpha_m, Np)
+    alpha -= np.max(alpha / 2)  # middle of the pole on alpha = 0°
+    lines = []
+    for kp in range(2):
+        # all north poles and all south poles as one line
+        shift = np.arange(kp, P, 2)[:, None] * 2 * np.pi / P
+        vec = r * np.exp(1j * (alpha[None, :] + shift))
+        connect = np.ones(vec.shape, dtype=bool)
+        connect[:, -1] = False
+        lines.append(
+            _readonly(vec.real.ravel(), vec.imag.ravel(), connect.ravel())
+        )
+    return lines
+
+
+def gen_polar_positions(slots, Q, r=1.0):
+    """
+    Returns the position (x, y) of slots in the polar plot
+
+    Parameters
+    ----------
+    slots : array_like
+            slot numbers (beginning with 0)
+    Q :     integer
+            number of slots
+    r :     float or array_like
+            radius
+
+    Returns
+    -------
+    x :     numpy array
+    y :     numpy array
+    """
+    vec = r * np.exp(2j * np.pi / Q * np.asarray(slots))
+    return vec.real, vec.imag
+
+
+def gen_star(vek, dangle=None):
+    """
+    Create the star of slot voltage phasors of one phase: all phasors
+    are drawn one after another
+
+    Parameters
+    ----------
+    vek :    array_like
+             complex phasors of the coil sides
+    dangle : float
+             all phasors get shifted by -dangle (rad)
+
+    Returns
+    -------
+    pts :    numpy array
+             complex start/end points of the phasors (len(vek)+1),
+             beginning with 0
+    angle :  numpy array
+             direction of the phasors in degree
+    """
+    vek = np.asarray(vek, dtype=complex)
+    if dangle is not None:
+        vek = vek * np.exp(-1j * dangle)
+    pts = np.zeros(len(vek) + 1, dtype=complex)
+    np.cumsum(vek, out=pts[1:])
+    return pts, np.angle(vek, deg=True)
+
+
+def clear_cache():
+    """
+    Removes all cached geometries
+    """
+    for func in [
+        gen_slot_lines,
+        gen_slot_filling,
+        gen_tooth_rects,
+        _coil_paths,
+        gen_slot_rows,
+        gen_poles_linear,
+        gen_poles_polar,
+    ]:
+        func.cache_clear()
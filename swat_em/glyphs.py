@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# The glyph data (DATA) is rasterized from the DejaVu Sans font. DejaVu
+# fonts are (c) Bitstream (see below). DejaVu changes are in public
+# domain. Glyphs imported from Arev fonts are (c) Tavmjong Bah (see
+# below). The license is also shipped in fonts/LICENSE_DejaVu.txt.
+#
+# Bitstream Vera Fonts Copyright
+# ------------------------------
+#
+# Copyright (c) 2003 by Bitstream, Inc. All Rights Reserved. Bitstream Vera is
+# a trademark of Bitstream, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of the fonts accompanying this license ("Fonts") and associated
+# documentation files (the "Font Software"), to reproduce and distribute the
+# Font Software, including without limitation the rights to use, copy, merge,
+# publish, distribute, and/or sell copies of the Font Software, and to permit
+# persons to whom the Font Software is furnished to do so, subject to the
+# following conditions:
+#
+# The above copyright and trademark notices and this permission notice shall
+# be included in all copies of one or more of the Font Software typefaces.
+#
+# The Font Software may be modified, altered, or added to, and in particular
+# the designs of glyphs or characters in the Fonts may be modified and
+# additional glyphs or characters may be added to the Fonts, only if the fonts
+# are renamed to names not containing either the words "Bitstream" or the word
+# "Vera".
+#
+# This License becomes null and void to the extent applicable to Fonts or Font
+# Software that has been modified and is distributed under the "Bitstream
+# Vera" names.
+#
+# The Font Software may be sold as part of a larger software package but no
+# copy of one or more of the Font Software typefaces may be sold by itself.
+#
+# THE FONT SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO ANY WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT OF COPYRIGHT, PATENT,
+# TRADEMARK, OR OTHER RIGHT. IN NO EVENT SHALL BITSTREAM OR THE GNOME
+# FOUNDATION BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, INCLUDING
+# ANY GENERAL, SPECIAL, INDIRECT, INCIDENTAL, OR CONSEQUENTIAL DAMAGES,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF
+# THE USE OR INABILITY TO USE THE FONT SOFTWARE OR FROM OTHER DEALINGS IN THE
+# FONT SOFTWARE.
+#
+# Except as contained in this notice, the names of Gnome, the Gnome
+# Foundation, and Bitstream Inc., shall not be used in advertising or
+# otherwise to promote the sale, use or other dealings in this Font Software
+# without prior written authorization from the Gnome Foundation or Bitstream
+# Inc., respectively. For further information, contact: fonts at gnome dot
+# org.
+#
+# Arev Fonts Copyright
+# ------------------------------
+#
+# Copyright (c) 2006 by Tavmjong Bah. All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of the fonts accompanying this license ("Fonts") and
+# associated documentation files (the "Font Software"), to reproduce
+# and distribute the modifications to the Bitstream Vera Font Software,
+# including without limitation the rights to use, copy, merge, publish,
+# distribute, and/or sell copies of the Font Software, and to permit
+# persons to whom the Font Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright and trademark notices and this permission notice
+# shall be included in all copies of one or more of the Font Software
+# typefaces.
+#
+# The Font Software may be modified, altered, or added to, and in
+# particular the designs of glyphs or characters in the Fonts may be
+# modified and additional glyphs or characters may be added to the
+# Fonts, only if the fonts are renamed to names not containing either
+# the words "Tavmjong Bah" or the word "Arev".
+#
+# This License becomes null and void to the extent applicable to Fonts
+# or Font Software that has been modified and is distributed under the
+# "Tavmjong Bah Arev" names.
+#
+# The Font Software may be sold as part of a larger software package but
+# no copy of one or more of the Font Software typefaces may be sold by
+# itself.
+#
+# THE FONT SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO ANY WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# OF COPYRIGHT, PATENT, TRADEMARK, OR OTHER RIGHT. IN NO EVENT SHALL
+# TAVMJONG BAH BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# INCLUDING ANY GENERAL, SPECIAL, INDIRECT, INCIDENTAL, OR CONSEQUENTIAL
+# DAMAGES, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF THE USE OR INABILITY TO USE THE FONT SOFTWARE OR FROM
+# OTHER DEALINGS IN THE FONT SOFTWARE.
+#
+# Except as contained in this notice, the name of Tavmjong Bah shall not
+# be used in advertising or otherwise to promote the sale, use or other
+# dealings in this Font Software without prior written authorization
+# from Tavmjong Bah. For further information, contact: tavmjong @ free
+# . fr.
+
+"""
+Bitmap font for the headless figure export (see render.py). The glyphs
+are rasterized from the DejaVu Sans font (Bitstream Vera license, see
+above) with a pixel size of 20 and stored as 4 bit alpha values (zlib
+compressed, base64 encoded). Every glyph has the height HEIGHT and the
+width of its advance.
+"""
+
+HEIGHT = 24  # height of the glyphs in pixel
+BASELINE = 19  # row of the baseline
+SIZE = 20  # pixel size of the font
+CHARS = (
+    ' !"#$%&\'()*+,-./0123456789:;<=>?'
+    '@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_'
+    '`abcdefghijklmnopqrstuvwxyz{|}~ν'
+    '°⊗⊙'
+)
+WIDTHS = [
+    6, 8, 9, 17, 13, 19, 16, 5, 8, 8, 10, 17, 6, 7, 6, 7, 13, 13, 13, 13, 13, 13,
+    13, 13, 13, 13, 7, 7, 17, 17, 17, 11, 20, 14, 14, 14, 15, 13, 12, 15, 15, 6, 6,
+    13, 11, 17, 15, 16, 12, 16, 14, 13, 12, 15, 14, 20, 14, 12, 14, 8, 7, 8, 17, 10,
+    10, 12, 13, 11, 13, 12, 7, 13, 13, 6, 6, 12, 6, 19, 13, 12, 13, 13, 8, 10, 8,
+    13, 12, 16, 12, 12, 10, 13, 7, 13, 17, 11, 10, 17, 17,
+]
+DATA = (
+    "eNrNWwuMXNdZ/u/cee7OzoxJQwVtvCOrFWkCniGqRFtKd6AWkRJgllRGaajYLQKjUkszrQivJswQ"
+    "ihRKkl0JEB3b69nSqklWeGcFBZXSejaoSupgmDGv4Jhy16aosdfZu7szs4953MP//edOvDH2Zh+z"
+    "do927r3/ueec+5///O9zlmgPS3Tx5r/IHNEA/0Ljuq0/e+3d1svgeCZlrPvrb36gh4yfp1tVmjQW"
+    "w31oODyLe2CJ1vjmOXD6QOaX4+RTUpJ058Nrh68eBl65WDSPlv1z3jrfvu/A/IGx++IU0C1j9O5H"
+    "Vg43Dw/zq29QOiWEHA8KWbj9hd5hbgq+9EFcgraaj1G4+fjDl8hsypt0Hm88nTsAhNQ/AXV/RWFy"
+    "9BO/ty4DDC7KABUyk+ZsokojLz39TIPok5bzlTeGftN3dlN81jeJDP6+d/2BGoiDX2SSRpLMSpN0"
+    "lvaDrGdpYKavClwbb28IgRn5Nbrss/6dH+N00tNEb55fqoje6Msrh9FCF7l3P/c1GxRapCtcxeRO"
+    "fKnEH8Ai/2xneO/46KjzLVkIp1CJY8mXyJClr+rXfQ1XTpTGIfO7K0znuKdJpSyVY6E69a9Ri/qX"
+    "icp/XqcQv+1Xk2SqFHfhWebax6y/50Uzp52/ISu/IxQHx4317oUe2sEA0/x9IMZyn2C5LzJdLV7S"
+    "NrNZi5e1ya/552GYHP6VmRCZUdYVzEBBnpisyP03Hd2zypcir1OCpxeeAwfwgGDUDv9sko/Jjwc3"
+    "+IM+7hBa1uOPpGSxPU9saSIFHoAvsUS+EFw2Tp69AkEfJc+ps6/GE9lCYFneEj15y9QQeboqL5fU"
+    "90Bt8wpb1M0kBaemKl+b+vJWumyo2KvymRSVRqkSZybzLe1kgFChEFdqT9D8tRhZSfy9ZWHsie0Q"
+    "GH1deKtvEZaC0sNQLDTPT6MU4vldZcORFeb+9jaRucf+T74ebJ1gaQmvUN8qmfw0OEc55v5KPMS8"
+    "31enEmuL4jCUB1cUGSilAqxBw8s0NEsGy0FlGArEo75aYSHwTHfyPaCT7wQ0DlU6TdiseHpSbFdT"
+    "3m0f8E2VX32OFTAz61wPcDulXmQ2Vi9XWAH8AhNQ69WcuCH+dQEqYnTHBIWMGK/cC1Ijz2MzuBbl"
+    "mmtOTT1LQQjSzO5xC5x2XmKl4bx82olB+/dpdIZk6BCAwqkON4iqlrgcdy4IK3o60iyixUWRGSej"
+    "NEu5C3+pLpHnKbv9qZ5wv1eBNwxbHIDpMQCZ+wEkxnOicMFYgTr4z7NOAJilGYiCOutUKBQqZ2C7"
+    "Amua4sJpLrC7MqBZw5qaep4B7UBa+s1q4eMAlOJlDvykp6j1gl5Cj6OtmnTwdUA3084K3WbInLDn"
+    "e2LtvafhCwXVy6fz5G/LutoxzeIP/wYjtW4pri12Uve22FGJU6RGY2zzS6M+FufQKiSayqwU85Se"
+    "I8M6U2aXxjjpfLEHqI1gZcicYgMgBOkXWTA0WWSBKbIsxGlJVVkIkhApDOqFs+My0IbuLlV3XX7R"
+    "fpW5u9g8zg5P4iJ5HfK2JDwYvCh6IXfljyEFIwpOWe4Js5wXpWHH4Pqw5itmIcg+lqT0IrtCz5e5"
+    "OlDRfumufTX1ClTAlQmo9IvUvyL+VmIWC0Uq1gegRiPnqI/dr/LliQ6v2WPqryvJblTEqDThjPp4"
+    "wcPzp7gVHbXPx3ePGT7N9tP76etf3B/vvtte2awf22q8Y3+V/cGdWetN/BlXfEqihs2TCivneVq9"
+    "yItuPKZeEWJZr2ma9atXYrrX49IAPZ5Rf6ufvEWVdZX/39H3TPmjAsooRcQNa96gxeemUDZrcWuL"
+    "2X1Y+AM3FrE6Lp/dbbU/rp/eb7dctfmAOAFE77NXNzR5u9URc1R2tKcd/tM9wdVf6bBb1TnGOHyE"
+    "vRswwgBUmQlbaTrMNV5ctP4ahF2XqAM2gNnrUTG7qDXbe4DcA7Z6SVjzh9uP/nTpf/GZ11k1GBCy"
+    "/S+whTCCrDCmYz67ORL/BhkrlP6Poyo+lPIv0T8D50g2VIVjORYfGO+bMZi+mXgkH5pF5iEXHxwO"
+    "LML2VuInyaxT5ov3qEfqCIyDqpNp84eGxultyTuAgb+Jq0QOP7f2U3c8viIG4GmlLru66I77duLH"
+    "qLg2y2JC0ifFYJTeB/NgdBDpUWAVWoMGlijDbdIzYuXYV2VH1QCztyjQZumw4wM1MUXpqhge0UL9"
+    "jR4tA38HKlcVjlnL8JvE3+Kbr6mhVbwrWJPSElaGKz+4KjeDOUpB/6TkZsvNr2Swyop0uJLsGb+8"
+    "x+KYnan66nGb3brv8JdmPZrEQa0VXJIM1Dbe3Eq3idtBuvtmu4O5Q/cs4afUVcgzSNqOi6W7t6Mp"
+    "FV7Tho+dGCXEjwnI/oXSfoSA0SUB2dgLWMkD9JTPUXS9cEr9AwjrnEn1EF1k5hRr2S90E4+Krtlo"
+    "eaMdWOf6NzcAOBaYSmLpVaMHrMluj9IDbviG6qL1rLRp0Y3e3uTaE6P8lH31CWHFY1aDAg4vxXuy"
+    "XdYaG9/Id4iTPYVCHtzITpp2HgerwXXRApRYFlD4EUp5rPP8KeiLuy3nW/FeKltZI1szIYdINwOZ"
+    "1KUlzRHqLRvfENzZQm/5ryfjOAgWeQkqy9RKbpl8B1fR90MNACN1DJT5H7zJXcKXi+dElIQASgKJ"
+    "6GJ5VnAqvyADlM7Jx/mG0bg9plOc2/WqarLs9BHiKoK22CttEoPNY1PANsJUdYq+zlaryCGBk0lR"
+    "dIorLjbJXy9xRR8bco5RonND2aE8KujboSWpCNTnSSoG7WGpoNKcrvB8hHQFjGlKEqSo6PmmjZss"
+    "xSwiixRduCigw/E6wDkrLiAbSQHDNQHZWxKQIyBbs5kGQysC8mwEpJzSqV17sdd4v9/q/D7MnTpz"
+    "CinyHHMo86roJn/HtYJWSiunYlbbyNx4996t77br9qMxPc4b49IH9Hd65YLA/KrCCSWWLi3WMNy4"
+    "dk0vdd/qlrdIz19Hz5SmZ6Z2HT3t5FvQM+/Sc1j3c9x1WZFxJ8Q//IClvuOmcVzDYdiuhb87u1Oi"
+    "vihOyHE1Ti5ZXYrKrU4uZaXJqFjSFSGfF1/md0Nzcgu92dkryhrRYG8C3aPq6p+wh9M6bs1QhvXk"
+    "u7pbPEWZtak+C9fcZ6vzUNQ/Nq2daZ8S2oR09qWY9zNLfqhOpdaxSpOMX++BN6d3Idkasn7s2rXd"
+    "X3dfOEhAagpJIEQLOwElmEtU4WVy5MNadJI8vOKGdeW4UPcxNZ/qnQC5wUp6VkIXN5AJrIuzazAj"
+    "ATluA0nhNgiAOEJFVjSwRqxkGWFBn0qPCF+kK3Mbgio3xNqDgrB3ZBmmMgJjvQLKw8xcuML4Z/1r"
+    "5FmdZr5NsiPhr2Xi0OZ2rG8xMYqkXGk4MhOZDHKnzHgi2zeHmHuwmkn6azK/pWnuPcIBVWhlnmge"
+    "+xG+DrJLFpI6ihtnJJdtYYNwfY8m6AdVy6P4w+P+ZaQXydvGVghP+Ml1Teaq3m1NaUhc2+IJmFtv"
+    "x+PEpF+OZ1LKQq8gV8u1ohoyu98JYNTYKeYvcCzHiEElFPN4GKij0nTQgHLNaxnaWyCDOg01HkRS"
+    "SifUQjotnBNSIdMK9qlpFS5JoPCqlgRJBAV1KiVzTqs34d9IB6NlB2Xo2R1tSnRYkH6VvDgWsO3f"
+    "PulvHPrwJnsLVaRZyFzV28TFGHmZYSO8xkUegSUzCibg6ddxTIPoNDNNHVvlm2wOIsI4ApYvb/+3"
+    "rxyT/ocObZPrP6vvQTc4DXZGxHcMtGMH665U/EjN3QJ7517v8t7+sg9F2O4QyvVL9JvCqmDioNBi"
+    "IvY9gvcnrTZj1f78SWZIxqkCvPblUvTjPJNR0/nDQ2NZaOtcNszau5xln8KnsqZ6rsyK6mfUV0ay"
+    "O/2wqfNIQ5M3AO61v8lA5avFBgt2Hu7TkOTzTGYqthholh7vAvqN20z30QP0NlmNcy5+9dzErMeJ"
+    "k0FFaMzw8htbg/pRanUDbntiRnfbuYrUMe3CdUDAeo2BkPPkfy2w9eBFm0Ou0+sg/4moCEdT3gD0"
+    "G7dZqIM+7gC9T+hPO3/BXH75cyqJrGyiGqrt2/eOpTCkojZQZ7FIaX9eu5seGMNhyrSeLFfR9/z2"
+    "nKWAtehv/xZ02MAidvNrv9Q4jLXAhu3Nbr0pAetypEvLLv1TN6W/vIGx5WZ93Od1GWBQjJynKVJX"
+    "HqbQ+d+x2Qg8aLezu5OdHxTZOX2mVBPZGZkRCWFntSVUQDNL+mwKbKcYLTn9dN+1503+ejUOU45t"
+    "7jM12vwMnSbOja/FSb72rfOzUcny9S4c72ojZDOddgxtcEzDbAY6MbRnR4Ov/k4MfUcubZc+W/zb"
+    "y/225j32XxnT7STYo3zp6nEnZrLjVbxMwVUwicmudwI0wc4ztcEQQCg6i6rBma1X3Yq9w9vA51sq"
+    "PmwU0tjlp9vsccfYYspOfhXKILKECCi8pJ8RnSequo1u7/bdA1r1xp7eUN3sXpf2zJYt3NRmbk02"
+    "zNbrUyZHZpADEMNs3vi3q/KgfTXrcz5/ohrmKcVwIb/zZ6xtPqawleotoibY8OKAXeQKW0b/qe5Z"
+    "hC1vqjSv/XJKNX6offihjXUbfyKtlWc/TffavdoGlVgoWqV0Hgdl3xJgRsJ+DYcglSoFnWPzHZwe"
+    "f617TrmXmYhJpAzASkOTAZbKYgonhRdwLtjHuIzkcdg5OgfLHKrnslhscYct0cq5xl7rtOgsRRvk"
+    "X2FPO82GaSlYp7HTFKmaa3Q2Ex8aZ5qtJUZzw1R+Wz0yyX5P7qOLfXNMrqGJGf8qx1kRO2s4dZxe"
+    "SZK1qDeQi7N7hm//CvboDDsJgRyqIpMQaEomoSxSkqmJM4wMTLiOzbxiXqc2DDuOxukeo4ZzjQNL"
+    "EKn0JCsyKiV5cQ3k3FNY7sQM9H3/Upox8a3hDD4tiK3KySkFfWwvLXE2Doqbn2mKbH5hR4mNpu/I"
+    "kaMIfXHSQM6H7Ac1kBLCOQA5DOrH1wdXjxz5lcTOz+N8TGEiiddwFsav0yM58YgCjQ1ASGLzd8se"
+    "z1gHqRLPR7Wv0b+s91pT/6+PC+DAPLJHPyrj6IPQxntvgk0uKSe6d3EzN90MGZvHbM1P6DOBYZ2G"
+    "Kknqp09PpChAUO9jpf9NNOeI0Gj/dzHHwIpultzQ500DIC9CnpG5a7mNdyXpVpWjzpeIPsFIvFx2"
+    "nrey1J+k76+0UnTbC3uE4YtkxSgxjmzsf0PYmGA2ZCUkG7npSeSiHeQy+xs4057BVoihduDRhBbY"
+    "QEwcPk9UpzRRjYaIvn7gH4neqXBuet/tIoLnqQuf0jmvr1Uabhj7Dn7wrj5KwQeZGc/ub4Rag3mK"
+    "Zg+2WvR18jQo0abgHA0Oh5iXJoguh1oHGwOTFKxdoINfZi6961+J7oQoHlz78COijn5Aqe/q7703"
+    "fjvmAqWAuYhSxFzot2N6LpGanguOYmAuks+c1P9KgyTlXf+idyF2MZf/A3iPLog="
+)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Provides a job queue for running the analysis of windings in a
+background thread. Jobs are submitted to channels (for example
+"model" for the winding which is shown in the GUI). Only the newest job
+of a channel is relevant: older jobs are cancelled if they have not
+started yet and their results are dropped if they are already running.
+
+The results are delivered by a dispatch function. For GUI applications
+this function must pass the callback to the GUI thread.
+"""
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class canceltoken:
+    """
+    Is passed to the job functions. Long running jobs should check
+    'cancelled' between their steps and return early.
+    """
+
+    def __init__(self, is_cancelled):
+        self._is_cancelled = is_cancelled
+
+    @property
+    def cancelled(self):
+        return self._is_cancelled()
+
+
+class jobqueue:
+    """
+    Job queue with cancellation of stale jobs
+
+    Parameters
+    ----------
+    dispatch :    function
+                  dispatch(func) is called from the worker thread to
+                  execute the callbacks. Default: call directly
+    max_workers : integer
+                  number of worker threads
+    """
+
+    def __init__(self, dispatch=None, max_workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._dispatch = dispatch if dispatch else lambda func: func()
+        self._lock = threading.Lock()
+        self._generation = {}
+        self._futures = {}
+
+    def submit(self, channel, func, callback=None, error_callback=None):
+        """
+        Submits a new job and cancels the older jobs of the channel
+
+        Parameters
+        ----------
+        channel :        hashable
+                         channel of the job
+        func :           function
+                         func(token) is executed in the worker thread
+        callback :       function
+                         callback(result) is dispatched if the job is
+                         still the newest one of the channel
+        error_callback : function
+                         error_callback(exception) is dispatched if the
+                         job raises an exception
+
+        Returns
+        -------
+        token :          canceltoken
+                         cancel state of the job
+        """
+        with self._lock:
+            gen = self._generation.get(channel, 0) + 1
+            self._generation[channel] = gen
+            old = self._futures.get(channel)
+            if old is not None:
+                old.cancel()
+            token = canceltoken(lambda: self._generation.get(channel) != gen)
+            self._futures[channel] = self._executor.submit(
+                self._run, channel, gen, func, token, callback, error_callback
+            )
+        return token
+
+    def _run(self, channel, gen, func, token, callback, error_callback):
+        if token.cancelled:
+            return
+        try:
+            result = func(token)
+        except Exception as e:
+            if error_callback is not None and not token.cancelled:
+                self._dispatch(lambda: self._deliver(channel, gen, error_callback, e))
+            return
+        if callback is not None and not token.cancelled:
+            self._dispatch(lambda: self._deliver(channel, gen, callback, result))
+
+    def _deliver(self, channel, gen, callback, result):
+        # a newer job may have been submitted while the result was
+        # passed to the GUI thread
+        if self._generation.get(channel) == gen:
+            callback(result)
+
+    def cancel(self, channel=None):
+        """
+        Cancels the jobs of the given channel (all channels if None)
+        """
+        with self._lock:
+            channels = list(self._generation) if channel is None else [channel]
+            for ch in channels:
+                self._generation[ch] = self._generation.get(ch, 0) + 1
+                fut = self._futures.pop(ch, None)
+                if fut is not None:
+                    fut.cancel()
+
+    def wait(self, channel=None):
+        """
+        Waits until the jobs of the given channel (all channels if None)
+        are finished
+        """
+        with self._lock:
+            if channel is None:
+                futures = list(self._futures.values())
+            else:
+                futures = [self._futures.get(channel)]
+        for fut in futures:
+            if fut is not None and not fut.cancelled():
+                fut.exception()
+
+    def is_busy(self, channel=None):
+        """
+        Returns True if there is a unfinished job
+        """
+        with self._lock:
+            if channel is None:
+                futures = list(self._futures.values())
+            else:
+                futures = [self._futures.get(channel)]
+        return any(fut is not None and not fut.done() for fut in futures)
+
+    def shutdown(self, wait=False):
+        """
+        Cancels all jobs and stops the worker threads
+        """
+        self.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+class rendersnapshot:
+    """
+    Copy of a winding for 'render_products', so the background job
+    doesn't access the datamodel. The snapshot must be created in the
+    thread which changes the winding (GUI thread).
+
+    Parameters
+    ----------
+    data : datamodel object
+           winding
+    """
+
+    def __init__(self, data):
+        self.results = data.results
+        self.revision = data.get_revision()
+        self.data = copy.copy(data)
+        self.data.machinedata = copy.deepcopy(data.machinedata)
+        self.data.results = copy.copy(data.results)
+        ovh = data.results.get("wdg_overhang")
+        self.data.results["wdg_overhang"] = dict(ovh) if ovh is not None else None
+
+
+def render_products(data, token=None):
+    """
+    Calculates all results of the winding which are shown in the GUI
+    (basic characteristics, winding overhang and text report). The
+    results are calculated on a snapshot of the winding, so the job
+    doesn't change the datamodel. Use 'store_render_products' in the
+    GUI thread to cache them.
+
+    Parameters
+    ----------
+    data :  datamodel object or rendersnapshot
+            winding
+    token : canceltoken
+            the calculation stops early if the token is cancelled
+
+    Returns
+    -------
+    products : dict
+               'bc', 'bc_str' and 'report' or None if cancelled
+    """
+    snapshot = data if isinstance(data, rendersnapshot) else rendersnapshot(data)
+    wdg = snapshot.data
+    steps = [
+        ("bc", wdg.get_basic_characteristics),
+        ("overhang", lambda: wdg.get_wdg_overhang(optimize_overhang=False)),
+        ("overhang_opt", lambda: wdg.get_wdg_overhang(optimize_overhang=True)),
+        ("report", wdg.get_text_report),
+    ]
+    products = {}
+    for key, func in steps:
+        if token is not None and token.cancelled:
+            return None
+        products[key] = func()
+    products["bc"], products["bc_str"] = products["bc"]
+    products["results"] = snapshot.results
+    products["revision"] = snapshot.revision
+    products["cache"] = {
+        key: wdg.results[key] for key in ("basic_char", "wdg_overhang", "text_report")
+    }
+    return products
+
+
+def store_render_products(data, products):
+    """
+    Caches the results of 'render_products' in the datamodel. This must
+    be done in the thread which changes the winding (GUI thread).
+
+    Parameters
+    ----------
+    data :     datamodel object
+               winding
+    products : dict
+               return value of 'render_products'
+
+    Returns
+    -------
+    stored :   Bool
+               False if the winding was changed or analysed again
+               meanwhile, the products are outdated
+    """
+    if products is None or data.results is not products["results"]:
+        return False
+    if data.get_revision() != products["revision"]:
+        return False
+    for key, value in products["cache"].items():
+        data.results[key] = value
+    return True
+
+
+def has_render_products(data):
+    """
+    Returns True if all results for the GUI are cached in the datamodel
+    """
+    ovh = data.results.get("wdg_overhang")
+    return (
+        data.results.get("basic_char") is not None
+        and data.results.get("text_report") is not None
+        and ovh is not None
+        and "optimized" in ovh
+        and str(data.get_coilspan()) in ovh
+    )
@@ -51,11 +51,28 @@ from swat_em import datamodel, project
 # from swat_em import wdggenerator
 from swat_em import plots
 from swat_em import report
+from swat_em import jobs
 from swat_em.analyse import _get_float
 
 MSG_TIME = 3000  # time in which the message is displayed in the statusbar
 
 
+class _dispatcher(QtCore.QObject):
+    """
+    Passes the callbacks of the background jobs to the GUI thread
+    """
+
+    call = QtCore.Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.call.connect(self._call)
+
+    @QtCore.Slot(object)
+    def _call(self, func):
+        func()
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -63,6 +80,10 @@ class MainWindow(QMainWindow):
         self.data = datamodel()
         self.project = project()
 
+        # background jobs (analysis and report of the current winding)
+        self.dispatcher = _dispatcher()
+        self.jobs = jobs.jobqueue(dispatch=self.dispatcher.call.emit)
+
         # Set up the user interface from Designer.
         uic.loadUi(os.path.join(__dir__, "ui", "MainWindow.ui"), self)
         self.setWindowTitle("SWAT-EM")
@@ -549,10 +570,32 @@ class MainWindow(QMainWindow):
 
     def update_data_in_GUI(self):
         """
-        plots all winding data in gui
+        plots all winding data in gui. Results which are not cached yet
+        are calculated in a background job, older jobs are cancelled.
         """
-        bc, bc_str = self.data.get_basic_characteristics()
-        self.textBrowser_wdginfo.setHtml(bc_str)
+        data = self.data
+        if jobs.has_render_products(data):
+            self.jobs.cancel("model")
+            self.show_data_in_GUI(data, jobs.render_products(data))
+        else:
+            self.statusbar.showMessage("Analysing winding ...")
+            snapshot = jobs.rendersnapshot(data)
+            self.jobs.submit(
+                "model",
+                lambda token: jobs.render_products(snapshot, token),
+                callback=lambda products: self.show_data_in_GUI(data, products),
+                error_callback=self.show_job_error,
+            )
+
+    def show_data_in_GUI(self, data, products):
+        """
+        shows the results of the background job if the winding is still
+        the current one
+        """
+        if data is not self.data or not jobs.store_render_products(data, products):
+            return
+        self.statusbar.clearMessage()
+        self.textBrowser_wdginfo.setHtml(products["bc_str"])
         idx_old = self.comboBox_star_harmonics.currentText()
 
         idx = None
@@ -573,7 +616,10 @@ class MainWindow(QMainWindow):
                 idx
             )  # restore ordinal number for the new winding
         self.update_plot_in_GUI()
-        self.reportEdit.setText(self.data.get_text_report())
+        self.reportEdit.setText(products["report"])
+
+    def show_job_error(self, error):
+        self.statusbar.showMessage("Analysis failed: {}".format(error), MSG_TIME)
 
     def update_plot_in_GUI(self, small_update=False):
         """
@@ -824,6 +870,7 @@ class MainWindow(QMainWindow):
         Do some taske when the main window is closed
         """
         self.plot_tabs_save_config()
+        self.jobs.shutdown()
 
     def closeEvent(self, event):
         # Exit programm
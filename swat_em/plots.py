@@ -7,10 +7,19 @@ from qtpy.QtWidgets import QTableWidgetItem, QApplication
 from qtpy.QtGui import QFont, QSyntaxHighlighter, QTextCursor, QTextCharFormat, QColor
 from qtpy import QtCore
 import string
+import functools
 
 
 from swat_em.config import get_phase_color, get_line_color, config
 from swat_em import analyse
+from swat_em import geometry
+from swat_em.geometry import (
+    gen_coil_lines,
+    gen_slot_lines,
+    gen_slot_filling,
+    gen_coil_paths,
+    gen_tooth_rects,
+)
 
 import numpy as np
 import time
@@ -34,143 +43,186 @@ pg.setConfigOptions(antialias=True)
 Alpha = string.ascii_uppercase
 
 
-def gen_coil_lines(w, h1=0.75, h2=1.5, db1=0.1, Np1=21):
+def group_on_nan(x, y):
+    xt, yt = [[]], [[]]
+    for k in range(len(x)):
+        if np.isnan(x[k]) or np.isnan(y[k]):
+            if len(xt[-1]) > 0:
+                xt.append([])
+                yt.append([])
+        else:
+            xt[-1].append(x[k])
+            yt[-1].append(y[k])
+    return xt, yt
+
+
+class pointindex:
     """
-    Create lines of a coil for plotting.
+    Grid index for the points of a scatter plot. The points are sorted
+    by the cells of a regular grid, so points in a rectangle can be
+    found without testing all points.
 
     Parameters
     ----------
-    w :  integer
-         width of the coil in slots
-    h1:  float
-         height of the coil side in the slot
-    h2:  float
-         max height of the winding overhang
-    db1: float
-         distance of the coil side to the middle of the slot;
-         should be 0..0.2
-    Np1: integer
-         number of plotting points in the line of the winding overhang
-
-    Returns
-    -------
-    x : list
-        x values of the coil for plotting
-    y : list
-        y values of the coil for plotting
+    x, y :  array_like
+            coordinates of the points
+    cells : integer
+            number of cells per axis (default: about 4 points per cell)
     """
-    x1, y1 = db1, h1
-    x2, y2 = w / 2, h2
-    x3, y3 = w - db1, h1
-    x4, y4 = x3, -y3
-    x5, y5 = x2, -x2
-    x6, y6 = x1, -y1
-
-    x = []
-    y = []
-    x_ = np.linspace(x1, x3, Np1)
-    y_ = np.interp(x_, [x1, x2, x4], [y1, y2, y3])
-    x += x_.tolist()
-    y += y_.tolist()
-
-    x += x_[::-1].tolist()
-    y += (-1 * y_[::-1]).tolist()
-    x.append(x[0])
-    y.append(y[0])
-    return x, y
-
-
-def gen_slot_lines(Q, bz, hz):
+
+    def __init__(self, x, y, cells=None):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        n = len(self.x)
+        valid = np.isfinite(self.x) & np.isfinite(self.y)
+        if cells is None:
+            cells = int(np.sqrt(n / 4.0))
+        self.cells = max(1, cells)
+        if np.any(valid):
+            self.xmin, self.xmax = self.x[valid].min(), self.x[valid].max()
+            self.ymin, self.ymax = self.y[valid].min(), self.y[valid].max()
+        else:
+            self.xmin = self.xmax = self.ymin = self.ymax = 0.0
+        self.dx = (self.xmax - self.xmin) / self.cells or 1.0
+        self.dy = (self.ymax - self.ymin) / self.cells or 1.0
+
+        ix = self._cell(self.x[valid], self.xmin, self.dx)
+        iy = self._cell(self.y[valid], self.ymin, self.dy)
+        cell = ix * self.cells + iy
+        order = np.argsort(cell, kind="stable")
+        self._points = np.flatnonzero(valid)[order]
+        self._start = np.searchsorted(cell[order], np.arange(self.cells ** 2 + 1))
+
+    def _cell(self, v, vmin, dv):
+        return np.clip(((v - vmin) // dv).astype(int), 0, self.cells - 1)
+
+    def query_rect(self, x0, x1, y0, y1):
+        """
+        Returns the indices of all points in the rectangle
+        """
+        if x1 < self.xmin or x0 > self.xmax or y1 < self.ymin or y0 > self.ymax:
+            return np.zeros(0, dtype=int)
+        ix0, ix1 = self._cell(np.array([x0, x1]), self.xmin, self.dx)
+        iy0, iy1 = self._cell(np.array([y0, y1]), self.ymin, self.dy)
+        # cells of one column are contiguous
+        rows = np.arange(ix0, ix1 + 1) * self.cells
+        idx = [
+            self._points[self._start[r + iy0] : self._start[r + iy1 + 1]]
+            for r in rows
+        ]
+        idx = np.concatenate(idx)
+        x, y = self.x[idx], self.y[idx]
+        return idx[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+    def pick(self, x, y, dx, dy):
+        """
+        Returns the indices of the points in the ellipse around (x, y)
+        with the half axes dx, dy, sorted by the distance
+        """
+        idx = self.query_rect(x - dx, x + dx, y - dy, y + dy)
+        dist = ((self.x[idx] - x) / dx) ** 2 + ((self.y[idx] - y) / dy) ** 2
+        idx, dist = idx[dist <= 1.0], dist[dist <= 1.0]
+        return idx[np.argsort(dist, kind="stable")]
+
+
+def _symbol_coil_side(sign):
+    """
+    Returns the symbol of a coil side: circle with a cross (positive
+    winding direction) or with a dot (negative direction)
+    """
+    path = pg.QtGui.QPainterPath()
+    path.addEllipse(QtCore.QRectF(-0.5, -0.5, 1.0, 1.0))
+    if sign > 0:
+        d = 0.5 / np.sqrt(2)
+        path.moveTo(-d, -d)
+        path.lineTo(d, d)
+        path.moveTo(-d, d)
+        path.lineTo(d, -d)
+    else:
+        path.addEllipse(QtCore.QRectF(-0.08, -0.08, 0.16, 0.16))
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def _symbol_arrow(angle):
     """
-    Create lines of a slot for plotting.
+    Returns the symbol of an arrow head with the tip at the position
 
     Parameters
     ----------
-    q :  integer
-         number of slots
-    bz:  float
-         width of the tooth -> Slot width = 1 - bz
-         so bz should be around 0.5
-    hz:  float
-         height of the slots
-
-    Returns
-    -------
-    x : list
-        x values of the slots for plotting
-    y : list
-        y values of the slots for plotting
+    angle : integer
+            direction of the arrow in degree (counterclockwise, 0: right)
     """
-    x = []
-    y = []
-    for k in range(Q + 1):
-        x1 = k - 0.5
-        if k == 0:
-            x += [x1, x1, x1 + bz / 2, x1 + bz / 2, x1, np.nan]
-        elif k == Q:
-            x += [x1 - bz / 2, x1 - bz / 2, x1, x1, x1 - bz / 2, np.nan]
-        else:
-            x += [
-                x1 - bz / 2,
-                x1 - bz / 2,
-                x1 + bz / 2,
-                x1 + bz / 2,
-                x1 - bz / 2,
-                np.nan,
-            ]
-        y += [-hz, hz, hz, -hz, -hz, np.nan]
-    return x, y
-
-
-def gen_slot_filling(Q, bz, hz):
+    a = np.deg2rad(angle)
+    # the y axis of the symbols points downwards
+    d = np.array([np.cos(a), -np.sin(a)])
+    n = np.array([-d[1], d[0]])
+    path = pg.QtGui.QPainterPath()
+    path.moveTo(0, 0)
+    path.lineTo(*(-d + 0.22 * n))
+    path.lineTo(*(-d - 0.22 * n))
+    path.closeSubpath()
+    return path
+
+
+class _labels:
     """
-    Create lines of a slot for plotting.
+    Text labels with level of detail: only the labels in the visible
+    range are shown. If there are more than 'max_labels' visible labels
+    only every n-th label is shown. The text items are reused.
 
     Parameters
     ----------
-    q :  integer
-         number of slots
-    bz:  float
-         width of the tooth -> Slot width = 1 - bz
-         so bz should be around 0.5
-    hz:  float
-         height of the slots
-
-    Returns
-    -------
-    x : list
-        x values of the slots for plotting
-    y : list
-        y values (upper lines) of the slots for plotting
-    y_neg : list
-        y values (lower lines) of the slots for plotting
+    fig :        PlotWidget
+    max_labels : integer
+                 maximum number of shown labels
     """
-    x = []
-    y = []
-    for k in range(Q + 1):
-        x1 = k - 0.5
-        if k == 0:
-            x += [x1, x1 + bz / 2, np.nan]
-        elif k == Q:
-            x += [x1 - bz / 2, x1, np.nan]
-        else:
-            x += [x1 - bz / 2, x1 + bz / 2, np.nan]
-        y += [hz, hz, np.nan]
-    y_neg = [-k for k in y]
-    return x, y, y_neg
 
+    def __init__(self, fig, max_labels=60):
+        self.fig = fig
+        self.max_labels = max_labels
+        self.items = []
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.texts = []
+        self.scale = 1.0
+        self.fig.getPlotItem().vb.sigRangeChanged.connect(lambda *args: self.update())
+
+    def set_labels(self, x, y, texts, scale=1.0):
+        """
+        Sets the labels; must be called after fig.clear() because the
+        text items are removed from the plot
+        """
+        self.items = []
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.texts = texts
+        self.scale = scale
+        self.update()
+
+    def update(self):
+        (x0, x1), (y0, y1) = self.fig.getPlotItem().vb.viewRange()
+        idx = np.flatnonzero(
+            (self.x >= x0) & (self.x <= x1) & (self.y >= y0) & (self.y <= y1)
+        )
+        if len(idx) > self.max_labels:
+            idx = idx[:: -(-len(idx) // self.max_labels)]
 
-def group_on_nan(x, y):
-    xt, yt = [[]], [[]]
-    for k in range(len(x)):
-        if np.isnan(x[k]) or np.isnan(y[k]):
-            if len(xt[-1]) > 0:
-                xt.append([])
-                yt.append([])
-        else:
-            xt[-1].append(x[k])
-            yt[-1].append(y[k])
-    return xt, yt
+        while len(self.items) < len(idx):
+            text = pg.TextItem(anchor=(0.5, 0.5))
+            text.setColor("k")
+            text.setScale(self.scale)
+            # ignore because autoRange have problems with it
+            self.fig.addItem(text, ignoreBounds=True)
+            self.items.append(text)
+        for k, text in enumerate(self.items):
+            if k < len(idx):
+                i = idx[k]
+                text.setPlainText(self.texts[i])
+                text.setPos(self.x[i], self.y[i])
+                text.show()
+            else:
+                text.hide()
 
 
 def _pg_clear_legend(leg):
@@ -217,60 +269,20 @@ class _slot_plot:
         self.fig.disableAutoRange()  # disable because of porformance
         # (a lot of elements are plottet)
 
-        x = [0] * 10
-        y = [0] * 10
-        x[0], y[0] = 0.0, 1.0
-        x[1], y[1] = 0.5 - so / 2, 1.0
-        x[2], y[2] = 0.5 - so / 2, sh
-        x[3], y[3] = 0.5 - sw / 2, sh
-        x[4], y[4] = 0.5 - sw / 2, 0.0
-        x[5], y[5] = 0.5 + sw / 2, 0.0
-        x[6], y[6] = 0.5 + sw / 2, sh
-        x[7], y[7] = 0.5 + so / 2, sh
-        x[8], y[8] = 0.5 + so / 2, 1.0
-        x[9], y[9] = 1.0, 1.0
-
-        xp = [[]]
-        yp = [[]]
-        i_slots = 0
-        dx = 0
-        dy = 0
-        for k in range(Q):
-            if i_slots >= self.Qxmax:
-                dx = 0
-                dy += -self.dy
-                i_slots = 0
-                xp.append([])
-                yp.append([])
-            for a, b in zip(x, y):
-                xp[-1].append(a + dx)
-                yp[-1].append(b + dy)
-            dx += 1
-            i_slots += 1
-        for k in range(len(xp)):
-            pen = pg.mkPen(color="k", width=1.5)
-            curve = pg.PlotCurveItem(xp[k], yp[k], pen=pen)
-            self.fig.addItem(curve)
+        x, y, connect = geometry.gen_slot_rows(Q, self.Qxmax, sh, sw, so, self.dy)
+        pen = pg.mkPen(color="k", width=1.5)
+        curve = pg.PlotCurveItem(x, y, pen=pen, connect=connect)
+        self.fig.addItem(curve)
 
-        i_slots = 0
-        dy = 0
-        dx = 0
+        x, y = geometry.gen_slot_positions(np.arange(1, Q + 1), self.Qxmax, self.dy)
         for k in range(Q):
-            if i_slots >= self.Qxmax:
-                dx = 0
-                dy += -self.dy
-                i_slots = 0
-
             txt = pg.TextItem(str(k + 1), anchor=(0.5, 0.5))
-            txt.setPos(0.5 + dx, -0.2 + dy)
+            txt.setPos(x[k], y[k] - 0.2)
             txt.setColor("k")
             self.fig.addItem(
                 txt, ignoreBounds=True
             )  # ignore because autoRange have problems with it
 
-            dx += 1
-            i_slots += 1
-
         self.fig.setXRange(0, self.Qxmax)
         self.fig.autoRange()
 
@@ -281,26 +293,18 @@ class _slot_plot:
         Q = self.data.get_num_slots()
         P = self.data.get_num_polepairs() * 2
         self.devide = "v" if self.data.get_coilspan() == 1 else "h"
+        num_layers = max(self.data.get_num_layers(), 2)
 
         def add_text(slot, phase, pos, wdir):
-            dx = slot
-            dy = self.sh / 2
-            while dx > self.Qxmax:
-                dx -= self.Qxmax
-                dy -= self.dy
-            dx = dx - 1 + 0.5
+            dx, dy = geometry.gen_slot_positions(slot, self.Qxmax, self.dy)
+            dy += self.sh / 2
 
+            # first layer at the bottom (or right), last layer at the top (or left)
+            shift = (pos - (num_layers - 1) / 2) / num_layers
             if self.devide == "h":
-                if pos == 0:  # bottom layer
-                    dy -= self.sh / 4
-                elif pos == 1:  # top layer
-                    dy += self.sh / 4
-
+                dy += shift * self.sh
             elif self.devide == "v":
-                if pos == 0:  # right layer
-                    dx += self.sw / 4
-                elif pos == 1:  # left layer
-                    dx -= self.sw / 4
+                dx -= shift * self.sw
 
             if wdir > 0:
                 txt = "+" + str(phase)  # '$\otimes$'
@@ -328,29 +332,11 @@ class _slot_plot:
             alpha_m = config["plt"]["magnet_alpha_m"]
             magnet_colors = config["plt"]["magnet_colors"]
             magnet_linewidth = config["plt"]["magnet_linewidth"]
-            x = np.linspace(0, Q / P * alpha_m, 50)
-            x += (1 - alpha_m) * Q / P / 2
-            for kpole in [0, 1]:  # positive and negative Pole
-                x1 = np.array([])
-                for kp in range(P // 2):
-                    x1 = np.append(x1, x + 2 * Q / P * kp + kpole * Q / P)
-                    x1 = np.append(x1, np.nan)
-                y1 = 1.1 * np.ones(len(x1))
-                while np.nanmax(x1) > self.Qxmax:
-                    idx = x1 > self.Qxmax
-                    x1[idx] = x1[idx] - self.Qxmax
-                    y1[idx] = y1[idx] - self.dy
-                    idx2 = np.where(idx == True)[0][0]
-                    x1[idx2] = np.nan
-
+            lines = geometry.gen_poles_linear(Q, P, alpha_m, self.Qxmax, self.dy)
+            for kpole, (x1, y1, connect) in enumerate(lines):
                 pen = pg.mkPen(magnet_colors[kpole], width=magnet_linewidth)
-
-                # Bug in pyqtgraph / qtpy > v5.12.1
-                #  curve = pg.PlotCurveItem(x1, y1, pen=pen, connect="finite")
-                #  self.fig.addItem(curve)
-                for xtmp, ytmp in zip(*group_on_nan(x1, y1)):
-                    curve = pg.PlotCurveItem(xtmp, ytmp, pen=pen, connect="finite")
-                    self.fig.addItem(curve)
+                curve = pg.PlotCurveItem(x1, y1, pen=pen, connect=connect)
+                self.fig.addItem(curve)
 
         self.fig.autoRange()
         if self.show:
@@ -389,6 +375,7 @@ class _polar_layout_plot:
         self.ra = 1.3  # outer radius of the plot (because autoscale fails)
         self.r_slottext = 1.2  # radius slot number
         self.r_cs = [1, 0.9]  # radius coil sides (first and second layer)
+        self.dr_cs = 0.1  # radial distance of the coil sides of the layers
         self.r_magnets = 0.75  # radius of the magnets
 
         if self.layout is None:
@@ -401,6 +388,7 @@ class _polar_layout_plot:
         self.fig.getAxis("bottom").hide()
         self.fig.getAxis("left").hide()
         self.leg = self.fig.addLegend(offset=(-10, 10))
+        self.labels = _labels(self.fig)
 
     def plot(self, data=None, show=False, optimize_overhang=False, draw_poles=False):
         self.show = show
@@ -417,91 +405,74 @@ class _polar_layout_plot:
         self.fig.disableAutoRange()  # disable because of porformance
         # (a lot of elements are plottet)
         head = self.data.get_wdg_overhang(optimize_overhang=optimize_overhang)
+        num_layers = max(self.data.get_num_layers(), 2)
+        dr = min(self.dr_cs, 0.2 / (num_layers - 1))
+        self.r_cs = [1 - k * dr for k in range(num_layers)]
 
         def get_pos(num, r=1):
-            """
-            returns position (x, y) of the coil side for the given
-            slot number
-            """
-            alpha = 2 * np.pi / Q * num
-            vec = r * np.exp(1j * alpha)
-            return vec.real, vec.imag
-
-        # plot slot number
-        for k in range(Q):
-            text = pg.TextItem(anchor=(0.5, 0.5))
-            text.setPlainText(str(k + 1))
-            text.setPos(*get_pos(k, r=self.r_slottext))
-            text.setColor("k")
-            if Q > 60:
-                text.setScale(1 / (Q / 60))
-            self.fig.addItem(
-                text, ignoreBounds=True
-            )  # ignore because autoRange have problems with it
+            return geometry.gen_polar_positions(num, Q, r)
 
-        # plot coil side with winding direction
+        # coil sides with winding direction (one scatter item)
+        x, y, symbols, pens = [], [], [], []
+        symbol = {1: _symbol_coil_side(1), -1: _symbol_coil_side(-1)}
         for km in range(len(S)):
+            pen = pg.mkPen(get_phase_color(km), width=1.5)
             for kl in range(len(S[km])):
-                layer = S[km][kl]
-                for cs in layer:
-                    text = pg.TextItem(anchor=(0.5, 0.5))
-                    if cs > 0:
-                        text.setHtml("&otimes;")
-                    else:
-                        text.setHtml("&#8857;")  # oint
-                    text.setPos(*get_pos(abs(cs) - 1, r=self.r_cs[kl]))
-                    text.setColor(get_phase_color(km))
-                    if Q <= 60:
-                        text.setScale(2)
-                    else:
-                        text.setScale(2 / (Q / 60))
-                    self.fig.addItem(
-                        text, ignoreBounds=True
-                    )  # ignore because autoRange have problems with it
+                cs = np.array(S[km][kl], dtype=int)
+                xcs, ycs = get_pos(np.abs(cs) - 1, r=self.r_cs[kl])
+                x.append(xcs)
+                y.append(ycs)
+                symbols += [symbol[1] if c > 0 else symbol[-1] for c in cs]
+                pens += [pen] * len(cs)
+        size = 14 if Q <= 60 else max(14 * 60 / Q, 3)
+        if len(pens) > 0:
+            scatter = pg.ScatterPlotItem(
+                np.concatenate(x),
+                np.concatenate(y),
+                symbol=symbols,
+                pen=pens,
+                brush=None,
+                size=size,
+                pxMode=True,
+            )
+            self.fig.addItem(scatter)
 
         # plot connections (winding overhang)
         for km in range(len(head)):
-            x, y = [], []
-            for line in head[km]:
-                cs1_layer = line[3][0]
-                cs2_layer = line[3][1]
-                x1, y1 = get_pos(line[0][0] - 1, r=self.r_cs[cs1_layer])
-                x2, y2 = get_pos(line[0][1] - 1, r=self.r_cs[cs2_layer])
-                x += [x1, x2, np.nan]
-                y += [y1, y2, np.nan]
+            if len(head[km]) == 0:
+                continue
+            slots = np.array([line[0] for line in head[km]]) - 1
+            layers = np.array([line[3] for line in head[km]])
+            r = np.array(self.r_cs)[layers]
+            x, y = get_pos(slots, r=r)
+            connect = np.zeros(x.shape, dtype=bool)
+            connect[:, 0] = True
             pen = pg.mkPen(get_phase_color(km), width=1.5)
-
-            # Bug in pyqtgraph / qtpy > v5.12.1
-            #  curve = pg.PlotCurveItem(
-            #  x, y, pen=pen, name="Phase " + str(km + 1), connect="finite"
-            #  )
-            #  self.fig.addItem(curve)
-
-            i_name = 0
-            for xtmp, ytmp in zip(*group_on_nan(x, y)):
-                name = "Phase " + Alpha[km] if i_name == 0 else None
-                curve = pg.PlotCurveItem(
-                    xtmp, ytmp, pen=pen, name=name, connect="finite"
-                )
-                self.fig.addItem(curve)
-                i_name += 1
+            curve = pg.PlotCurveItem(
+                x.ravel(),
+                y.ravel(),
+                pen=pen,
+                name="Phase " + Alpha[km],
+                connect=connect.ravel(),
+            )
+            self.fig.addItem(curve)
 
         # draw poles
         if draw_poles:
             alpha_m = config["plt"]["magnet_alpha_m"]
             magnet_colors = config["plt"]["magnet_colors"]
             magnet_linewidth = config["plt"]["magnet_linewidth"]
-            alpha = np.linspace(0, 2 * np.pi / P * alpha_m, 100)
-            alpha -= np.max(alpha / 2)  # middle of the pole on alpha = 0°
-            for kp in range(P):
-                vec = self.r_magnets * np.exp(1j * (alpha + kp * 2 * np.pi / P))
-                if kp % 2 == 0:
-                    pen = pg.mkPen(magnet_colors[0], width=magnet_linewidth)
-                else:
-                    pen = pg.mkPen(magnet_colors[1], width=magnet_linewidth)
-                curve = pg.PlotCurveItem(vec.real, vec.imag, pen=pen)
+            lines = geometry.gen_poles_polar(P, alpha_m, self.r_magnets)
+            for kp, (x, y, connect) in enumerate(lines):
+                pen = pg.mkPen(magnet_colors[kp], width=magnet_linewidth)
+                curve = pg.PlotCurveItem(x, y, pen=pen, connect=connect)
                 self.fig.addItem(curve)
 
+        # slot numbers (level of detail)
+        x, y = get_pos(np.arange(Q), r=self.r_slottext)
+        scale = 1 if Q <= 60 else 1 / (Q / 60)
+        self.labels.set_labels(x, y, [str(k + 1) for k in range(Q)], scale=scale)
+
         #  self.fig.autoRange()  # fails -> manual range
         self.fig.setXRange(-self.ra, self.ra)
         self.fig.setYRange(-self.ra, self.ra)
@@ -555,6 +526,7 @@ class _overhang_plot:
         self.fig.getAxis("bottom").hide()
         self.fig.getAxis("left").hide()
         self.leg = self.fig.addLegend(offset=(-10, 10))
+        self.labels = _labels(self.fig)
 
     def plot(self, data=None, show=False, optimize_overhang=False):
         self.show = show
@@ -578,113 +550,51 @@ class _overhang_plot:
         #  curve = pg.PlotCurveItem(x, y, pen=pen, connect='finite')
         #  self.fig.addItem(curve)
 
-        # plot slots - filling
-        brush = pg.mkBrush(color="#BFBFBF")
-        x, y_upper, y_lower = gen_slot_filling(Q, bz=self.bz, hz=self.hz)
-
-        # Bug in pyqtgraph / qtpy > v5.12.1
-        #  c1 = pg.PlotCurveItem(x, y_upper, connect="finite")
-        #  c2 = pg.PlotCurveItem(x, y_lower, connect="finite")
-        #  fill = pg.FillBetweenItem(c1, c2, brush=brush)
-        #  self.fig.addItem(fill)
-
-        _, y_upper = group_on_nan(x, y_upper)
-        x, y_lower = group_on_nan(x, y_lower)
-        for xtmp, y_upper_tmp, y_lower_tmp in zip(x, y_upper, y_lower):
-            c1 = pg.PlotCurveItem(xtmp, y_upper_tmp, connect="finite")
-            c2 = pg.PlotCurveItem(xtmp, y_lower_tmp, connect="finite")
-            fill = pg.FillBetweenItem(c1, c2, brush=brush)
-            self.fig.addItem(fill)
+        # plot slots - filling (teeth as one item)
+        x0, x1 = gen_tooth_rects(Q, bz=self.bz)
+        teeth = pg.BarGraphItem(
+            x0=x0,
+            x1=x1,
+            y0=-self.hz,
+            y1=self.hz,
+            brush=pg.mkBrush(color="#BFBFBF"),
+            pen=pg.mkPen(None),
+        )
+        self.fig.addItem(teeth)
 
         head = self.data.get_wdg_overhang(optimize_overhang=optimize_overhang)
 
-        i = 1
-        for phase in head:
-            x = []
-            y = []
-            for coil in phase:
-                w = coil[1]
-                x_, y_ = gen_coil_lines(
-                    coil[1], h1=self.h1, h2=0.5 + w / 6, db1=self.db1, Np1=self.Np1
-                )
-                x_, y_ = np.array(x_), np.array(y_)
+        # arrows (winding direction) of all coils as one scatter item
+        xa, ya, symbols, brushes = [], [], [], []
+        arrow = [_symbol_arrow(90), _symbol_arrow(-90)]
+        for i, phase in enumerate(head):
+            x, y, connect = gen_coil_paths(
+                phase, Q, h1=self.h1, db1=self.db1, Np1=self.Np1
+            )
+            pen = pg.mkPen(color=get_phase_color(i), width=config["plt"]["lw"])
+            curve = pg.PlotCurveItem(
+                x, y, pen=pen, connect=connect, name="Phase " + Alpha[i]
+            )
+            self.fig.addItem(curve)
 
-                direct = coil[2]
-                if direct > 0:
-                    x_ += coil[0][0] - 1
-                else:
-                    x_ += coil[0][1] - 1
-
-                # split coil on right border
-                x_2 = x_.copy()
-                y_2 = y_.copy()
-                x_2[x_ < Q - 0.5] = np.nan
-                x_2 -= Q
-                y_2[x_ < Q - 0.5] = np.nan
-                y_[x_ > Q - 0.5] = np.nan
-                x_[x_ > Q - 0.5] = np.nan
-                x += x_.tolist()
-                y += y_.tolist()
-                x += [np.nan]
-                y += [np.nan]
-                x += x_2.tolist()
-                y += y_2.tolist()
-                x += [np.nan]
-                y += [np.nan]
-
-                # plot arrows (winding direction)
-                arrow = pg.ArrowItem(
-                    angle=90,
-                    headLen=16,
-                    pen={"color": get_phase_color(i - 1)},
-                    brush=get_phase_color(i - 1),
-                )
-                if coil[2] > 0:
-                    arrow.setPos(coil[0][0] - 1 + self.db1, 0)
-                else:
-                    arrow.setPos(coil[0][0] - 1 - self.db1, 0)
-                self.fig.addItem(arrow)
-
-                arrow = pg.ArrowItem(
-                    angle=-90,
-                    headLen=16,
-                    pen={"color": get_phase_color(i - 1)},
-                    brush=get_phase_color(i - 1),
-                )
+            for coil in phase:
                 if coil[2] > 0:
-                    arrow.setPos(coil[0][1] - 1 - self.db1, 0)
+                    xa += [coil[0][0] - 1 + self.db1, coil[0][1] - 1 - self.db1]
                 else:
-                    arrow.setPos(coil[0][1] - 1 + self.db1, 0)
-                self.fig.addItem(arrow)
-
-            pen = pg.mkPen(color=get_phase_color(i - 1), width=config["plt"]["lw"])
-
-            # Bug in pyqtgraph / qtpy > v5.12.1
-            #  curve = pg.PlotCurveItem(
-            #  x, y, pen=pen, connect="finite", name="Phase " + str(i)
-            #  )
-            #  self.fig.addItem(curve)
-
-            i_name = 0
-            for xtmp, ytmp in zip(*group_on_nan(x, y)):
-                name = "Phase " + Alpha[i - 1] if i_name == 0 else None
-                curve = pg.PlotCurveItem(
-                    xtmp, ytmp, pen=pen, connect="finite", name=name
-                )
-                self.fig.addItem(curve)
-                i_name += 1
-
-            i += 1
+                    xa += [coil[0][0] - 1 - self.db1, coil[0][1] - 1 + self.db1]
+                ya += [0, 0]
+                symbols += arrow
+            brushes += [pg.mkBrush(get_phase_color(i))] * (2 * len(phase))
+        if len(xa) > 0:
+            arrows = pg.ScatterPlotItem(
+                xa, ya, symbol=symbols, brush=brushes, pen=None, size=16
+            )
+            self.fig.addItem(arrows)
 
-        # plot slot number
-        for k in range(Q):
-            text = pg.TextItem(anchor=(0.5, 0.5))
-            text.setPlainText(str(k))
-            text.setPos(k, -self.h1 / 2)
-            text.setColor("k")
-            self.fig.addItem(
-                text, ignoreBounds=True
-            )  # ignore because autoRange have problems with it
+        # slot numbers (level of detail)
+        self.labels.set_labels(
+            np.arange(Q), np.full(Q, -self.h1 / 2), [str(k) for k in range(Q)]
+        )
 
         self.fig.autoRange()
         if self.show:
@@ -728,6 +638,31 @@ class _slot_star:
         self.fig.getAxis("left").hide()
         self.fig.setAspectLocked(lock=True, ratio=1)
         self.leg = self.fig.addLegend(offset=(-10, 10))
+        self._results = None  # results of the cached phasors
+        self._cache = {}
+
+    def get_phasors(self):
+        """
+        Returns the slot voltage phasors of the winding. They are cached
+        until the results of the winding change.
+        """
+        if self._results is not self.data.results:
+            self._results = self.data.results
+            self._cache = {"Ei_el": self.data.results["Ei_el"]}
+        return self._cache["Ei_el"]
+
+    def get_star(self, harmonic_idx, ForceX=None):
+        """
+        Returns the cumulated phasors of all phases (see
+        geometry.gen_star) for the harmonic
+        """
+        Ei_el = self.get_phasors()
+        key = (harmonic_idx, bool(ForceX))
+        if key not in self._cache:
+            ei = Ei_el[harmonic_idx]
+            dangle = np.angle(np.sum(ei[0])) if ForceX else None
+            self._cache[key] = [geometry.gen_star(vek, dangle) for vek in ei]
+        return self._cache[key]
 
     def plot(self, data, harmonic_idx=0, ForceX=None, show=False):
         self.data = data
@@ -738,7 +673,8 @@ class _slot_star:
         self.fig.clear()
         _pg_clear_legend(self.leg)
 
-        if len(self.data.results["Ei_el"]) == 0:  # no data to plot
+        Ei_el = self.get_phasors()
+        if Ei_el is None or len(Ei_el) == 0:  # no data to plot
             if self.table is not None:
                 self.table.clear()
             return
@@ -746,77 +682,30 @@ class _slot_star:
         self.fig.disableAutoRange()  # disable because of porformance
         # (a lot of elements are plottet)
 
-        xlim = [
-            0,
-            0,
-        ]  # find limit manually, because autoscale doesn't work with plt.arrow()
-        ylim = [0, 0]
-
-        def plot_vek(vek, color="k", dangle=None, idx=None):
-            """
-            vek: list of complex values
-            dangle: All phasors get shifted by dangle
-            """
-            if dangle is not None:
-                A = np.abs(vek)
-                ph = np.angle(vek)
-                ph -= dangle
-                vek = A * np.exp(1j * ph)
-
-            old = 0 + 0j
-            v = np.cumsum(vek)
-
-            for k in range(
-                len(vek)
-            ):  # find limit manually, because autoscale doesn't work with plt.arrow()
-                if min(v.real) < xlim[0]:
-                    xlim[0] = min(v.real)
-                if max(v.real) > xlim[1]:
-                    xlim[1] = max(v.real)
-                if min(v.imag) < ylim[0]:
-                    ylim[0] = min(v.imag)
-                if max(v.imag) > ylim[1]:
-                    ylim[1] = max(v.imag)
-
-                arrow = pg.ArrowItem(
-                    angle=180 - np.angle(vek[k]) / np.pi * 180,
-                    headLen=12,
-                    pen={"color": color},
-                    brush=color,
-                )
-                arrow.setPos(old.real + vek[k].real, old.imag + vek[k].imag)
-                self.fig.addItem(arrow)
-                line = pg.PlotCurveItem(
-                    [old.real, vek[k].real + old.real],
-                    [old.imag, vek[k].imag + old.imag],
-                    pen={"color": color, "width": config["plt"]["lw"]},
-                )
-                self.fig.addItem(line)
-
-                old = v[k]
+        lw = config["plt"]["lw"]
+        for k, (pts, angle) in enumerate(self.get_star(harmonic_idx, ForceX)):
+            color = get_phase_color(k)
+            # all phasors of the phase as one line and one arrow item
             line = pg.PlotCurveItem(
-                [0.0, v[-1].real],
-                [0.0, v[-1].imag],
-                name="Phase " + str(idx + 1),
-                pen={
-                    "color": color,
-                    "width": config["plt"]["lw"],
-                    "style": pg.QtCore.Qt.DashLine,
-                },
+                pts.real, pts.imag, pen={"color": color, "width": lw}
             )
             self.fig.addItem(line)
-
-        if ForceX:
-            angle_phase1 = np.angle(np.sum(self.data.results["Ei_el"][harmonic_idx][0]))
-        else:
-            angle_phase1 = None
-        for k in range(len(self.data.results["Ei_el"][harmonic_idx])):
-            plot_vek(
-                self.data.results["Ei_el"][harmonic_idx][k],
-                color=get_phase_color(k),
-                dangle=angle_phase1,
-                idx=k,
+            arrows = pg.ScatterPlotItem(
+                pts.real[1:],
+                pts.imag[1:],
+                symbol=[_symbol_arrow(a) for a in np.round(angle).astype(int)],
+                size=12,
+                pen={"color": color},
+                brush=color,
             )
+            self.fig.addItem(arrows)
+            line = pg.PlotCurveItem(
+                [0.0, pts[-1].real],
+                [0.0, pts[-1].imag],
+                name="Phase " + str(k + 1),
+                pen={"color": color, "width": lw, "style": pg.QtCore.Qt.DashLine},
+            )
+            self.fig.addItem(line)
 
         self.fig.autoRange()
         if show:
@@ -824,7 +713,7 @@ class _slot_star:
             self.app.exec_()
 
         # update table:
-        ei = self.data.results["Ei_el"][harmonic_idx]
+        ei = Ei_el[harmonic_idx]
 
         if self.table is not None:
             self.table.setRowCount(len(ei))
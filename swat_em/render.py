@@ -0,0 +1,1057 @@
+# -*- coding: utf-8 -*-
+"""
+Provides a headless export of the winding figures (slot layout, polar
+layout, winding overhang, star of slots, winding factor and MMF) as SVG
+or PNG. Unlike plots.py no Qt and no display are needed: the figures
+are built from the cached results and the geometry module and written
+by a small SVG writer or a numpy rasterizer. Several figures can be
+rendered concurrently, so reports can be created in worker processes
+of a server:
+
+    fig = star_figure(data)
+    save(fig, "star.svg")
+
+    export_figures(data, [("star", "star.png", {}), ("MMK", "MMK.png", {})])
+"""
+import os
+import zlib
+import base64
+import struct
+import functools
+import concurrent.futures
+from xml.sax.saxutils import escape
+import numpy as np
+from swat_em import analyse
+from swat_em import geometry
+from swat_em import glyphs
+from swat_em.config import config, get_phase_color, get_line_color
+
+# supersampling of the rasterizer (antialiasing)
+SUPERSAMPLING = 3
+
+# max. number of slot numbers in a figure
+MAX_LABELS = 60
+
+FONT_FAMILY = "DejaVu Sans, Verdana, Arial, sans-serif"
+
+
+def _rgb(color):
+    """
+    Returns the color '#RRGGBB' (or 'k', 'w') as rgb array 0..1
+    """
+    color = {"k": "#000000", "w": "#FFFFFF"}.get(color, color)
+    return np.array([int(color[k : k + 2], 16) for k in (1, 3, 5)]) / 255.0
+
+
+@functools.lru_cache(maxsize=1)
+def _get_font():
+    """
+    Returns the glyphs of the bitmap font as dict char -> alpha array
+    """
+    data = zlib.decompress(base64.b64decode("".join(glyphs.DATA)))
+    packed = np.frombuffer(data, dtype=np.uint8)
+    alpha = np.empty(2 * len(packed), dtype=np.float32)
+    alpha[0::2] = packed >> 4
+    alpha[1::2] = packed & 15
+    alpha /= 15.0
+    font = {}
+    i = 0
+    for ch, w in zip(glyphs.CHARS, glyphs.WIDTHS):
+        n = w * glyphs.HEIGHT
+        font[ch] = alpha[i : i + n].reshape(glyphs.HEIGHT, w)
+        i += n
+    return font
+
+
+def text_width(text, size):
+    """
+    Returns the width of a text in pixel (font size 'size' in pixel)
+    """
+    w = dict(zip(glyphs.CHARS, glyphs.WIDTHS))
+    return sum(w.get(ch, w["?"]) for ch in text) * size / glyphs.SIZE
+
+
+def _ticks(lo, hi, num=6):
+    """
+    Returns nice tick positions (steps of 1, 2, 5 * 10^n) between lo and hi
+    """
+    if hi <= lo:
+        return np.array([lo]), 1.0
+    raw = (hi - lo) / num
+    mag = 10 ** np.floor(np.log10(raw))
+    step = mag * min([1, 2, 5, 10], key=lambda s: abs(s * mag - raw))
+    ticks = np.arange(np.ceil(lo / step), np.floor(hi / step) + 1) * step
+    return ticks, step
+
+
+def _fmt(value, step):
+    decimals = max(0, int(-np.floor(np.log10(step))))
+    return "{:.{}f}".format(value, decimals)
+
+
+class panel:
+    """
+    One plot area of a figure. All items are defined in data
+    coordinates; markers and texts have a size in pixel.
+
+    Parameters
+    ----------
+    rect :   tuple
+             (x, y, width, height) of the panel relative to the figure
+             (y from the top)
+    aspect : Bool
+             If True the x and y axis have the same scale
+    axes :   Bool
+             If True the axes with ticks, grid and labels are drawn
+    """
+
+    def __init__(self, rect=(0, 0, 1, 1), aspect=False, axes=False):
+        self.rect = rect
+        self.aspect = aspect
+        self.axes = axes
+        self.xlabel = ""
+        self.ylabel = ""
+        self.xlim = [None, None]
+        self.ylim = [None, None]
+        self.items = []
+        self.legend = []
+
+    def line(self, x, y, color, width=1.0, connect=None, dash=False, label=None):
+        """
+        Adds a line (connect[i] is True if point i is connected to i+1)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if connect is None:
+            connect = np.ones(len(x), dtype=bool)
+        connect = np.asarray(connect, dtype=bool).copy()
+        if len(connect) > 0:
+            connect[-1] = False
+        self.items.append(("line", x, y, connect, color, width, dash))
+        if label is not None:
+            self.legend.append((label, color, dash))
+
+    def rects(self, x0, x1, y0, y1, color, label=None):
+        """
+        Adds filled rectangles (bars)
+        """
+        x0, x1, y0, y1 = np.broadcast_arrays(
+            *[np.asarray(v, dtype=float) for v in (x0, x1, y0, y1)]
+        )
+        self.items.append(
+            ("rects", x0.ravel(), x1.ravel(), y0.ravel(), y1.ravel(), color)
+        )
+        if label is not None:
+            self.legend.append((label, color, False))
+
+    def markers(self, x, y, symbol, color, size=10, angle=None):
+        """
+        Adds markers with the size in pixel. Symbols: 'arrow' (tip at the
+        position, direction 'angle' in degree), 'cross' (circle with a
+        cross), 'dot' (circle with a dot)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        angle = np.zeros(len(x)) if angle is None else np.broadcast_to(angle, x.shape)
+        self.items.append(("markers", x, y, symbol, color, size, np.asarray(angle)))
+
+    def text(self, x, y, texts, color="k", size=13, bold=False):
+        """
+        Adds texts centered at the positions; they are not used for the
+        range of the axes
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if isinstance(texts, str):
+            texts = [texts]
+        self.items.append(("text", x, y, list(texts), color, size, bold))
+
+    def get_range(self):
+        """
+        Returns the range of the data (with a margin of 2%)
+        """
+        xs, ys = [], []
+        for item in self.items:
+            if item[0] in ("line", "markers"):
+                xs.append(item[1])
+                ys.append(item[2])
+            elif item[0] == "rects":
+                xs += [item[1], item[2]]
+                ys += [item[3], item[4]]
+        xs = np.concatenate(xs) if xs else np.zeros(1)
+        ys = np.concatenate(ys) if ys else np.zeros(1)
+        xs, ys = xs[np.isfinite(xs)], ys[np.isfinite(ys)]
+        lim = []
+        for v, user in ((xs, self.xlim), (ys, self.ylim)):
+            lo, hi = (v.min(), v.max()) if len(v) else (0.0, 1.0)
+            d = 0.02 * (hi - lo) if hi > lo else 0.5
+            lo = user[0] if user[0] is not None else lo - d
+            hi = user[1] if user[1] is not None else hi + d
+            lim.append([lo, hi])
+        return lim
+
+    def get_transform(self, width, height):
+        """
+        Returns the plot area in pixel and the transformation from data
+        coordinates to pixel
+        """
+        x, y, w, h = self.rect
+        left, top = x * width, y * height
+        right, bottom = left + w * width, top + h * height
+        if self.axes:
+            left += 75
+            bottom -= 55
+            top += 15
+            right -= 20
+        else:
+            left, top, right, bottom = left + 10, top + 10, right - 10, bottom - 10
+        (x0, x1), (y0, y1) = self.get_range()
+        sx = (right - left) / (x1 - x0)
+        sy = (bottom - top) / (y1 - y0)
+        if self.aspect:
+            s = min(sx, sy)
+            xm, ym = (x0 + x1) / 2, (y0 + y1) / 2
+            x0, x1 = xm - (right - left) / s / 2, xm + (right - left) / s / 2
+            y0, y1 = ym - (bottom - top) / s / 2, ym + (bottom - top) / s / 2
+            sx = sy = s
+
+        def transform(xd, yd):
+            px = left + (np.asarray(xd) - x0) * sx
+            py = bottom - (np.asarray(yd) - y0) * sy
+            return px, py
+
+        return (left, top, right, bottom), ((x0, x1), (y0, y1)), transform
+
+    def draw(self, canvas, width, height):
+        area, lim, tf = self.get_transform(width, height)
+        left, top, right, bottom = area
+        if self.axes:
+            self._draw_grid(canvas, area, lim, tf)
+        canvas.clip(area if self.axes else None)
+        for item in self.items:
+            kind = item[0]
+            if kind == "line":
+                _, x, y, connect, color, lw, dash = item
+                px, py = tf(x, y)
+                canvas.polyline(px, py, connect, color, lw, dash)
+            elif kind == "rects":
+                _, x0, x1, y0, y1, color = item
+                px0, py0 = tf(x0, y0)
+                px1, py1 = tf(x1, y1)
+                canvas.rects(px0, py1, px1, py0, color)
+            elif kind == "markers":
+                _, x, y, symbol, color, size, angle = item
+                px, py = tf(x, y)
+                _draw_markers(canvas, px, py, symbol, color, size, angle)
+            elif kind == "text":
+                _, x, y, texts, color, size, bold = item
+                px, py = tf(x, y)
+                for k in range(len(texts)):
+                    canvas.text(px[k], py[k], texts[k], color, size, bold=bold)
+        canvas.clip(None)
+        if self.axes:
+            self._draw_axes(canvas, area, lim, tf)
+        if self.legend:
+            self._draw_legend(canvas, area)
+
+    def _draw_grid(self, canvas, area, lim, tf):
+        left, top, right, bottom = area
+        xt, _ = _ticks(*lim[0])
+        yt, _ = _ticks(*lim[1])
+        px, _ = tf(xt, 0)
+        _, py = tf(0, yt)
+        x = np.column_stack([px, px]).ravel()
+        y = np.tile([top, bottom], len(px))
+        canvas.polyline(x, y, np.tile([True, False], len(px)), "#DDDDDD", 1.0)
+        x = np.tile([left, right], len(py))
+        y = np.column_stack([py, py]).ravel()
+        canvas.polyline(x, y, np.tile([True, False], len(py)), "#DDDDDD", 1.0)
+
+    def _draw_axes(self, canvas, area, lim, tf):
+        left, top, right, bottom = area
+        x = np.array([left, right, right, left, left])
+        y = np.array([top, top, bottom, bottom, top])
+        canvas.polyline(x, y, np.array([1, 1, 1, 1, 0], dtype=bool), "k", 1.0)
+        xt, xstep = _ticks(*lim[0])
+        yt, ystep = _ticks(*lim[1])
+        px, _ = tf(xt, 0)
+        _, py = tf(0, yt)
+        for v, p in zip(xt, px):
+            canvas.polyline([p, p], [bottom, bottom + 5], [True, False], "k", 1.0)
+            canvas.text(p, bottom + 16, _fmt(v, xstep), "k", 12)
+        for v, p in zip(yt, py):
+            canvas.polyline([left - 5, left], [p, p], [True, False], "k", 1.0)
+            canvas.text(left - 8, p, _fmt(v, ystep), "k", 12, anchor="right")
+        if self.xlabel:
+            canvas.text((left + right) / 2, bottom + 40, self.xlabel, "k", 14)
+        if self.ylabel:
+            ym = (top + bottom) / 2
+            canvas.text(left - 58, ym, self.ylabel, "k", 14, rotate=True)
+
+    def _draw_legend(self, canvas, area):
+        left, top, right, bottom = area
+        size = 12
+        w = max(text_width(label, size) for label, c, d in self.legend) + 45
+        h = 18 * len(self.legend) + 8
+        x0, y0 = right - w - 10, top + 10
+        canvas.rects([x0], [y0], [x0 + w], [y0 + h], "#FFFFFF")
+        x = np.array([x0, x0 + w, x0 + w, x0, x0])
+        y = np.array([y0, y0, y0 + h, y0 + h, y0])
+        canvas.polyline(x, y, np.array([1, 1, 1, 1, 0], dtype=bool), "#999999", 1.0)
+        for k, (label, color, dash) in enumerate(self.legend):
+            yk = y0 + 13 + 18 * k
+            x = [x0 + 8, x0 + 32]
+            canvas.polyline(x, [yk, yk], [True, False], color, 2.0, dash)
+            canvas.text(x0 + 38, yk, label, "k", size, anchor="left")
+
+
+class figure:
+    """
+    Figure with one or more panels
+
+    Parameters
+    ----------
+    res : list
+          resolution [width, height] in pixel
+    """
+
+    def __init__(self, res=None):
+        if res is None:
+            res = config["plt"]["res"]
+        self.width, self.height = int(res[0]), int(res[1])
+        self.panels = []
+
+    def add_panel(self, rect=(0, 0, 1, 1), aspect=False, axes=False):
+        p = panel(rect, aspect, axes)
+        self.panels.append(p)
+        return p
+
+    def draw(self, canvas):
+        for p in self.panels:
+            p.draw(canvas, self.width, self.height)
+
+
+def _circle_points(n=24):
+    a = np.linspace(0, 2 * np.pi, n + 1)
+    return np.cos(a), np.sin(a)
+
+
+def _draw_markers(canvas, px, py, symbol, color, size, angle):
+    if len(px) == 0:
+        return
+    if symbol == "arrow":
+        a = np.deg2rad(angle)
+        d = np.column_stack([np.cos(a), -np.sin(a)])  # pixel y points downwards
+        n = np.column_stack([-d[:, 1], d[:, 0]])
+        tip = np.column_stack([px, py])
+        poly = np.stack(
+            [tip, tip - size * d + 0.22 * size * n, tip - size * d - 0.22 * size * n],
+            axis=1,
+        )
+        canvas.polygons(poly, color)
+    else:
+        r = size / 2
+        cx, cy = _circle_points()
+        x = (px[:, None] + r * cx[None, :]).ravel()
+        y = (py[:, None] + r * cy[None, :]).ravel()
+        connect = np.ones((len(px), len(cx)), dtype=bool)
+        connect[:, -1] = False
+        canvas.polyline(x, y, connect.ravel(), color, 1.5)
+        if symbol == "cross":
+            d = r / np.sqrt(2)
+            x = np.column_stack([px - d, px + d, px - d, px + d]).ravel()
+            y = np.column_stack([py - d, py + d, py + d, py - d]).ravel()
+            connect = np.tile([True, False], 2 * len(px))
+            canvas.polyline(x, y, connect, color, 1.5)
+        else:
+            cx, cy = _circle_points(8)
+            poly = np.stack(
+                [px[:, None] + 0.12 * size * cx, py[:, None] + 0.12 * size * cy],
+                axis=2,
+            )
+            canvas.polygons(poly, color)
+
+
+class _svgcanvas:
+    """
+    Writes the items of a figure as SVG
+    """
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.elements = []
+        self._clip = None
+        self._num_clips = 0
+
+    def clip(self, area):
+        if area is None:
+            self._clip = None
+            return
+        left, top, right, bottom = area
+        self._num_clips += 1
+        self._clip = "clip{}".format(self._num_clips)
+        self.elements.append(
+            '<clipPath id="{}"><rect x="{:.2f}" y="{:.2f}" width="{:.2f}" '
+            'height="{:.2f}"/></clipPath>'.format(
+                self._clip, left, top, right - left, bottom - top
+            )
+        )
+
+    def _clip_attr(self):
+        return ' clip-path="url(#{})"'.format(self._clip) if self._clip else ""
+
+    def polyline(self, x, y, connect, color, width, dash=False):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        connect = np.asarray(connect, dtype=bool)
+        ok = np.isfinite(x) & np.isfinite(y)
+        # a point starts a new subpath if it isn't connected to the previous
+        start = np.ones(len(x), dtype=bool)
+        start[1:] = ~(connect[:-1] & ok[:-1])
+        d = []
+        for k in np.flatnonzero(ok):
+            d.append("{}{:.2f} {:.2f}".format("M" if start[k] else "L", x[k], y[k]))
+        if not d:
+            return
+        self.elements.append(
+            '<path d="{}" fill="none" stroke="{}" stroke-width="{}" '
+            'stroke-linejoin="round"{}{}/>'.format(
+                " ".join(d),
+                _svgcolor(color),
+                width,
+                ' stroke-dasharray="6 4"' if dash else "",
+                self._clip_attr(),
+            )
+        )
+
+    def rects(self, x0, y0, x1, y1, color):
+        d = []
+        for a, b, c, e in zip(x0, y0, x1, y1):
+            a, c = min(a, c), max(a, c)
+            b, e = min(b, e), max(b, e)
+            d.append("M{:.2f} {:.2f}H{:.2f}V{:.2f}H{:.2f}Z".format(a, b, c, e, a))
+        self.elements.append(
+            '<path d="{}" fill="{}" stroke="none"{}/>'.format(
+                "".join(d), _svgcolor(color), self._clip_attr()
+            )
+        )
+
+    def polygons(self, poly, color):
+        d = []
+        for p in poly:
+            d.append(
+                "M" + " L".join("{:.2f} {:.2f}".format(x, y) for x, y in p) + "Z"
+            )
+        self.elements.append(
+            '<path d="{}" fill="{}" stroke="none"{}/>'.format(
+                " ".join(d), _svgcolor(color), self._clip_attr()
+            )
+        )
+
+    def text(self, x, y, text, color, size, bold=False, anchor="center", rotate=False):
+        attr = {"center": "middle", "left": "start", "right": "end"}[anchor]
+        transform = ""
+        if rotate:
+            transform = ' transform="rotate(-90 {:.2f} {:.2f})"'.format(x, y)
+        self.elements.append(
+            '<text x="{:.2f}" y="{:.2f}" font-size="{}" fill="{}" '
+            'text-anchor="{}" dominant-baseline="central"{}{}>{}</text>'.format(
+                x,
+                y,
+                size,
+                _svgcolor(color),
+                attr,
+                ' font-weight="bold"' if bold else "",
+                transform,
+                escape(text),
+            )
+        )
+
+    def save(self, fname):
+        with open(fname, "w", encoding="utf-8") as f:
+            f.write(self.tostring())
+
+    def tostring(self):
+        head = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            'width="{0}" height="{1}" viewBox="0 0 {0} {1}" '
+            'font-family="{2}">\n'
+            '<rect width="100%" height="100%" fill="white"/>\n'
+        ).format(self.width, self.height, FONT_FAMILY)
+        return head + "\n".join(self.elements) + "\n</svg>\n"
+
+
+def _svgcolor(color):
+    return {"k": "#000000", "w": "#FFFFFF"}.get(color, color)
+
+
+class _rastercanvas:
+    """
+    Rasterizes the items of a figure with numpy. The image is drawn
+    with supersampling and reduced to the resolution of the figure
+    (antialiasing).
+    """
+
+    def __init__(self, width, height, ss=SUPERSAMPLING):
+        self.width, self.height, self.ss = width, height, ss
+        self.img = np.ones((height * ss, width * ss, 3), dtype=np.float32)
+        self._clip = (0, 0, width * ss, height * ss)
+
+    def clip(self, area):
+        H, W = self.img.shape[:2]
+        if area is None:
+            self._clip = (0, 0, W, H)
+        else:
+            s = self.ss
+            left, top, right, bottom = area
+            self._clip = (
+                max(int(left * s), 0),
+                max(int(top * s), 0),
+                min(int(np.ceil(right * s)) + 1, W),
+                min(int(np.ceil(bottom * s)) + 1, H),
+            )
+
+    def _paint(self, ix, iy, color, r=0.0):
+        """
+        Sets the pixels (ix, iy) to the color (inside the clip area). If
+        r > 0 a disk with the radius r is drawn around every pixel.
+        """
+        if len(ix) == 0:
+            return
+        k = int(np.ceil(r))
+        cx0, cy0, cx1, cy1 = self._clip
+        x0, x1 = max(ix.min() - k, cx0), min(ix.max() + k + 1, cx1)
+        y0, y1 = max(iy.min() - k, cy0), min(iy.max() + k + 1, cy1)
+        if x1 <= x0 or y1 <= y0:
+            return
+        # mark the centers in a mask of the bounding box (with a border
+        # of k pixel), duplicates are cheap in a bool mask
+        h, w = y1 - y0 + 2 * k, x1 - x0 + 2 * k
+        ok = (ix >= x0 - k) & (ix < x1 + k) & (iy >= y0 - k) & (iy < y1 + k)
+        mask = np.zeros((h, w), dtype=bool)
+        mask[iy[ok] - y0 + k, ix[ok] - x0 + k] = True
+        if k > 0:
+            mask = _dilate(mask, r)
+        self.img[y0:y1, x0:x1][mask[k : h - k, k : w - k]] = _rgb(color)
+
+    def polyline(self, x, y, connect, color, width, dash=False):
+        s = self.ss
+        x, y = np.asarray(x, dtype=float) * s, np.asarray(y, dtype=float) * s
+        connect = np.asarray(connect, dtype=bool)
+        ok = connect[:-1] & np.isfinite(x[:-1] + y[:-1] + x[1:] + y[1:])
+        x0, y0, x1, y1 = x[:-1][ok], y[:-1][ok], x[1:][ok], y[1:][ok]
+        if len(x0) == 0:
+            return
+        # sample the segments with a distance of half a pixel
+        length = np.hypot(x1 - x0, y1 - y0)
+        num = np.ceil(length / 0.5).astype(int) + 1
+        seg = np.repeat(np.arange(len(x0)), num)
+        first = np.cumsum(num) - num
+        t = (np.arange(len(seg)) - first[seg]) / np.maximum(num[seg] - 1, 1)
+        px = x0[seg] + t * (x1 - x0)[seg]
+        py = y0[seg] + t * (y1 - y0)[seg]
+        if dash:
+            dist = np.cumsum(np.append(0, length))[seg] + t * length[seg]
+            keep = (dist // (5 * s)) % 2 == 0
+            px, py = px[keep], py[keep]
+
+        # a disk with the line width around every sample
+        r = max(width * s / 2, 0.5 * s)
+        self._paint(np.round(px).astype(int), np.round(py).astype(int), color, r)
+
+    def rects(self, x0, y0, x1, y1, color):
+        s = self.ss
+        cx0, cy0, cx1, cy1 = self._clip
+        c = _rgb(color)
+        for a, b, e, f in zip(x0, y0, x1, y1):
+            a, e = sorted((a * s, e * s))
+            b, f = sorted((b * s, f * s))
+            a, e = max(int(round(a)), cx0), min(int(round(e)), cx1)
+            b, f = max(int(round(b)), cy0), min(int(round(f)), cy1)
+            if e > a and f > b:
+                self.img[b:f, a:e] = c
+
+    def polygons(self, poly, color):
+        """
+        Fills convex polygons (array: polygon x point x 2)
+        """
+        poly = np.asarray(poly, dtype=float) * self.ss
+        if len(poly) == 0:
+            return
+        # orientation of the polygons (for the half plane test)
+        p0, p1, p2 = poly[:, 0], poly[:, 1], poly[:, 2]
+        orient = np.sign(
+            (p1[:, 0] - p0[:, 0]) * (p2[:, 1] - p0[:, 1])
+            - (p1[:, 1] - p0[:, 1]) * (p2[:, 0] - p0[:, 0])
+        )
+        lo = np.floor(poly.min(axis=1)).astype(int)
+        hi = np.ceil(poly.max(axis=1)).astype(int)
+        k = int((hi - lo).max()) + 1
+        gx, gy = np.meshgrid(np.arange(k), np.arange(k))
+        gx, gy = gx.ravel(), gy.ravel()
+        # pixel centers of the bounding boxes of all polygons
+        X = lo[:, 0, None] + gx[None, :] + 0.5
+        Y = lo[:, 1, None] + gy[None, :] + 0.5
+        inside = np.ones(X.shape, dtype=bool)
+        for i in range(poly.shape[1]):
+            a = poly[:, i]
+            b = poly[:, (i + 1) % poly.shape[1]]
+            cross = (b[:, 0, None] - a[:, 0, None]) * (Y - a[:, 1, None]) - (
+                b[:, 1, None] - a[:, 1, None]
+            ) * (X - a[:, 0, None])
+            inside &= cross * orient[:, None] >= 0
+        self._paint(X[inside].astype(int), Y[inside].astype(int), color)
+
+    def text(self, x, y, text, color, size, bold=False, anchor="center", rotate=False):
+        alpha = _text_image(text, size * self.ss, bold)
+        if rotate:
+            alpha = np.rot90(alpha)
+        h, w = alpha.shape
+        x, y = x * self.ss, y * self.ss
+        if rotate:
+            x0, y0 = x - w / 2, y - h / 2
+        elif anchor == "left":
+            x0, y0 = x, y - h / 2
+        elif anchor == "right":
+            x0, y0 = x - w, y - h / 2
+        else:
+            x0, y0 = x - w / 2, y - h / 2
+        x0, y0 = int(round(x0)), int(round(y0))
+        H, W = self.img.shape[:2]
+        ax0, ay0 = max(0, -x0), max(0, -y0)
+        ax1, ay1 = min(w, W - x0), min(h, H - y0)
+        if ax1 <= ax0 or ay1 <= ay0:
+            return
+        a = alpha[ay0:ay1, ax0:ax1, None]
+        region = self.img[y0 + ay0 : y0 + ay1, x0 + ax0 : x0 + ax1]
+        region[:] = region * (1 - a) + _rgb(color) * a
+
+    def get_image(self):
+        """
+        Returns the image as uint8 array (height x width x 3)
+        """
+        s = self.ss
+        # block mean: first over the rows, then over the columns
+        img = self.img.reshape(self.height, s, -1).sum(axis=1)
+        img = img.reshape(self.height, self.width, s, 3).sum(axis=2)
+        return np.round(img * (255 / s ** 2)).astype(np.uint8)
+
+    def save(self, fname):
+        with open(fname, "wb") as f:
+            f.write(encode_png(self.get_image()))
+
+
+def _dilate(mask, r):
+    """
+    Dilates a bool mask with a disk of the radius r. The disk is split
+    into rows: each row is a horizontal dilation of the mask (grown
+    pixel by pixel) shifted in y direction.
+    """
+    k = int(np.ceil(r))
+    h = mask.shape[0]
+    rows = [mask]
+    for _ in range(k):
+        row = rows[-1].copy()
+        row[:, 1:] |= rows[-1][:, :-1]
+        row[:, :-1] |= rows[-1][:, 1:]
+        rows.append(row)
+    out = np.zeros_like(mask)
+    for dy in range(-k, k + 1):
+        if dy * dy > r * r + 0.25:
+            continue
+        row = rows[int(np.sqrt(r * r + 0.25 - dy * dy))]
+        if dy >= 0:
+            out[dy:] |= row[: h - dy]
+        else:
+            out[:dy] |= row[-dy:]
+    return out
+
+
+def _resize(a, h, w):
+    """
+    bilinear resize of a 2D array
+    """
+    y = np.clip((np.arange(h) + 0.5) * a.shape[0] / h - 0.5, 0, a.shape[0] - 1)
+    x = np.clip((np.arange(w) + 0.5) * a.shape[1] / w - 0.5, 0, a.shape[1] - 1)
+    y0, x0 = np.floor(y).astype(int), np.floor(x).astype(int)
+    y1, x1 = np.minimum(y0 + 1, a.shape[0] - 1), np.minimum(x0 + 1, a.shape[1] - 1)
+    fy, fx = (y - y0)[:, None], (x - x0)[None, :]
+    top = a[y0][:, x0] * (1 - fx) + a[y0][:, x1] * fx
+    bottom = a[y1][:, x0] * (1 - fx) + a[y1][:, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def _text_image(text, size, bold=False):
+    """
+    Returns the alpha mask of a text with the font size in pixel
+    """
+    font = _get_font()
+    parts = [font.get(ch, font["?"]) for ch in text]
+    if not parts:
+        return np.zeros((1, 1), dtype=np.float32)
+    alpha = np.hstack(parts)
+    if bold:
+        alpha = np.maximum(alpha, np.roll(alpha, 1, axis=1))
+    scale = size / glyphs.SIZE
+    h = max(int(round(alpha.shape[0] * scale)), 1)
+    w = max(int(round(alpha.shape[1] * scale)), 1)
+    return _resize(alpha, h, w)
+
+
+def encode_png(img):
+    """
+    Encodes an rgb image (uint8, height x width x 3) as PNG
+    """
+    h, w = img.shape[:2]
+    raw = np.zeros((h, 1 + 3 * w), dtype=np.uint8)  # filter type 0 per row
+    raw[:, 1:] = img.reshape(h, 3 * w)
+
+    def chunk(tag, data):
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def save(fig, fname):
+    """
+    Saves the figure as SVG or PNG (depending on the file extension)
+    """
+    if os.path.splitext(fname)[-1].upper() == ".SVG":
+        canvas = _svgcanvas(fig.width, fig.height)
+    else:
+        canvas = _rastercanvas(fig.width, fig.height)
+    fig.draw(canvas)
+    canvas.save(fname)
+
+
+def _label_stride(num):
+    """
+    Returns the step for the slot numbers, so that not more than
+    MAX_LABELS are shown
+    """
+    return max(1, -(-num // MAX_LABELS))
+
+
+# --- figures of the winding ---
+# The styles are the same as for the interactive plots (see plots.py)
+
+
+def layout_figure(data, res=None, draw_poles=False):
+    """
+    Figure of the winding layout (slots with coil sides)
+    """
+    sh, sw, so, dy, Qxmax = 0.8, 0.75, 0.2, 1.7, 12
+    fig = figure(res)
+    ax = fig.add_panel(aspect=True)
+    Q = data.get_num_slots()
+    P = 2 * data.get_num_polepairs()
+    x, y, connect = geometry.gen_slot_rows(Q, Qxmax, sh, sw, so, dy)
+    ax.line(x, y, "k", 1.5, connect)
+    x, y = geometry.gen_slot_positions(np.arange(1, Q + 1), Qxmax, dy)
+    ax.text(x, y - 0.2, [str(k + 1) for k in range(Q)], size=13)
+
+    devide = "v" if data.get_coilspan() == 1 else "h"
+    num_layers = max(data.get_num_layers(), 2)
+    for m, phase in enumerate(data.get_phases()):
+        for pos, layer in enumerate(phase):
+            if len(layer) == 0:
+                continue
+            layer = np.array(layer)
+            x, y = geometry.gen_slot_positions(np.abs(layer), Qxmax, dy)
+            y = y + sh / 2
+            # first layer at the bottom (or right), last layer at the top (or left)
+            shift = (pos - (num_layers - 1) / 2) / num_layers
+            if devide == "h":
+                y = y + shift * sh
+            else:
+                x = x - shift * sw
+            texts = [("+" if cs > 0 else "-") + str(m + 1) for cs in layer]
+            ax.text(x, y, texts, get_phase_color(m), size=14, bold=True)
+
+    if draw_poles:
+        lines = geometry.gen_poles_linear(
+            Q, P, config["plt"]["magnet_alpha_m"], Qxmax, dy
+        )
+        for kpole, (x, y, connect) in enumerate(lines):
+            ax.line(
+                x,
+                y,
+                config["plt"]["magnet_colors"][kpole],
+                config["plt"]["magnet_linewidth"],
+                connect,
+            )
+    return fig
+
+
+def polar_layout_figure(data, res=None, optimize_overhang=False, draw_poles=False):
+    """
+    Figure of the winding layout in polar coordinates
+    """
+    ra, r_slottext, dr_cs, r_magnets = 1.3, 1.2, 0.1, 0.75
+    fig = figure(res)
+    ax = fig.add_panel(aspect=True)
+    ax.xlim = [-ra, ra]
+    ax.ylim = [-ra, ra]
+    Q = data.get_num_slots()
+    P = 2 * data.get_num_polepairs()
+    num_layers = max(data.get_num_layers(), 2)
+    dr = min(dr_cs, 0.2 / (num_layers - 1))
+    r_cs = np.array([1 - k * dr for k in range(num_layers)])
+    size = 14 if Q <= 60 else max(14 * 60 / Q, 3)
+
+    for km, phase in enumerate(data.get_phases()):
+        for kl, layer in enumerate(phase):
+            cs = np.array(layer, dtype=int)
+            x, y = geometry.gen_polar_positions(np.abs(cs) - 1, Q, r_cs[kl])
+            color = get_phase_color(km)
+            ax.markers(x[cs > 0], y[cs > 0], "cross", color, size)
+            ax.markers(x[cs < 0], y[cs < 0], "dot", color, size)
+
+    head = data.get_wdg_overhang(optimize_overhang=optimize_overhang)
+    for km, phase in enumerate(head):
+        if len(phase) == 0:
+            continue
+        slots = np.array([line[0] for line in phase]) - 1
+        layers = np.array([line[3] for line in phase])
+        x, y = geometry.gen_polar_positions(slots, Q, r_cs[layers])
+        connect = np.zeros(x.shape, dtype=bool)
+        connect[:, 0] = True
+        ax.line(
+            x.ravel(),
+            y.ravel(),
+            get_phase_color(km),
+            1.5,
+            connect.ravel(),
+            label="Phase " + data.get_phasenames()[km],
+        )
+
+    if draw_poles:
+        lines = geometry.gen_poles_polar(P, config["plt"]["magnet_alpha_m"], r_magnets)
+        for kp, (x, y, connect) in enumerate(lines):
+            ax.line(
+                x,
+                y,
+                config["plt"]["magnet_colors"][kp],
+                config["plt"]["magnet_linewidth"],
+                connect,
+            )
+
+    idx = np.arange(0, Q, _label_stride(Q))
+    x, y = geometry.gen_polar_positions(idx, Q, r_slottext)
+    ax.text(x, y, [str(k + 1) for k in idx], size=13 * min(1, 60 / Q) if Q > 60 else 13)
+    return fig
+
+
+def overhang_figure(data, res=None, optimize_overhang=False):
+    """
+    Figure of the winding overhang
+    """
+    bz, hz, h1, db1, Np1 = 0.5, 0.5, 0.6, 0.1, 101
+    fig = figure(res)
+    ax = fig.add_panel()
+    Q = data.get_num_slots()
+    x0, x1 = geometry.gen_tooth_rects(Q, bz)
+    ax.rects(x0, x1, -hz, hz, "#BFBFBF")
+
+    head = data.get_wdg_overhang(optimize_overhang=optimize_overhang)
+    names = data.get_phasenames()
+    for i, phase in enumerate(head):
+        color = get_phase_color(i)
+        x, y, connect = geometry.gen_coil_paths(phase, Q, h1=h1, db1=db1, Np1=Np1)
+        ax.line(x, y, color, config["plt"]["lw"], connect, label="Phase " + names[i])
+        xa, angle = [], []
+        for coil in phase:
+            if coil[2] > 0:
+                xa += [coil[0][0] - 1 + db1, coil[0][1] - 1 - db1]
+            else:
+                xa += [coil[0][0] - 1 - db1, coil[0][1] - 1 + db1]
+            angle += [90, -90]
+        ax.markers(xa, np.zeros(len(xa)), "arrow", color, 16, angle)
+
+    idx = np.arange(0, Q, _label_stride(Q))
+    ax.text(idx, np.full(len(idx), -h1 / 2), [str(k) for k in idx], size=13)
+    return fig
+
+
+def star_figure(data, res=None, harmonic_idx=0, ForceX=True):
+    """
+    Figure of the star of slots (slot voltage phasors)
+    """
+    fig = figure(res)
+    ax = fig.add_panel(aspect=True)
+    Ei_el = data.results["Ei_el"]
+    if Ei_el is None or len(Ei_el) == 0:
+        return fig
+    ei = Ei_el[harmonic_idx]
+    dangle = np.angle(np.sum(ei[0])) if ForceX else None
+    lw = config["plt"]["lw"]
+    for k, vek in enumerate(ei):
+        color = get_phase_color(k)
+        pts, angle = geometry.gen_star(vek, dangle)
+        ax.line(pts.real, pts.imag, color, lw)
+        ax.markers(pts.real[1:], pts.imag[1:], "arrow", color, 12, angle)
+        ax.line(
+            [0.0, pts[-1].real],
+            [0.0, pts[-1].imag],
+            color,
+            lw,
+            dash=True,
+            label="Phase " + str(k + 1),
+        )
+    return fig
+
+
+def windingfactor_figure(data, res=None, mechanical=False):
+    """
+    Figure of the winding factor
+    """
+    fig = figure(res)
+    ax = fig.add_panel(axes=True)
+    ax.xlabel = "ordinal number ν"
+    ax.ylabel = "winding factor kw"
+    if mechanical:
+        nu = np.array(data.results["nu_mech"])
+        kw = np.array(data.results["kw_mech"])
+    else:
+        nu = np.array(data.results["nu_el"])
+        kw = np.array(data.results["kw_el"])
+    ax.xlim[0] = 0
+    ax.ylim[0] = 0
+    if len(kw) == 0:
+        return fig
+    N = np.shape(kw)[1]
+    dx = nu[1] - nu[0] if len(nu) > 1 else 1
+    width = dx / 1.5 / N
+    for k in range(N):
+        x = nu - dx / N / 1.5 + dx / N / 1.5 * k
+        ax.rects(
+            x - width / 2,
+            x + width / 2,
+            0,
+            np.abs(kw[:, k]),
+            get_phase_color(k),
+            label="Phase " + str(k + 1),
+        )
+    return fig
+
+
+def MMK_figure(data, res=None, phase=0):
+    """
+    Figure of the magnetomotive force and the slot currents
+    """
+    fig = figure(res)
+    ax1 = fig.add_panel(rect=(0, 0, 1, 0.5), axes=True)
+    ax2 = fig.add_panel(rect=(0, 0.5, 1, 0.5), axes=True)
+    ax1.xlabel = ax2.xlabel = "circumferential stator slots"
+    ax1.ylabel = "MMF in A"
+    ax2.ylabel = "Current in slot in A"
+
+    if phase == 0 and data.results.get("MMK") is not None:
+        MMK = data.results["MMK"]
+        phi, mmk, theta, HA = MMK["phi"], MMK["MMK"], MMK["theta"], MMK["HA"]
+    else:
+        phi, mmk, theta = analyse.calc_MMK(
+            data.get_num_slots(),
+            data.get_num_phases(),
+            data.get_phases(),
+            data.get_turns(),
+            N=config["num_MMF_points"],
+            angle=phase,
+        )
+        HA = analyse.DFT(mmk[:-1])
+    phi = np.asarray(phi)
+    A = np.abs(HA)
+    ph = np.angle(HA)
+    nu = np.arange(len(HA))
+    idx = A > np.max(A) * config["threshold_MMF_harmonics"]
+    nu, A, ph = nu[idx], A[idx], ph[idx]
+
+    ax1.line(phi, mmk, get_line_color(0), config["plt"]["lw"])
+    i = 0
+    for n, a, p in zip(nu, A, ph):
+        if a / max(A) > config["plot_MMF_harmonics"]:
+            ax1.line(
+                phi,
+                a * np.cos(n * phi / phi[-1] * 2 * np.pi + p),
+                get_line_color(i + 1),
+                config["plt"]["lw_thin"],
+                label="ν={}".format(n),
+            )
+            i += 1
+    ax1.xlim = [phi.min(), phi.max()]
+
+    theta = np.asarray(theta)
+    x = np.arange(len(theta))
+    ax2.rects(x - 0.25, x + 0.25, 0, theta, get_line_color(0))
+    ax2.xlim = [phi.min(), phi.max()]
+    return fig
+
+
+FIGURES = {
+    "layout": layout_figure,
+    "polar_layout": polar_layout_figure,
+    "overhang": overhang_figure,
+    "star": star_figure,
+    "windingfactor": windingfactor_figure,
+    "MMK": MMK_figure,
+}
+
+
+def save_figure(data, name, fname, res=None, **kwargs):
+    """
+    Creates a figure of the winding and saves it as SVG or PNG
+
+    Parameters
+    ----------
+    data :  datamodel object
+            winding
+    name :  string
+            figure: 'layout', 'polar_layout', 'overhang', 'star',
+            'windingfactor' or 'MMK'
+    fname : string
+            file name (*.svg or *.png)
+    res :   list
+            resolution [width, height] in pixel
+    kwargs: keyword arguments of the figure function
+    """
+    save(FIGURES[name](data, res=res, **kwargs), fname)
+
+
+def export_figures(data, figures, res=None, workers=None):
+    """
+    Renders several figures of a winding concurrently
+
+    Parameters
+    ----------
+    data :    datamodel object
+              winding
+    figures : list
+              (name, fname, kwargs) of the figures, see 'save_figure'
+    res :     list
+              resolution [width, height] in pixel
+    workers : integer
+              number of threads, None: one thread per figure
+    """
+    # fill the caches of the results before the threads use them
+    data.results["Ei_el"]
+    for name, fname, kwargs in figures:
+        if name in ("overhang", "polar_layout"):
+            data.get_wdg_overhang(kwargs.get("optimize_overhang", False))
+
+    with concurrent.futures.ThreadPoolExecutor(workers or len(figures) or 1) as ex:
+        futures = [
+            ex.submit(save_figure, data, name, fname, res, **kwargs)
+            for name, fname, kwargs in figures
+        ]
+        for fut in futures:
+            fut.result()
@@ -3,12 +3,16 @@
 Provides functions for reports
 """
 import os
+import re
+import html
 import tempfile
+import functools
+import multiprocessing
 import numpy as np
 import xlsxwriter
-import re
 from swat_em import analyse
-from swat_em.config import config
+from swat_em import render
+from swat_em.config import config, get_phase_color
 
 
 def italic(txt):
@@ -143,6 +147,60 @@ def ascii_table2(head, dat, space=3):
     return out
 
 
+class template:
+    """
+    Report template with placeholders like '{{ TITLE }}'. The template is
+    split once at the placeholders; 'render' writes the static parts and
+    the values of the placeholders directly to a file. Placeholders
+    without a value are written unchanged.
+
+    Parameters
+    ----------
+    text : string
+           content of the template
+    """
+
+    placeholder = re.compile(r"{{\s*(\w+)\s*}}")
+
+    def __init__(self, text):
+        self.parts = []  # static text before the placeholders
+        self.names = []  # names of the placeholders
+        self.raw = []  # placeholders as in the template
+        pos = 0
+        for m in self.placeholder.finditer(text):
+            self.parts.append(text[pos : m.start()])
+            self.names.append(m.group(1))
+            self.raw.append(m.group(0))
+            pos = m.end()
+        self.parts.append(text[pos:])
+
+    def render(self, f, values):
+        """
+        Writes the template with the values of the placeholders
+
+        Parameters
+        ----------
+        f :      file object
+                 opened text file
+        values : dict
+                 values (string) of the placeholders
+        """
+        for part, name, raw in zip(self.parts, self.names, self.raw):
+            f.write(part)
+            f.write(values.get(name, raw))
+        f.write(self.parts[-1])
+
+
+@functools.lru_cache(maxsize=4)
+def compile_template(fname):
+    """
+    Returns the compiled report template (see 'template'). Every
+    template file is read and compiled only once per process.
+    """
+    with open(fname) as f:
+        return template("\n".join(line.strip() for line in f))
+
+
 class HtmlReport:
     def __init__(self, data):
         """
@@ -169,25 +227,18 @@ class HtmlReport:
         """
         if not os.path.isdir(tmpdir):
             os.mkdir(tmpdir)
-        self.data.plot_layout(
-            os.path.join(tmpdir, "plot_layout.png"), res=config["plt"]["res"]
-        )
-        self.data.plot_star(
-            os.path.join(tmpdir, "plot_star.png"), res=config["plt"]["res"]
-        )
-        self.data.plot_windingfactor(
-            os.path.join(tmpdir, "plot_wf_el.png"),
-            mechanical=False,
-            res=config["plt"]["res"],
-        )
-        self.data.plot_windingfactor(
-            os.path.join(tmpdir, "plot_wf_mech.png"),
-            mechanical=True,
+        figures = [
+            ("layout", "plot_layout.png", {}),
+            ("star", "plot_star.png", {}),
+            ("windingfactor", "plot_wf_el.png", {"mechanical": False}),
+            ("windingfactor", "plot_wf_mech.png", {"mechanical": True}),
+            ("MMK", "plot_MMK.png", {"phase": 0}),
+        ]
+        render.export_figures(
+            self.data,
+            [(name, os.path.join(tmpdir, f), kw) for name, f, kw in figures],
             res=config["plt"]["res"],
         )
-        self.data.plot_MMK(
-            os.path.join(tmpdir, "plot_MMK.png"), res=config["plt"]["res"], phase=0
-        )
 
     def create(self, filename=None):
         """
@@ -243,62 +294,36 @@ class HtmlReport:
             d.append([str(nu[i])] + [str(round(k, 3)) for k in line])
         _table_wf_mech = "\n".join(table(d, header=header))
 
-        # create MMK
+        # create MMK (harmonics of the analysis for phase angle 0)
         d = []
-        phi, MMK, theta = analyse.calc_MMK(
-            self.data.get_num_slots(),
-            self.data.get_num_phases(),
-            self.data.get_phases(),
-            self.data.get_turns(),
-            angle=0.0,
-        )
-        nu = np.array(self.data.results["MMK"]["nu"])
-        HA = analyse.DFT(MMK[:-1])[: len(nu)]
-        A = np.abs(HA)
+        MMK = self.data.results["MMK"]
+        nu = np.array(MMK["nu"])
+        A = np.abs(MMK["HA"][: len(nu)])
         header = ["nu", "Amp", "[%]"]
+        A_max = np.max(A)
         for k in range(len(nu)):
             a = A[k]
-            a_rel = 100.0 / max(A) * a
+            a_rel = 100.0 / A_max * a
             d.append([str(nu[k]), str(round(a, 3)), str(round(a_rel, 1))])
         _table_MMK = "\n".join(table(d, header=header))
 
         # Write to template
-        with open(self.template) as f:
-            tmpl = f.readlines()
-
-        _report = []
-        for line in tmpl:
-            line = line.strip()
-            line = line.replace("{{ TITLE }}", self.data.get_title())
-            line = line.replace("{{ NOTES }}", self.data.get_notes())
-
-            line = line.replace(
-                "{{ plot_layout }}", os.path.join(self.contentdir, "plot_layout.png")
-            )
-            txt, html = self.data.get_basic_characteristics()
-            line = line.replace("{{ table_bc }}", html)
-
-            line = line.replace(
-                "{{ plot_star }}", os.path.join(self.contentdir, "plot_star.png")
-            )
-            line = line.replace("{{ table_star }}", _table_star)
-            line = line.replace(
-                "{{ plot_wf_el }}", os.path.join(self.contentdir, "plot_wf_el.png")
-            )
-            line = line.replace("{{ table_wf_el }}", _table_wf_el)
-            line = line.replace(
-                "{{ plot_wf_mech }}", os.path.join(self.contentdir, "plot_wf_mech.png")
-            )
-            line = line.replace("{{ table_wf_mech }}", _table_wf_mech)
-            line = line.replace(
-                "{{ plot_MMK }}", os.path.join(self.contentdir, "plot_MMK.png")
-            )
-            line = line.replace("{{ table_MMK }}", _table_wf_mech)
-
-            _report.append(line)
+        _, table_bc = self.data.get_basic_characteristics()
+        values = {
+            "TITLE": self.data.get_title(),
+            "NOTES": self.data.get_notes(),
+            "table_bc": table_bc,
+            "table_star": _table_star,
+            "table_wf_el": _table_wf_el,
+            "table_wf_mech": _table_wf_mech,
+            "table_MMK": _table_MMK,
+        }
+        for name in ["layout", "star", "wf_el", "wf_mech", "MMK"]:
+            fname = "plot_" + name + ".png"
+            values["plot_" + name] = os.path.join(self.contentdir, fname)
 
         with open(self.filename, "w", encoding="utf-8") as f:
-            f.write("\n".join(_report))
+            compile_template(self.template).render(f, values)
         return self.filename
 
     def open_in_browser(self):
@@ -313,137 +338,198 @@ class HtmlReport:
             webbrowser.open(self.filename)
 
 
-def export_xlsx(fname, data):
-    layout = True
-    phasors = True
-    windingfactor_el = True
-    windingfactor_mech = True
+class _formatpool:
+    """
+    Provides the cell formats of a workbook. Every combination of
+    properties is added to the workbook only once.
+    """
 
-    workbook = xlsxwriter.Workbook(fname)
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
 
-    if layout:
-        worksheet = workbook.add_worksheet("layout")
+    def get(self, **props):
+        key = tuple(sorted(props.items()))
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = self._formats[key] = self.workbook.add_format(props)
+        return fmt
 
-        i = 0
-        cell_format = workbook.add_format({"font_size": 14})
-        worksheet.write(i, 0, "Windinglayout", cell_format)
-        i += 1
 
-        cell_format = workbook.add_format({"align": "center"})
-        for k in range(data.machinedata["Q"]):
-            worksheet.write(i, 1 + k, k + 1, cell_format)
+def _xlsx_layout(worksheet, data, fmt):
+    """
+    Writes the winding layout. All rows are written in ascending order
+    (constant memory mode).
+    """
+    Q = data.get_num_slots()
+    NL = data.get_num_layers()
+    worksheet.set_column(0, 0, width=15)
+    worksheet.set_column(1, Q, width=4.5)
+
+    i = 0
+    worksheet.write(i, 0, "Windinglayout", fmt.get(font_size=14))
+    i += 1
+    worksheet.write(i, 0, "slot No.", fmt.get(align="right"))
+    worksheet.write_row(i, 1, range(1, Q + 1), fmt.get(align="center"))
+    i += 1
+
+    l, ls, lcol = data.get_layers()
+    for k1 in range(np.shape(l)[0]):
+        worksheet.write(i, 0, "Layer " + str(k1 + 1))
+        for k2 in range(np.shape(l)[1]):
+            cell_format = fmt.get(bg_color=lcol[k1, k2], align="center")
+            worksheet.write(i, k2 + 1, ls[k1, k2], cell_format)
         i += 1
+    i += 2
 
-        cell_format = workbook.add_format({"align": "right"})
-        worksheet.write(i - 1, 0, "slot No.", cell_format)
-        for k in range(data.get_num_layers()):
-            worksheet.write(i + k, 0, "Layer " + str(k + 1))
-
-        l, ls, lcol = data.get_layers()
-        for k1 in range(np.shape(l)[0]):
-            for k2 in range(np.shape(l)[1]):
-                cell_format = workbook.add_format(
-                    {"bg_color": lcol[k1, k2], "align": "center"}
-                )
-                worksheet.write(k1 + 2, k2 + 1, ls[k1, k2], cell_format)
-
-        worksheet.set_column(0, 0, width=15)
-        worksheet.set_column(1, data.machinedata["Q"], width=4.5)
-        i += data.get_num_layers()
-        i += 2
-
-        if type(data.machinedata["turns"]) == type([]):
-            cell_format = workbook.add_format({"font_size": 14})
-            worksheet.write(i, 0, "Number of turns", cell_format)
+    turns = data.machinedata["turns"]
+    phases = data.machinedata["phases"]
+    if isinstance(turns, list):
+        worksheet.write(i, 0, "Number of turns", fmt.get(font_size=14))
+        i += 1
+        # number of turns and phase of every coil side [layer, slot]
+        grid = [[None] * Q for _ in range(NL)]
+        for km, ph in enumerate(phases):
+            for kl, layer in enumerate(ph):
+                for j, cs in enumerate(layer):
+                    grid[kl][abs(cs) - 1] = (turns[km][kl][j], km)
+        for kl in range(NL):
+            worksheet.write(i, 0, "Layer " + str(kl + 1))
+            for ks, cell in enumerate(grid[kl]):
+                if cell is not None:
+                    cell_format = fmt.get(
+                        bg_color=get_phase_color(cell[1]), align="center"
+                    )
+                    worksheet.write(i, 1 + ks, cell[0], cell_format)
+            i += 1
+    else:
+        worksheet.write(i, 0, "Number of turns")
+        worksheet.write(i, 1, turns)
+    i += 2
+
+    worksheet.write(i, 0, "slot number per phase", fmt.get(font_size=14))
+    i += 1
+    for kph, ph in enumerate(phases):
+        for klay, lay in enumerate(ph):
+            worksheet.write(i, 0, "Phase " + str(kph + 1) + " layer " + str(klay + 1))
+            worksheet.write_row(i, 1, lay, fmt.get(align="center"))
             i += 1
-            for k in range(data.get_num_layers()):
-                worksheet.write(i + k, 0, "Layer " + str(k + 1))
-
-            turns = data.machinedata["turns"]
-            for km, ph in enumerate(data.machinedata["phases"]):
-                col = get_phase_color(km)
-                cell_format = workbook.add_format({"bg_color": col, "align": "center"})
-                for kl in range(len(ph)):
-                    layer = ph[kl]
-                    for j, cs in enumerate(layer):
-                        if type(turns) == type([]):
-                            item = turns[km][kl][j]
-                        else:
-                            item = turns
-                        if cs > 0:
-                            worksheet.write(i + kl, 1 + cs - 1, item, cell_format)
-                        else:
-                            worksheet.write(i + kl, 1 + abs(cs) - 1, item, cell_format)
-
-            i += data.get_num_layers()
-        else:
-            worksheet.write(i, 0, "Number of turns")
-            worksheet.write(i, 1, data.machinedata["turns"])
-        i += 2
 
-        cell_format = workbook.add_format({"font_size": 14})
-        worksheet.write(i, 0, "slot number per phase", cell_format)
+
+def _xlsx_phasors(worksheet, data, fmt):
+    """
+    Writes the slot voltage phasors (two columns per phase, one block
+    per ordinal number)
+    """
+    worksheet.write(0, 0, "Voltage phasors", fmt.get(font_size=14))
+    i = 2
+    nu = data.results["nu_el"]
+    for knu, ei in enumerate(data.results["Ei_el"]):
+        worksheet.write(i, 0, "nu = " + str(nu[knu]))
         i += 1
-        for kph, ph in enumerate(data.machinedata["phases"]):
-            for klay, lay in enumerate(ph):
-                worksheet.write(
-                    i, 0, "Phase " + str(kph + 1) + " layer " + str(klay + 1)
-                )
-                cell_format = workbook.add_format({"align": "center"})
-                worksheet.write_row(i, 1, lay, cell_format)
-                i += 1
-
-    if phasors:
-        worksheet = workbook.add_worksheet("phasors")
-
-        cell_format = workbook.add_format({"font_size": 14})
-        worksheet.write(0, 0, "Voltage phasors", cell_format)
-        max_i = 0
-        for knu in range(len(data.results["Ei_el"])):
-            i = max_i + 2
-            worksheet.write(i, 0, "nu = " + str(data.results["nu_el"][knu]))
+        header = []
+        for m in range(len(ei)):
+            header += ["Phase" + str(m + 1) + "_real", "Phase" + str(m + 1) + "_imag"]
+        worksheet.write_row(i, 0, header)
+        i += 1
+        # phasors [coil side, phase] as (real, imag) columns, phases with
+        # less coil sides are filled with blank cells
+        num = max([len(p) for p in ei] + [0])
+        block = np.full((num, 2 * len(ei)), np.nan)
+        for m, phasors in enumerate(ei):
+            block[: len(phasors), 2 * m] = np.real(phasors)
+            block[: len(phasors), 2 * m + 1] = np.imag(phasors)
+        filled = not np.isnan(block).any()
+        for row in block:
+            if filled:
+                worksheet.write_row(i, 0, row.tolist())
+            else:
+                worksheet.write_row(i, 0, [None if np.isnan(v) else v for v in row])
             i += 1
-            dx = 0
-
-            for m, phasors in enumerate(data.results["Ei_el"][knu]):
-                worksheet.write(i, dx + 0, "Phase" + str(m + 1) + "_real")
-                worksheet.write(i, dx + 1, "Phase" + str(m + 1) + "_imag")
-                for k in range(len(phasors)):
-                    worksheet.write(i + 1, dx, phasors[k].real)
-                    worksheet.write(i + 1, dx + 1, phasors[k].imag)
-                    i += 1
-                max_i = i if i > max_i else max_i
-                i -= len(phasors)  # go back for new columns
-                dx += 2
-
-    if windingfactor_el:
-        worksheet = workbook.add_worksheet("Winding_factor_el)")
-        cell_format = workbook.add_format({"font_size": 14})
-        worksheet.write(0, 0, "Winding factor (electrical)", cell_format)
-
-        worksheet.write(2, 0, "nu")
-        for km in range(data.get_num_phases()):
-            worksheet.write(2, km + 1, "phase" + str(km + 1))
+        i += 1
 
+
+def _xlsx_windingfactor(worksheet, data, fmt, mechanical=False):
+    """
+    Writes the winding factor (one row per ordinal number)
+    """
+    if mechanical:
+        title = "Winding factor (mechanical)"
+        nu, kw = data.get_windingfactor_mech()
+    else:
+        title = "Winding factor (electrical)"
         nu, kw = data.get_windingfactor_el()
-        worksheet.write_column(3, 0, nu)
-        for km in range(data.get_num_phases()):
-            worksheet.write_column(3, km + 1, kw[:, km])
+    worksheet.write(0, 0, title, fmt.get(font_size=14))
+    m = data.get_num_phases()
+    worksheet.write_row(2, 0, ["nu"] + ["phase" + str(km + 1) for km in range(m)])
+    for k in range(len(nu)):
+        worksheet.write(3 + k, 0, nu[k])
+        worksheet.write_row(3 + k, 1, kw[k, :].tolist())
 
-    if windingfactor_mech:
-        worksheet = workbook.add_worksheet("Winding_factor_mech)")
-        cell_format = workbook.add_format({"font_size": 14})
-        worksheet.write(0, 0, "Winding factor (mechanical)", cell_format)
 
-        worksheet.write(2, 0, "nu")
-        for km in range(data.get_num_phases()):
-            worksheet.write(2, km + 1, "phase" + str(km + 1))
+def _xlsx_summary(worksheet, models, fmt):
+    """
+    Writes the basic characteristics of several windings (one row per
+    winding)
+    """
+    worksheet.write(0, 0, "Windings", fmt.get(font_size=14))
+    header = ["No.", "Title", "Q", "2p", "m", "q", "NL", "kw1", "sigma_d", "a"]
+    header += ["t", "lcmQP", "r"]
+    worksheet.write_row(2, 0, header, fmt.get(bold=True))
+    worksheet.set_column(1, 1, width=20)
+    for k, data in enumerate(models):
+        bc, _ = data.get_basic_characteristics()
+        kw1 = bc["kw1"][0] if len(bc["kw1"]) > 0 else None
+        row = [
+            k + 1,
+            data.get_title(),
+            data.get_num_slots(),
+            2 * data.get_num_polepairs(),
+            data.get_num_phases(),
+            str(bc["q"]),
+            data.get_num_layers(),
+            None if kw1 is None else float(abs(kw1)),
+            float(bc["sigma_d"]),
+            bc["a"],
+            bc["t"],
+            bc["lcmQP"],
+            ", ".join(str(r) for r in bc["r"]),
+        ]
+        worksheet.write_row(3 + k, 0, row)
 
-        nu, kw = data.get_windingfactor_mech()
-        worksheet.write_column(3, 0, nu)
-        for km in range(data.get_num_phases()):
-            worksheet.write_column(3, km + 1, kw[:, km])
 
+def export_xlsx(fname, data):
+    """
+    Exports the winding layout, the slot voltage phasors and the
+    winding factors to an Excel file. The workbook is written in the
+    constant memory mode of xlsxwriter and the cell formats are shared,
+    so also large sweeps can be exported.
+
+    Parameters
+    ----------
+    fname :  string
+             file name (*.xlsx)
+    data :   datamodel object or list of datamodel objects
+             winding(s). For several windings the first sheet is a
+             summary, followed by the sheets of every winding (with
+             the number of the winding as prefix)
+    """
+    models = data if isinstance(data, (list, tuple)) else [data]
+    workbook = xlsxwriter.Workbook(fname, {"constant_memory": True})
+    fmt = _formatpool(workbook)
+    if isinstance(data, (list, tuple)):
+        _xlsx_summary(workbook.add_worksheet("summary"), models, fmt)
+        prefixes = [str(k + 1) + "_" for k in range(len(models))]
+    else:
+        prefixes = [""]
+
+    for prefix, d in zip(prefixes, models):
+        _xlsx_layout(workbook.add_worksheet(prefix + "layout"), d, fmt)
+        _xlsx_phasors(workbook.add_worksheet(prefix + "phasors"), d, fmt)
+        worksheet = workbook.add_worksheet(prefix + "Winding_factor_el")
+        _xlsx_windingfactor(worksheet, d, fmt, mechanical=False)
+        worksheet = workbook.add_worksheet(prefix + "Winding_factor_mech")
+        _xlsx_windingfactor(worksheet, d, fmt, mechanical=True)
     workbook.close()
 
 
@@ -491,9 +577,10 @@ class TextReport:
         _, ls, _ = self.data.get_layers()
         self._txt.append("WINDING LAYOUT")
         self._txt.append("==============")
-        self._txt.append("Layer_1: " + " | ".join([k for k in ls[0, :]]))
-        if self.data.get_num_layers() > 1:
-            self._txt.append("Layer_2: " + " | ".join([k for k in ls[1, :]]))
+        for kl in range(ls.shape[0]):
+            self._txt.append(
+                "Layer_{}: ".format(kl + 1) + " | ".join([k for k in ls[kl, :]])
+            )
         self._txt.append("\n")
 
         self._txt.append("COIL CONNECTION (END WINDINGS)")
@@ -632,3 +719,100 @@ class TextReport:
     def save(self, fname):
         with open(fname, "w") as f:
             f.write(self.get_report())
+
+
+REPORT_FORMATS = ("html", "txt", "xlsx")
+
+
+def _report_name(k, title, num):
+    """
+    Returns a unique file name (without extension) for the k-th model
+    """
+    title = re.sub(r"[^\w\-]+", "_", title).strip("_")
+    return "{:0{}d}_{}".format(k + 1, len(str(num)), title or "winding")
+
+
+def _report_worker(args):
+    """
+    worker function, writes the reports of one winding and returns
+    the row of the index page
+    """
+    data, directory, name, formats, cfg = args
+    if cfg is not None:
+        config.update(cfg)
+    if data.results.get("kw_el") is None:
+        data.analyse_wdg()
+    files = {}
+    for fmt in formats:
+        fname = os.path.join(directory, name + "." + fmt)
+        if fmt == "html":
+            HtmlReport(data).create(fname)
+        elif fmt == "txt":
+            TextReport(data).save(fname)
+        elif fmt == "xlsx":
+            export_xlsx(fname, data)
+        files[fmt] = os.path.basename(fname)
+
+    bc, _ = data.get_basic_characteristics()
+    kw1 = bc["kw1"]
+    row = [
+        html.escape(data.get_title()),
+        str(data.get_num_slots()),
+        str(2 * data.get_num_polepairs()),
+        str(data.get_num_phases()),
+        str(bc["q"]),
+        str(data.get_num_layers()),
+        str(round(abs(kw1[0]), 3)) if len(kw1) > 0 else "",
+        " ".join('<a href="{}">{}</a>'.format(files[fmt], fmt) for fmt in formats),
+    ]
+    return row
+
+
+def export_reports(models, directory, formats=("html",), workers=None):
+    """
+    Writes the reports of several windings in parallel processes and
+    an index page with a link to all reports. The reports use the
+    results of the analysis; windings without results are analysed.
+
+    Parameters
+    ----------
+    models :    list
+                datamodel objects
+    directory : string
+                output directory (is created if necessary)
+    formats :   list
+                report formats: 'html', 'txt' and/or 'xlsx'
+    workers :   integer
+                number of processes, None: number of cpus, 1: no
+                parallel processes
+
+    Returns
+    -------
+    fname :     string
+                file name of the index page
+    """
+    for fmt in formats:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError("Unknown report format '{}'".format(fmt))
+    directory = os.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    names = [_report_name(k, m.get_title(), len(models)) for k, m in enumerate(models)]
+    if workers == 1 or len(models) < 2:
+        jobs = [(m, directory, n, formats, None) for m, n in zip(models, names)]
+        rows = [_report_worker(job) for job in jobs]
+    else:
+        cfg = dict(config)
+        jobs = [(m, directory, n, formats, cfg) for m, n in zip(models, names)]
+        with multiprocessing.Pool(workers) as pool:
+            rows = pool.map(_report_worker, jobs)
+
+    header = ["Title", "Q", "2p", "m", "q", "NL", "kw1", "Reports"]
+    fname = os.path.join(directory, "index.html")
+    with open(fname, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html>\n<html>\n<head>\n")
+        f.write('<meta charset="utf-8">\n<title>Winding reports</title>\n')
+        f.write("</head>\n<body>\n<h3>Winding reports</h3>\n")
+        f.write("\n".join(table(rows, header=header)))
+        f.write("\n</body>\n</html>\n")
+    return fname
@@ -0,0 +1,742 @@
+# -*- coding: utf-8 -*-
+"""
+Local analysis server, provides the winding generator, the analysis
+and the report export over HTTP/JSON (for example for CAD tools):
+
+    python -m swat_em.server --port 8765 --workers 4 --cache-dir cache
+
+The windings are generated and analysed by a persistent pool of warm
+worker processes (see aio). The results are cached in memory (LRU) and
+optionally on disk. Endpoints:
+
+    GET  /health     state of the server
+    GET  /metrics    request counters and latency histograms
+                     (Prometheus text format)
+    POST /genwdg     winding layout from the winding generator
+    POST /analyse    analysis results of one winding or a batch of
+                     windings ({"windings": [...]})
+    POST /report     text report of a winding or report file
+                     ("fname" with the extension "txt", "html" or
+                     "xlsx", relative to the --output-dir)
+    POST /sweep      windings of a sweep, streamed as JSON lines
+
+The requests must be sent as "application/json". Requests of web pages
+from other origins are rejected. A winding is given by the parameters
+of datamodel.genwdg, for example:
+
+    curl -H 'Content-Type: application/json' \\
+        -d '{"Q": 12, "P": 10, "m": 3, "layers": 2}' localhost:8765/analyse
+"""
+import os
+import sys
+import json
+import time
+import bisect
+import asyncio
+import hashlib
+import argparse
+import fractions
+import collections
+import numpy as np
+from swat_em import aio
+from swat_em import wdggenerator
+from swat_em import __version__
+from swat_em.config import config
+
+DEFAULT_PORT = 8765
+
+# maximum size of a request body in bytes
+MAX_BODY = 16 * 1024 * 1024
+
+# upper limits of the latency histogram buckets in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# format version of the cached results, increase it if the results of
+# the jobs change
+CACHE_VERSION = 1
+
+# number of rows of a sweep which are sent at once
+SWEEP_BATCH = 256
+
+STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+
+
+def _basic_characteristics(data):
+    bc, _ = data.get_basic_characteristics()
+    return bc
+
+
+def _windingfactor(nu, kw):
+    return {"nu": nu, "kw": kw}
+
+
+# results of '/analyse'
+RESULTS = {
+    "Q": lambda data: data.get_num_slots(),
+    "P": lambda data: 2 * data.get_num_polepairs(),
+    "m": lambda data: data.get_num_phases(),
+    "layers": lambda data: data.get_num_layers(),
+    "Qes": lambda data: data.get_num_empty_slots(),
+    "turns": lambda data: data.get_turns(),
+    "w": lambda data: data.get_coilspan(),
+    "q": lambda data: data.get_q(),
+    "kw1": lambda data: data.get_fundamental_windingfactor(),
+    "sigma_d": lambda data: data.get_double_linked_leakage(),
+    "basic": _basic_characteristics,
+    "phases": lambda data: data.get_phases(),
+    "layout": lambda data: data.get_layers()[0],
+    "windingfactor_el": lambda data: _windingfactor(*data.get_windingfactor_el()),
+    "windingfactor_mech": lambda data: _windingfactor(*data.get_windingfactor_mech()),
+    "hash": lambda data: data.get_hash(),
+}
+
+
+def _jsonable(value):
+    """
+    Converts numpy arrays, numpy scalars and fractions for json
+    """
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    elif isinstance(value, (np.ndarray, np.generic)):
+        return _jsonable(value.tolist())
+    elif isinstance(value, fractions.Fraction):
+        return str(value)
+    return value
+
+
+def _get_int(request, key, minimum=None, default=None):
+    """
+    Returns an integer parameter of a request
+    """
+    value = request.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("'{}' must be an integer".format(key))
+    if minimum is not None and value < minimum:
+        raise ValueError("'{}' must be at least {}".format(key, minimum))
+    return value
+
+
+def _get_int_list(request, key, minimum=None):
+    """
+    Returns a list of integers of a request
+    """
+    values = request.get(key)
+    if not isinstance(values, list):
+        raise ValueError("'{}' must be a list of integers".format(key))
+    return [_get_int({key: v}, key, minimum) for v in values]
+
+
+def _genwdg_job(spec):
+    """
+    worker function, generates a winding layout
+    """
+    spec = aio._get_spec(spec)
+    ret = wdggenerator.genwdg(
+        spec["Q"], spec["P"], spec["m"], spec["w"], spec["layers"], spec["empty_slots"]
+    )
+    if ret is None:
+        raise ValueError("No winding possible for {}".format(spec))
+    return _jsonable(ret)
+
+
+def _analyse_job(spec, cfg):
+    """
+    worker function, returns all results (see RESULTS) of a winding
+    """
+    data = aio.get_datamodel(spec, cfg)
+    return _jsonable({name: func(data) for name, func in RESULTS.items()})
+
+
+def _report_job(spec, cfg, fmt, fname):
+    """
+    worker function, returns the text report or writes a report file
+    """
+    data = aio.get_datamodel(spec, cfg)
+    if fname is None:
+        return {"report": data.get_text_report()}
+    if fmt == "txt":
+        data.export_text_report(fname)
+    elif fmt == "html":
+        data.export_html_report(fname)
+    elif fmt == "xlsx":
+        data.export_xlsx(fname)
+    return {"fname": fname}
+
+
+class resultcache:
+    """
+    LRU cache for the results, optionally backed by json files in a
+    directory (one file per result)
+
+    Parameters
+    ----------
+    maxsize :   integer
+                maximum number of results in memory
+    directory : string
+                directory of the disk cache (None: no disk cache)
+    """
+
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._data = collections.OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._data)
+
+    @staticmethod
+    def digest(key):
+        """
+        Returns a file name compatible digest of a request key. The
+        digest depends on the version of SWAT-EM and the cache format,
+        so results of other versions are not used.
+        """
+        key = (__version__, CACHE_VERSION, key)
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, digest):
+        """
+        Returns the result from memory or None
+        """
+        value = self._data.get(digest)
+        if value is not None:
+            self._data.move_to_end(digest)
+        return value
+
+    def put(self, digest, value):
+        self._data[digest] = value
+        self._data.move_to_end(digest)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _fname(self, digest):
+        return os.path.join(self.directory, digest + ".json")
+
+    def load(self, digest):
+        """
+        Returns the result from the disk cache or None
+        """
+        try:
+            with open(self._fname(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, digest, value):
+        """
+        Saves the result in the disk cache
+        """
+        fname = self._fname(digest)
+        tmp = "{}.{}.tmp".format(fname, os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp, fname)
+
+
+class histogram:
+    """
+    Latency histogram with fixed buckets
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        ret = []
+        num = 0
+        for le, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            num += count
+            ret.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, le, num))
+        ret.append("{}_sum{{{}}} {}".format(name, labels, self.sum))
+        ret.append("{}_count{{{}}} {}".format(name, labels, num))
+        return ret
+
+
+class metrics:
+    """
+    Counters and latency histograms of the requests
+    """
+
+    def __init__(self):
+        self.latency = collections.defaultdict(histogram)
+        self.requests = collections.Counter()
+        self.cache = collections.Counter()
+
+    def observe(self, endpoint, status, duration):
+        self.latency[endpoint].observe(duration)
+        self.requests[(endpoint, status)] += 1
+
+    def get_text(self, gauges):
+        """
+        Returns the metrics in the Prometheus text format
+        """
+        name = "swat_em_request_duration_seconds"
+        lines = ["# TYPE {} histogram".format(name)]
+        for endpoint, hist in sorted(self.latency.items()):
+            lines += hist.lines(name, 'endpoint="{}"'.format(endpoint))
+        lines.append("# TYPE swat_em_requests_total counter")
+        for (endpoint, status), num in sorted(self.requests.items()):
+            lines.append(
+                'swat_em_requests_total{{endpoint="{}",status="{}"}} {}'.format(
+                    endpoint, status, num
+                )
+            )
+        lines.append("# TYPE swat_em_cache_total counter")
+        for result in ("hit", "disk_hit", "miss"):
+            lines.append(
+                'swat_em_cache_total{{result="{}"}} {}'.format(
+                    result, self.cache[result]
+                )
+            )
+        for key, value in gauges.items():
+            lines.append("# TYPE swat_em_{} gauge".format(key))
+            lines.append("swat_em_{} {}".format(key, value))
+        return "\n".join(lines) + "\n"
+
+
+class server:
+    """
+    HTTP/JSON server for the analysis of windings
+
+    Parameters
+    ----------
+    workers :    integer
+                 number of worker processes, None: number of cpus
+    cache_size : integer
+                 number of results in the memory cache
+    cache_dir :  string
+                 directory of the disk cache (None: no disk cache)
+    timeout :    float
+                 timeout of the jobs in seconds (None: no timeout)
+    output_dir : string
+                 directory for the report files of '/report' (None: no
+                 report files are written)
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        cache_size=1024,
+        cache_dir=None,
+        timeout=None,
+        output_dir=None,
+    ):
+        self.pool = aio.workerpool(workers)
+        self.cache = resultcache(cache_size, cache_dir)
+        self.timeout = timeout
+        self.output_dir = output_dir
+        if output_dir is not None:
+            self.output_dir = os.path.realpath(output_dir)
+            os.makedirs(self.output_dir, exist_ok=True)
+        self.metrics = metrics()
+        self.routes = {
+            "/health": ("GET", self.health),
+            "/metrics": ("GET", self.get_metrics),
+            "/genwdg": ("POST", self.genwdg),
+            "/analyse": ("POST", self.analyse),
+            "/report": ("POST", self.report),
+            "/sweep": ("POST", self.sweep),
+        }
+        self._server = None
+        self._active = 0
+        self._connections = set()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """
+        Starts the worker processes and the server
+
+        Returns
+        -------
+        address : tuple
+                  host and port of the server
+        """
+        await self.pool.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops the server and the worker processes
+        """
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.pool.close()
+
+    async def _cached(self, kind, key, func, *args):
+        """
+        Returns the result from the cache or runs the job
+        """
+        digest = self.cache.digest((kind, key))
+        value = self.cache.get(digest)
+        if value is not None:
+            self.metrics.cache["hit"] += 1
+            return value
+        loop = asyncio.get_running_loop()
+        if self.cache.directory is not None:
+            value = await loop.run_in_executor(None, self.cache.load, digest)
+            if value is not None:
+                self.metrics.cache["disk_hit"] += 1
+                self.cache.put(digest, value)
+                return value
+        self.metrics.cache["miss"] += 1
+        value = await self.pool.run(
+            func, *args, key=(kind, digest), timeout=self.timeout
+        )
+        self.cache.put(digest, value)
+        if self.cache.directory is not None:
+            await loop.run_in_executor(None, self.cache.save, digest, value)
+        return value
+
+    async def health(self, request):
+        return {
+            "status": "ok",
+            "version": __version__,
+            "workers": self.pool.workers,
+            "cache": len(self.cache),
+        }
+
+    async def get_metrics(self, request):
+        gauges = {"active_requests": self._active, "cached_results": len(self.cache)}
+        return self.metrics.get_text(gauges)
+
+    async def genwdg(self, request):
+        spec = aio._get_spec(request)
+        return await self._cached("genwdg", aio.request_key(spec), _genwdg_job, spec)
+
+    async def _analyse(self, spec, names):
+        spec = aio._get_spec(spec)
+        cfg = dict(config)
+        key = aio.request_key(spec, cfg)
+        results = await self._cached("analyse", key, _analyse_job, spec, cfg)
+        if names is None:
+            return results
+        return {name: results[name] for name in names}
+
+    async def analyse(self, request):
+        """
+        Analyses one winding or a batch ("windings": list) of windings.
+        "results" selects the results (see RESULTS, default: all).
+        """
+        names = request.pop("results", None)
+        if names is not None:
+            unknown = [name for name in names if name not in RESULTS]
+            if unknown:
+                raise ValueError("Unknown results: " + ", ".join(unknown))
+        if "windings" not in request:
+            return await self._analyse(request, names)
+
+        ret = await asyncio.gather(
+            *[self._analyse(spec, names) for spec in request["windings"]],
+            return_exceptions=True,
+        )
+        for k, value in enumerate(ret):
+            if isinstance(value, asyncio.TimeoutError):
+                ret[k] = {"error": "timeout"}
+            elif isinstance(value, BaseException):
+                ret[k] = {"error": str(value)}
+        return {"windings": ret}
+
+    def _get_output_file(self, fname):
+        """
+        Returns the absolute path of a report file, which must be
+        inside of the output directory
+        """
+        if self.output_dir is None:
+            raise PermissionError(
+                "Report files are disabled, start the server with --output-dir"
+            )
+        if not isinstance(fname, str) or not fname or os.path.isabs(fname):
+            raise PermissionError("'fname' must be relative to the output directory")
+        path = os.path.realpath(os.path.join(self.output_dir, fname))
+        if os.path.commonpath([path, self.output_dir]) != self.output_dir:
+            raise PermissionError("'fname' must be inside of the output directory")
+        return path
+
+    async def report(self, request):
+        """
+        Returns the text report (without "fname") or writes a report
+        file ("fname" with the extension "txt", "html" or "xlsx",
+        relative to the output directory)
+        """
+        fname = request.pop("fname", None)
+        fmt = "txt"
+        if fname is not None:
+            path = self._get_output_file(fname)
+            fmt = os.path.splitext(path)[-1].lower().lstrip(".")
+            if fmt not in ("txt", "html", "xlsx"):
+                raise ValueError("Unknown report format '{}'".format(fmt))
+        spec = aio._get_spec(request)
+        cfg = dict(config)
+        if fname is None:
+            key = aio.request_key(spec, cfg)
+            args = (spec, cfg, fmt, None)
+            return await self._cached("report", key, _report_job, *args)
+        args = (spec, cfg, fmt, path)
+        await self.pool.run(_report_job, *args, timeout=self.timeout)
+        return {"fname": os.path.relpath(path, self.output_dir)}
+
+    async def sweep(self, request):
+        """
+        Streams the rows (see sweep.get_row) of a sweep as JSON lines.
+        The combinations are analysed in chunks of "chunksize" by the
+        worker processes.
+        """
+        # the arguments are checked before the response is started
+        w_policy = request.get("w_policy", "all")
+        if w_policy not in ("all", "auto", "toothcoil"):
+            w_policy = _get_int(request, "w_policy", 1)
+        skip_duplicates = request.get("skip_duplicates", True)
+        if not isinstance(skip_duplicates, bool):
+            raise ValueError("'skip_duplicates' must be true or false")
+        rows = self.pool.sweep(
+            _get_int_list(request, "Qrange", 1),
+            _get_int_list(request, "Prange", 2),
+            _get_int(request, "m", 1),
+            _get_int_list(request, "layers", 1),
+            w_policy=w_policy,
+            empty_slots=_get_int(request, "empty_slots", 0, 0),
+            chunksize=_get_int(request, "chunksize", 1, 64),
+            skip_duplicates=skip_duplicates,
+        )
+
+        async def lines():
+            batch = []
+            try:
+                async for row in rows:
+                    row["q"] = row["q_num"] / row["q_den"]
+                    batch.append(json.dumps(_jsonable(row)))
+                    if len(batch) >= SWEEP_BATCH:
+                        yield "\n".join(batch) + "\n"
+                        batch = []
+                if batch:
+                    yield "\n".join(batch) + "\n"
+            finally:
+                await rows.aclose()
+
+        return lines()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        method, target, version = line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, value = line.decode("latin-1").split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+        size = int(headers.get("content-length", 0))
+        if size > MAX_BODY:
+            return method, target.split("?")[0], headers, None
+        body = await reader.readexactly(size)
+        return method, target.split("?")[0], headers, body
+
+    async def _respond(self, writer, status, value, keep_alive):
+        """
+        Sends the response, returns False if a streamed response
+        couldn't be completed (the connection is closed)
+        """
+        if isinstance(value, str):
+            ctype = "text/plain; version=0.0.4; charset=utf-8"
+        elif hasattr(value, "__aiter__"):
+            ctype = "application/x-ndjson"
+        else:
+            ctype = "application/json"
+            value = json.dumps(value)
+        head = [
+            "HTTP/1.1 {} {}".format(status, STATUS[status]),
+            "Content-Type: " + ctype,
+            "Connection: " + ("keep-alive" if keep_alive else "close"),
+        ]
+        if not hasattr(value, "__aiter__"):
+            data = value.encode()
+            head.append("Content-Length: {}".format(len(data)))
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+            await writer.drain()
+            return True
+        head.append("Transfer-Encoding: chunked")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+        try:
+            async for text in value:
+                data = text.encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+        except Exception:
+            # the status is already sent, the response remains incomplete
+            writer.close()
+            return False
+        finally:
+            if hasattr(value, "aclose"):
+                await value.aclose()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return True
+
+    @staticmethod
+    def _check_origin(headers):
+        """
+        Returns True if the request doesn't come from a web page of
+        another origin (browsers send the "Origin" header)
+        """
+        origin = headers.get("origin")
+        if origin is None:
+            return True
+        host = headers.get("host", "")
+        return origin in ("http://" + host, "https://" + host)
+
+    async def _dispatch(self, method, path, headers, body):
+        """
+        Returns the status and the response of a request
+        """
+        if not self._check_origin(headers):
+            return 403, {"error": "Requests from other origins are not allowed"}
+        if path not in self.routes:
+            return 404, {"error": "Unknown endpoint '{}'".format(path)}
+        route_method, func = self.routes[path]
+        if method != route_method:
+            return 405, {"error": "Use {} for '{}'".format(route_method, path)}
+        if body is None:
+            return 413, {"error": "Request too large"}
+        ctype = headers.get("content-type", "").split(";")[0].strip().lower()
+        if method == "POST" and ctype != "application/json":
+            return 415, {"error": "The request must be sent as application/json"}
+        try:
+            request = json.loads(body) if body.strip() else {}
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object")
+            return 200, await func(request)
+        except asyncio.TimeoutError:
+            return 504, {"error": "timeout"}
+        except PermissionError as e:
+            return 403, {"error": str(e)}
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": "{}: {}".format(type(e).__name__, e)}
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request"}, False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                t0 = time.perf_counter()
+                self._active += 1
+                status, complete = 500, False
+                try:
+                    status, value = await self._dispatch(method, path, headers, body)
+                    complete = await self._respond(writer, status, value, keep_alive)
+                finally:
+                    self._active -= 1
+                    endpoint = path if path in self.routes else "other"
+                    self.metrics.observe(endpoint, status, time.perf_counter() - t0)
+                if not keep_alive or body is None or not complete:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, **kwargs):
+    """
+    Runs the server until it is cancelled (see 'server' for the keyword
+    arguments)
+    """
+    srv = server(**kwargs)
+    host, port = await srv.start(host, port)
+    print("SWAT-EM server running on http://{}:{}".format(host, port))
+    sys.stdout.flush()
+    try:
+        await srv.serve_forever()
+    finally:
+        await srv.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m swat_em.server",
+        description="Local analysis server of SWAT-EM (HTTP/JSON)",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Host (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="Port (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Number of results in the memory cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir", default=None, help="Directory of the disk cache"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Timeout of the jobs in seconds"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Directory for report files (default: no report files)",
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                workers=args.workers,
+                cache_size=args.cache_size,
+                cache_dir=args.cache_dir,
+                timeout=args.timeout,
+                output_dir=args.output_dir,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
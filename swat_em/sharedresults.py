@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Provides the transport of analysis results from worker processes to the
+parent process by shared memory. The worker copies all numeric arrays
+of the results (winding factors, slot voltage vectors, MMK, ...) into
+one shared memory block and returns only a small descriptor. The parent
+process attaches the block and gets read-only numpy views without
+copying or unpickling the arrays:
+
+    # worker process
+    desc = export_results(data.results)
+
+    # parent process
+    data.results = import_results(desc)
+
+The shared memory block is released when the last view is deleted.
+"""
+import os
+import copy
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from swat_em.config import config
+
+# alignment of the arrays in the shared memory block
+ALIGN = 64
+
+
+class _arrayref:
+    """
+    Placeholder for an array in the shared memory block
+    """
+
+    __slots__ = ("offset", "shape", "dtype")
+
+    def __init__(self, offset, shape, dtype):
+        self.offset = offset
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.offset, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.offset, self.shape, self.dtype = state
+
+
+def _is_shared(value):
+    return isinstance(value, np.ndarray) and value.dtype.kind in "biufc"
+
+
+def _collect(value, arrays):
+    """
+    Replaces all numeric arrays in nested dicts/lists/tuples by
+    placeholders, the arrays are appended to 'arrays'
+    """
+    if _is_shared(value):
+        arrays.append(value)
+        return _arrayref(None, value.shape, value.dtype.str)
+    elif isinstance(value, dict):
+        return {k: _collect(v, arrays) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_collect(v, arrays) for v in value]
+    elif isinstance(value, tuple):
+        return tuple(_collect(v, arrays) for v in value)
+    return value
+
+
+def _restore(value, root):
+    """
+    Replaces the placeholders by read-only views of the shared memory
+    """
+    if isinstance(value, _arrayref):
+        dtype = np.dtype(value.dtype)
+        n = int(np.prod(value.shape, dtype=np.int64)) * dtype.itemsize
+        arr = root[value.offset : value.offset + n].view(dtype).reshape(value.shape)
+        arr.flags.writeable = False
+        return arr
+    elif isinstance(value, dict):
+        return {k: _restore(v, root) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_restore(v, root) for v in value]
+    elif isinstance(value, tuple):
+        return tuple(_restore(v, root) for v in value)
+    return value
+
+
+def _get_state(results):
+    """
+    Returns the raw content of a resultdata object (the slot voltage
+    vectors are stored as padded arrays, see resultdata._pack)
+    """
+    return {k: getattr(results, k) for k in results.__slots__ if hasattr(results, k)}
+
+
+def _find_refs(value, refs):
+    # same order as in '_collect'
+    if isinstance(value, _arrayref):
+        refs.append(value)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _find_refs(v, refs)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _find_refs(v, refs)
+
+
+def export_results(results):
+    """
+    Copies the results of a winding into a new shared memory block.
+    The block must be attached by 'import_results' (normally in another
+    process), which also releases it.
+
+    Parameters
+    ----------
+    results : resultdata
+              results of a winding (datamodel.results)
+
+    Returns
+    -------
+    desc :    dict
+              descriptor of the shared memory block, small and cheap
+              to pickle
+    """
+    arrays = []
+    state = _collect(_get_state(results), arrays)
+    refs = []
+    _find_refs(state, refs)
+    offset = 0
+    for ref, arr in zip(refs, arrays):
+        ref.offset = offset
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    desc = {"name": None, "size": offset, "state": state}
+    if offset == 0:
+        return desc
+
+    shm = shared_memory.SharedMemory(create=True, size=offset)
+    try:
+        root = np.ndarray((offset,), dtype=np.uint8, buffer=shm.buf)
+        for ref, arr in zip(refs, arrays):
+            dst = root[ref.offset : ref.offset + arr.nbytes].view(arr.dtype)
+            dst[:] = np.ascontiguousarray(arr).reshape(-1)
+        del root, dst
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    desc["name"] = shm.name
+    shm.close()
+    return desc
+
+
+def _release(shm):
+    shm.close()
+
+
+def import_results(desc):
+    """
+    Attaches a shared memory block from 'export_results' and returns
+    the results with read-only views of the arrays. The block is
+    unlinked immediately; the memory is freed when the last view is
+    deleted.
+
+    Parameters
+    ----------
+    desc :    dict
+              descriptor from 'export_results'
+
+    Returns
+    -------
+    results : resultdata
+    """
+    from swat_em.datamodel import resultdata
+
+    state = desc["state"]
+    if desc["name"] is not None:
+        shm = shared_memory.SharedMemory(name=desc["name"])
+        shm.unlink()
+        root = np.ndarray((desc["size"],), dtype=np.uint8, buffer=shm.buf)
+        # all views are based on 'root', the block is closed with it
+        weakref.finalize(root, _release, shm)
+        state = _restore(state, root)
+
+    results = resultdata.__new__(resultdata)
+    for k, v in state.items():
+        setattr(results, k, v)
+    return results
+
+
+def _analyse_worker(args):
+    """
+    worker function, analyses a winding and exports the results
+    """
+    data, cfg = args
+    config.update(cfg)
+    data.analyse_wdg()
+    return export_results(data.results)
+
+
+def analyse_models(models, workers=None):
+    """
+    Analyses the windings in parallel processes. The results are
+    transported by shared memory and set in the datamodel objects.
+
+    Parameters
+    ----------
+    models :  list
+              datamodel objects
+    workers : integer
+              number of processes, None: number of cpus
+    """
+    if len(models) == 0:
+        return
+    if os.name == "posix":
+        # the workers must register their blocks at the tracker of
+        # this process, which unregisters them in 'import_results'
+        from multiprocessing import resource_tracker
+
+        resource_tracker.ensure_running()
+
+    jobs = []
+    for data in models:
+        # old results are not sent to the workers
+        d = copy.copy(data)
+        d.reset_results()
+        jobs.append((d, dict(config)))
+    with multiprocessing.Pool(workers) as pool:
+        for data, desc in zip(models, pool.imap(_analyse_worker, jobs)):
+            data.results = import_results(desc)
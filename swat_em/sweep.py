@@ -0,0 +1,1189 @@
+# -*- coding: utf-8 -*-
+"""
+Provides a columnar, memory mapped store for the results of winding
+sweeps (combination sniffer). Every metric is saved in its own binary
+file and opened as numpy memmap. The winding layouts are saved as one
+compact blob with offsets. The store is a directory:
+
+    meta.json         number of rows and the column definition
+    <column>.bin      one file per column
+    <column>.idx.bin  sorted index of a column (created on demand)
+    layouts.bin       winding layouts (int8, layers x slots)
+
+The rows can be filtered with 'resultstore.query' and
+'resultstore.pareto'.
+
+The windings of a sweep are generated and analysed lazily by
+'iter_combinations', which yields one row (dict) per valid winding.
+The rows can be filtered by generator expressions and are collected
+by the sinks 'to_store' (result store on disk), 'to_table'
+(in-memory columns) or 'to_file' (CSV, JSON Lines or numpy file),
+for example:
+
+    rows = iter_combinations(range(12, 100, 3), range(2, 40, 2), 3, [2])
+    rows = (row for row in rows if row["kw1"] > 0.9)
+    store = to_store(rows, "sweep_dir")
+    store.to_file("sweep.csv")
+"""
+import os
+import re
+import json
+import shutil
+import zipfile
+import tempfile
+import itertools
+import collections
+import multiprocessing
+import numpy as np
+from swat_em import analyse
+from swat_em import datamodel
+
+STORE_VERSION = 1
+
+# name and data type of the columns
+COLUMNS = [
+    ("Q", "int32"),
+    ("P", "int32"),
+    ("m", "int16"),
+    ("layers", "int8"),
+    ("w", "float64"),
+    ("q_num", "int32"),
+    ("q_den", "int32"),
+    ("kw1", "float64"),
+    ("sigma_d", "float64"),
+    ("a", "int32"),
+    ("t", "int32"),
+    ("r1", "int32"),
+    ("lcmQP", "int64"),
+    ("Qes", "int32"),
+    ("layout_offset", "int64"),
+    ("hash", "uint64"),
+]
+
+# columns which are calculated from other columns
+VIRTUAL_COLUMNS = {"q": lambda store: store["q_num"] / store["q_den"]}
+
+
+def iter_parameters(Qrange, Prange, layers, w_policy="all"):
+    """
+    Yields all combinations of the winding parameters for a sweep.
+
+    Parameters
+    ----------
+    Qrange :   iterable of integers
+               numbers of slots
+    Prange :   iterable of integers
+               numbers of poles
+    layers :   list of integers
+               numbers of layers
+    w_policy : string or integer
+               coil spans of the windings:
+               'all': all possible coil spans for double layer windings
+               'auto': coil span chosen by the winding generator
+               'toothcoil': only tooth coil windings (w = 1)
+               integer: fixed coil span
+
+    Returns
+    -------
+    return : iterator of tuples
+             (Q, P, layers, w)
+    """
+    for Q in Qrange:
+        for P in Prange:
+            for l in layers:
+                if w_policy == "all":
+                    if l == 2 and Q / P >= 2:
+                        for w in range(1, int(Q / P) + 1):
+                            yield (Q, P, l, w)
+                    else:
+                        yield (Q, P, l, -1)
+                elif w_policy == "auto":
+                    yield (Q, P, l, -1)
+                elif w_policy == "toothcoil":
+                    yield (Q, P, l, 1)
+                else:
+                    yield (Q, P, l, int(w_policy))
+
+
+def gen_combinations(Qrange, Prange, layers):
+    """
+    Returns all combinations of the winding parameters for a sweep. For
+    double layer windings all possible coil spans are used.
+
+    Parameters
+    ----------
+    Qrange :  list of integers
+              numbers of slots
+    Prange :  list of integers
+              numbers of poles
+    layers :  list of integers
+              numbers of layers
+
+    Returns
+    -------
+    return : list of tuples
+             (Q, P, layers, w)
+    """
+    return list(iter_parameters(Qrange, Prange, layers))
+
+
+def generate_combination(Q, P, m, layers, w=-1, empty_slots=0, seen=None):
+    """
+    Generates one winding of a sweep (without analysis).
+
+    Parameters
+    ----------
+    seen :  set
+            hashes of the windings which are already generated. If the
+            generated winding is equivalent to one of these windings
+            None is returned.
+
+    Returns
+    -------
+    wdg : datamodel or None
+    h :   integer
+          hash of the winding
+    """
+    wdg = datamodel()
+    wdg.genwdg(Q, P, m=m, layers=layers, w=w, empty_slots=empty_slots, analyse=False)
+    if wdg.get_phases() is None:
+        return None, None
+    h = get_hash(wdg)
+    if seen is not None:
+        if h in seen:
+            return None, h
+        seen.add(h)
+    return wdg, h
+
+
+def analyse_combination(Q, P, m, layers, w=-1, empty_slots=0, seen=None):
+    """
+    Generates and analyses one winding of a sweep.
+
+    Parameters
+    ----------
+    seen :  set
+            hashes of the windings which are already analysed. If the
+            generated winding is equivalent to one of these windings
+            it isn't analysed again.
+
+    Returns
+    -------
+    row : dict or None
+          values for all columns and the winding layout ('layout')
+          None if there is no valid, symmetric (or new) winding
+    """
+    wdg, h = generate_combination(Q, P, m, layers, w, empty_slots, seen)
+    if wdg is None:
+        return None
+    kw1 = wdg.get_fundamental_windingfactor()
+    if kw1 is None or kw1[0] <= 0.01:
+        return None
+    return _analyse_wdg(wdg, h)
+
+
+def _analyse_wdg(wdg, h):
+    bc, _ = wdg.get_basic_characteristics()
+    if not bc["sym"]:
+        return None
+    return get_row(wdg, bc, h)
+
+
+def get_hash(wdg):
+    """
+    Returns the hash of the winding as 64 bit integer (see
+    datamodel.get_hash)
+    """
+    return int(wdg.get_hash()[:16], 16)
+
+
+def get_row(wdg, bc=None, h=None):
+    """
+    Returns the row of the result store for the winding 'wdg'
+
+    Parameters
+    ----------
+    wdg :  datamodel
+           winding
+    bc :   dict
+           basic characteristics of the winding (optional)
+
+    Returns
+    -------
+    row : dict
+          values for all columns and the winding layout ('layout')
+    """
+    if bc is None:
+        bc, _ = wdg.get_basic_characteristics()
+    w = wdg.get_coilspan()
+    if hasattr(w, "__iter__"):
+        w = np.mean(w)
+    q = bc["q"]
+    row = {
+        "Q": wdg.get_num_slots(),
+        "P": 2 * wdg.get_num_polepairs(),
+        "m": wdg.get_num_phases(),
+        "layers": wdg.get_num_layers(),
+        "w": float(w),
+        "q_num": q.numerator,
+        "q_den": q.denominator,
+        "kw1": bc["kw1"][0],
+        "sigma_d": bc["sigma_d"],
+        "a": bc["a"],
+        "t": bc["t"],
+        "r1": bc["r"][0] if len(bc["r"]) > 0 else 0,
+        "lcmQP": bc["lcmQP"],
+        "Qes": wdg.get_num_empty_slots(),
+        "hash": get_hash(wdg) if h is None else h,
+    }
+    layers, _, _ = wdg.get_layers()
+    row["layout"] = layers.astype(np.int8)
+    return row
+
+
+def get_datamodel(row, analyse=True):
+    """
+    Returns the winding of a row (see 'get_row') as datamodel object
+    """
+    S = _get_phases(row["layout"], row["m"])
+    wdg = datamodel()
+    wdg.set_machinedata(Q=row["Q"], p=row["P"] // 2, m=row["m"])
+    wdg.set_num_empty_slots(row["Qes"])
+    w = row["w"]
+    wdg.set_phases(S, w=int(w) if int(w) == w else None)
+    if int(w) != w:
+        wdg.set_coilspan(w)
+    wdg.set_valid(True, "", "")
+    if analyse:
+        wdg.analyse_wdg()
+    return wdg
+
+
+def _analyse_chunk(args):
+    """
+    worker function, analyses a chunk of combinations
+    """
+    comb, m, empty_slots, skip_duplicates, strict_w = args
+    seen = set() if skip_duplicates else None
+    wdgs = []
+    for Q, P, l, w in comb:
+        wdg, h = generate_combination(Q, P, m, l, w, empty_slots, seen)
+        if wdg is not None:
+            if strict_w and wdg.get_coilspan() != w:
+                continue  # the generator has chosen another coil span
+            wdgs.append((wdg, h))
+    if len(wdgs) == 0:
+        return [], len(comb)
+
+    # fundamental winding factor of all windings at once
+    layouts = analyse.compile_layouts([wdg for wdg, h in wdgs])
+    kw1 = analyse.calc_kw_batch(layouts, [1], signed=False)[:, 0, 0]
+    rows = []
+    for (wdg, h), kw in zip(wdgs, kw1):
+        if kw > 0.01:
+            row = _analyse_wdg(wdg, h)
+            if row is not None:
+                rows.append(row)
+    return rows, len(comb)
+
+
+def _iter_chunks(iterable, chunksize):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _imap(func, iterable, workers, max_pending):
+    """
+    Like Pool.imap, but with a limited number of pending tasks, so the
+    input is consumed lazily
+    """
+    if workers <= 1:
+        for args in iterable:
+            yield func(args)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for args in iterable:
+            pending.append(pool.apply_async(func, (args,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def iter_combinations(
+    Qrange,
+    Prange,
+    m,
+    layers,
+    w_policy="all",
+    empty_slots=0,
+    workers=1,
+    chunksize=64,
+    skip_duplicates=True,
+    callback=None,
+):
+    """
+    Generates and analyses the windings of a sweep lazily. Only the
+    valid and symmetric windings with a relevant fundamental winding
+    factor are yielded. The combinations are analysed chunkwise and
+    in parallel by 'workers' processes with a limited number of pending
+    chunks, so the memory doesn't depend on the size of the sweep.
+
+    Parameters
+    ----------
+    Qrange :       iterable of integers
+                   numbers of slots
+    Prange :       iterable of integers
+                   numbers of poles
+    m :            integer
+                   number of phases
+    layers :       list of integers
+                   numbers of layers
+    w_policy :     string or integer
+                   coil spans of the windings, see 'iter_parameters'
+    empty_slots :  integer
+                   see datamodel.genwdg
+    workers :      integer
+                   number of processes, None: number of cpus
+    chunksize :    integer
+                   number of combinations per chunk
+    skip_duplicates : Bool
+                      If True equivalent windings (see datamodel.get_hash)
+                      are yielded only once
+    callback :     function
+                   called after every chunk with the progress in percent
+                   (once with 100 if there are no combinations)
+
+    Returns
+    -------
+    rows : iterator of dicts
+           values for all columns and the winding layout ('layout'),
+           see 'get_row'
+    """
+    Qrange, Prange, layers = list(Qrange), list(Prange), list(layers)
+    if workers is None:
+        workers = os.cpu_count()
+    strict_w = w_policy not in ("all", "auto")
+    if callback is not None:
+        total = sum(1 for c in iter_parameters(Qrange, Prange, layers, w_policy))
+    chunks = (
+        (chunk, m, empty_slots, skip_duplicates, strict_w)
+        for chunk in _iter_chunks(
+            iter_parameters(Qrange, Prange, layers, w_policy), chunksize
+        )
+    )
+    seen = set() if skip_duplicates else None
+    done = 0
+    for rows, num in _imap(_analyse_chunk, chunks, workers, 2 * workers):
+        for row in rows:
+            if seen is not None:
+                if row["hash"] in seen:
+                    continue
+                seen.add(row["hash"])
+            yield row
+        done += num
+        if callback is not None and total > 0:
+            callback(100 * done / total)
+    if callback is not None and total == 0:
+        callback(100.0)  # nothing to do
+
+
+def to_store(rows, path, mode="w", skip_duplicates=False, chunksize=256):
+    """
+    Saves rows (for example from 'iter_combinations') chunkwise in a
+    result store
+
+    Parameters
+    ----------
+    rows :            iterable of dicts
+                      rows of the sweep, see 'get_row'
+    path :            string
+                      directory of the result store
+    mode :            string
+                      'w': new store, 'a': append to the store
+    skip_duplicates : Bool
+                      If True rows with a hash which is already in the
+                      store are skipped
+    chunksize :       integer
+                      number of rows which are appended at once
+
+    Returns
+    -------
+    store : resultstore
+    """
+    store = resultstore(path, mode=mode)
+    for chunk in _iter_chunks(rows, chunksize):
+        store.append(chunk, skip_duplicates=skip_duplicates)
+    store.mode = "r"
+    return store
+
+
+def to_table(rows, keys=None, layouts=False):
+    """
+    Collects rows (for example from 'iter_combinations') in memory
+
+    Parameters
+    ----------
+    rows :    iterable of dicts
+              rows of the sweep, see 'get_row'
+    keys :    list of strings
+              columns to collect (default: all columns)
+    layouts : Bool
+              If True the winding layouts are collected as list
+              ('layout')
+
+    Returns
+    -------
+    table : dict
+            numpy array for every column
+    """
+    columns = dict(COLUMNS)
+    del columns["layout_offset"]
+    if keys is None:
+        keys = list(columns)
+    data = {key: [] for key in keys}
+    if layouts:
+        data["layout"] = []
+    for row in rows:
+        for key in data:
+            data[key].append(row[key])
+    table = {key: np.array(data[key], dtype=columns[key]) for key in keys}
+    if layouts:
+        table["layout"] = data["layout"]
+    return table
+
+
+# default columns of the bulk export ('to_file')
+EXPORT_COLUMNS = [
+    "Q",
+    "P",
+    "m",
+    "layers",
+    "w",
+    "q",
+    "kw1",
+    "sigma_d",
+    "a",
+    "t",
+    "r1",
+    "lcmQP",
+    "Qes",
+    "hash",
+]
+
+
+def _get_phases(layout, m):
+    """
+    Returns the phases (see datamodel.get_phases) of a winding layout
+    (phase number for every layer and slot, see 'get_row')
+    """
+    S = [[[] for kl in range(layout.shape[0])] for km in range(m)]
+    for kl in range(layout.shape[0]):
+        for ks, ph in enumerate(layout[kl, :]):
+            if ph != 0:
+                S[abs(ph) - 1][kl].append(int(np.sign(ph)) * (ks + 1))
+    return S
+
+
+def _export_columns(keys, nu):
+    """
+    Returns name and data type of the exported columns
+    """
+    if keys is None:
+        keys = EXPORT_COLUMNS
+    dtypes = dict(COLUMNS)
+    dtypes["q"] = "float64"
+    columns = []
+    for key in keys:
+        if key not in dtypes or key == "layout_offset":
+            raise KeyError(key)
+        columns.append((key, dtypes[key]))
+    for n in nu or []:
+        columns.append(("kw_nu" + str(n), "float64"))
+    return columns
+
+
+def _add_spectra(chunk, windings, nu):
+    """
+    Adds the winding factors of the first phase for the ordinal numbers
+    'nu' to a chunk of columns
+
+    Parameters
+    ----------
+    windings : list of tuples
+               (Q, S, turns, p) of the rows, see analyse.compile_layouts
+    """
+    if not nu:
+        return chunk
+    if len(windings) > 0:
+        kw = analyse.calc_kw_batch(windings, nu, signed=False)[:, :, 0]
+    else:
+        kw = np.zeros((0, len(nu)))
+    for k, n in enumerate(nu):
+        chunk["kw_nu" + str(n)] = kw[:, k]
+    return chunk
+
+
+def _get_winding(row):
+    """
+    Returns (Q, S, turns, p) of a row. Rows of sweeps have one turn per
+    coil side, rows of 'iter_models' have the phases and turns of the
+    winding.
+    """
+    S = row.get("phases")
+    if S is None:
+        S = _get_phases(row["layout"], row["m"])
+    return (row["Q"], S, row.get("turns", 1), row["P"] // 2)
+
+
+def _iter_row_chunks(rows, columns, nu, chunksize):
+    """
+    Collects rows chunkwise as columns (dict of numpy arrays)
+    """
+    for rows in _iter_chunks(rows, chunksize):
+        chunk = {}
+        for key, dtype in columns:
+            if key == "q":
+                values = [row["q_num"] / row["q_den"] for row in rows]
+            elif key.startswith("kw_nu"):
+                continue
+            else:
+                values = [row[key] for row in rows]
+            chunk[key] = np.array(values, dtype=dtype)
+        windings = [_get_winding(row) for row in rows] if nu else []
+        yield _add_spectra(chunk, windings, nu)
+
+
+def _write_csv(chunks, fname, columns):
+    with open(fname, "w", newline="") as f:
+        f.write(",".join(key for key, dtype in columns) + "\n")
+        for chunk in chunks:
+            values = [chunk[key].astype(str) for key, dtype in columns]
+            lines = [",".join(line) for line in zip(*values)]
+            if lines:
+                f.write("\n".join(lines) + "\n")
+
+
+def _write_jsonl(chunks, fname, columns):
+    keys = [key for key, dtype in columns]
+    with open(fname, "w") as f:
+        for chunk in chunks:
+            values = [chunk[key].tolist() for key in keys]
+            for line in zip(*values):
+                f.write(json.dumps(dict(zip(keys, line))) + "\n")
+
+
+def _write_npz(chunks, fname, columns):
+    """
+    The columns are collected in temporary files and copied into the
+    (compressed) archive at the end, so the whole table is never in
+    memory
+    """
+    tmpdir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(fname)))
+    files = {}
+    try:
+        num = 0
+        for key, dtype in columns:
+            files[key] = open(os.path.join(tmpdir, key + ".bin"), "wb")
+        for chunk in chunks:
+            for key, dtype in columns:
+                np.asarray(chunk[key], dtype=dtype).tofile(files[key])
+            num += len(chunk[columns[0][0]]) if columns else 0
+        for f in files.values():
+            f.close()
+        with zipfile.ZipFile(fname, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for key, dtype in columns:
+                header = {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                    "fortran_order": False,
+                    "shape": (num,),
+                }
+                with zf.open(key + ".npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array_header_1_0(f, header)
+                    with open(files[key].name, "rb") as src:
+                        shutil.copyfileobj(src, f, 1 << 20)
+    finally:
+        for f in files.values():
+            f.close()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+EXPORT_FORMATS = {".csv": _write_csv, ".jsonl": _write_jsonl, ".npz": _write_npz}
+
+
+def _write_chunks(chunks, fname, columns):
+    ext = os.path.splitext(fname)[-1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format '{}'".format(ext))
+    EXPORT_FORMATS[ext](chunks, fname, columns)
+
+
+def to_file(rows, fname, keys=None, nu=None, chunksize=1024):
+    """
+    Writes rows (for example from 'iter_combinations') chunkwise to a
+    file, so the number of rows isn't limited by the memory. The format
+    depends on the file extension:
+
+        *.csv:   one line per winding with a header line
+        *.jsonl: one JSON object per line
+        *.npz:   compressed numpy archive with one array per column
+
+    Parameters
+    ----------
+    rows :      iterable of dicts
+                rows of the sweep, see 'get_row'
+    fname :     string
+                file name
+    keys :      list of strings
+                columns to export (default: EXPORT_COLUMNS)
+    nu :        list of integers
+                If given the winding factors of the first phase for
+                these ordinal numbers are exported as columns 'kw_nu<nu>'
+                (with the turns of the rows, see 'iter_models')
+    chunksize : integer
+                number of rows which are written at once
+    """
+    columns = _export_columns(keys, nu)
+    _write_chunks(_iter_row_chunks(rows, columns, nu, chunksize), fname, columns)
+
+
+def iter_models(models):
+    """
+    Returns the rows (see 'get_row') of datamodel objects, for example
+    of a project, for the sinks 'to_file', 'to_store' and 'to_table'.
+    The rows contain the phases ('phases') and turns ('turns') of the
+    windings additionally.
+    """
+    for wdg in models:
+        row = get_row(wdg)
+        row["phases"] = wdg.get_phases()
+        row["turns"] = wdg.get_turns()
+        yield row
+
+
+class resultstore:
+    """
+    Columnar result store of a winding sweep
+
+    Parameters
+    ----------
+    path :  string
+            directory of the store
+    mode :  string
+            'r': read only
+            'a': append (the store is created if it doesn't exist)
+            'w': create a new store (existing data gets lost)
+    """
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.mode = mode
+        self.columns = dict(COLUMNS)
+        self._num_rows = 0
+        self._cache = {}
+        self._index = {}
+        self._hashes = None
+        meta = os.path.join(path, "meta.json")
+        if mode == "w" or (mode == "a" and not os.path.isfile(meta)):
+            os.makedirs(path, exist_ok=True)
+            for key in list(self.columns) + ["layouts"]:
+                open(self._fname(key), "wb").close()
+            self._write_meta()
+        elif os.path.isfile(meta):
+            with open(meta) as f:
+                M = json.load(f)
+            if M["version"] > STORE_VERSION:
+                raise Exception("Result store version is not supported")
+            self.columns = dict(M["columns"])
+            self._num_rows = M["num_rows"]
+        else:
+            raise FileNotFoundError("No result store found in '{}'".format(path))
+
+    def _fname(self, key):
+        return os.path.join(self.path, key + ".bin")
+
+    def _write_meta(self):
+        M = {
+            "version": STORE_VERSION,
+            "num_rows": self._num_rows,
+            "columns": list(self.columns.items()),
+        }
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(M, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def __len__(self):
+        return self._num_rows
+
+    def keys(self):
+        return list(self.columns.keys())
+
+    def __getitem__(self, key):
+        """
+        Returns the column 'key' as (read only) numpy memmap
+        """
+        if key in VIRTUAL_COLUMNS:
+            return VIRTUAL_COLUMNS[key](self)
+        if key not in self.columns:
+            raise KeyError(key)
+        if key not in self._cache:
+            dtype = np.dtype(self.columns[key])
+            if self._num_rows == 0:
+                self._cache[key] = np.zeros(0, dtype=dtype)
+            else:
+                self._cache[key] = np.memmap(
+                    self._fname(key), dtype=dtype, mode="r", shape=(self._num_rows,)
+                )
+        return self._cache[key]
+
+    def append(self, rows, skip_duplicates=False):
+        """
+        Appends rows to the store
+
+        Parameters
+        ----------
+        rows :             list of dicts
+                           values for all columns and the winding layout
+                           ('layout')
+        skip_duplicates :  Bool
+                           If True rows with a hash which is already in
+                           the store are skipped
+        """
+        if self.mode == "r":
+            raise Exception("Result store is opened read only")
+        if skip_duplicates and "hash" in self.columns:
+            if self._hashes is None:
+                self._hashes = set(self["hash"].tolist())
+            new_rows = []
+            for row in rows:
+                if row["hash"] not in self._hashes:
+                    self._hashes.add(row["hash"])
+                    new_rows.append(row)
+            rows = new_rows
+        if len(rows) == 0:
+            return
+        fname = self._fname("layouts")
+        offset = os.path.getsize(fname)
+        offsets = []
+        with open(fname, "ab") as f:
+            for row in rows:
+                offsets.append(offset)
+                layout = np.asarray(row["layout"], dtype=np.int8)
+                layout.tofile(f)
+                offset += layout.size
+        for key, dtype in self.columns.items():
+            if key == "layout_offset":
+                values = offsets
+            else:
+                values = [row[key] for row in rows]
+            # cut off data of an aborted append
+            size = self._num_rows * np.dtype(dtype).itemsize
+            with open(self._fname(key), "r+b") as f:
+                f.truncate(size)
+                f.seek(size)
+                np.asarray(values, dtype=dtype).tofile(f)
+        self._num_rows += len(rows)
+        self._cache = {}
+        self._index = {}
+        if not skip_duplicates:
+            self._hashes = None
+        for key in list(self.columns) + list(VIRTUAL_COLUMNS):
+            if os.path.isfile(self._fname(key + ".idx")):
+                os.remove(self._fname(key + ".idx"))
+        self._write_meta()
+
+    def contains_hash(self, h):
+        """
+        Returns True if the store contains a winding with hash 'h'
+        (see get_hash)
+        """
+        if self._hashes is None:
+            self._hashes = set(self["hash"].tolist())
+        return h in self._hashes
+
+    def get_index(self, key):
+        """
+        Returns the sorted index of column 'key'. The index is saved in
+        the store directory and reused as long as no rows are appended.
+
+        Returns
+        -------
+        order :   numpy array
+                  row numbers sorted by the values of the column
+        values :  numpy array
+                  sorted values of the column
+        """
+        if key not in self._index:
+            fname = self._fname(key + ".idx")
+            order = None
+            if os.path.isfile(fname) and self._num_rows > 0:
+                if os.path.getsize(fname) == 8 * self._num_rows:
+                    order = np.memmap(fname, dtype=np.int64, mode="r")
+            if order is None:
+                order = np.argsort(self[key], kind="stable").astype(np.int64)
+                if os.access(self.path, os.W_OK):
+                    order.tofile(fname)
+            self._index[key] = (order, np.asarray(self[key])[order])
+        return self._index[key]
+
+    def select(self, key, op, value):
+        """
+        Returns the rows where the comparison 'column op value' is true.
+        The rows are found by binary search in the sorted index.
+
+        Parameters
+        ----------
+        key :    string
+                 column name
+        op :     string
+                 one of '<', '<=', '>', '>=', '==', '!='
+        value :  number
+
+        Returns
+        -------
+        rows :   numpy array
+                 sorted row numbers
+        """
+        order, values = self.get_index(key)
+        left = np.searchsorted(values, value, side="left")
+        right = np.searchsorted(values, value, side="right")
+        n = len(values)
+        if op == "<":
+            rows = order[:left]
+        elif op == "<=":
+            rows = order[:right]
+        elif op == ">":
+            rows = order[right:]
+        elif op == ">=":
+            rows = order[left:]
+        elif op == "==":
+            rows = order[left:right]
+        elif op == "!=":
+            rows = np.concatenate([order[:left], order[right:n]])
+        else:
+            raise ValueError("Unknown operator '{}'".format(op))
+        return np.sort(rows)
+
+    def query(self, expr):
+        """
+        Returns the rows which fulfill the boolean expression 'expr'.
+        Comparisons of a column with a number can be combined with
+        '&' (and), '|' (or), '~' (not) and parentheses.
+
+        Examples
+        --------
+        >>> store.query("kw1 > 0.93 & sigma_d < 0.05 & r1 >= 4")
+
+        Returns
+        -------
+        rows :   numpy array
+                 sorted row numbers
+        """
+        return _query_parser(self, expr).parse()
+
+    def pareto(self, objectives, rows=None):
+        """
+        Returns the Pareto front (non-dominated rows) for the given
+        objectives.
+
+        Parameters
+        ----------
+        objectives :  dict or list of tuples
+                      column name and 'max' or 'min', for example
+                      {"kw1": "max", "sigma_d": "min"}
+        rows :        array_like
+                      rows to take into account (e.g. the result of
+                      'query'), default: all rows
+
+        Returns
+        -------
+        rows :   numpy array
+                 sorted row numbers of the Pareto front
+        """
+        return pareto_front(self, objectives, rows)
+
+    def get_row(self, idx):
+        """
+        Returns all values of the row 'idx' as dict
+        """
+        return {key: self[key][idx].item() for key in self.columns}
+
+    def get_layout(self, idx):
+        """
+        Returns the winding layout of row 'idx'
+
+        Returns
+        -------
+        layers :  numpy array
+                  phase number for every layer and slot (see
+                  datamodel.get_layers)
+        """
+        Q = int(self["Q"][idx])
+        NL = int(self["layers"][idx])
+        offset = int(self["layout_offset"][idx])
+        layout = np.fromfile(
+            self._fname("layouts"), dtype=np.int8, count=NL * Q, offset=offset
+        )
+        return layout.reshape(NL, Q)
+
+    def get_datamodel(self, idx, analyse=True):
+        """
+        Returns the winding of row 'idx' as datamodel object
+        """
+        row = self.get_row(idx)
+        row["layout"] = self.get_layout(idx)
+        return get_datamodel(row, analyse=analyse)
+
+    def to_file(self, fname, keys=None, nu=None, rows=None, chunksize=65536):
+        """
+        Writes columns of the store chunkwise to a CSV, JSON Lines or
+        numpy (*.npz) file, see 'to_file'
+
+        Parameters
+        ----------
+        fname :     string
+                    file name
+        keys :      list of strings
+                    columns to export (default: EXPORT_COLUMNS)
+        nu :        list of integers
+                    ordinal numbers for additional winding factor columns
+        rows :      array_like
+                    indices of the rows to export (default: all)
+        chunksize : integer
+                    number of rows which are written at once
+        """
+        columns = _export_columns(keys, nu)
+        if rows is None:
+            rows = np.arange(len(self))
+        rows = np.asarray(rows, dtype=np.int64)
+
+        def chunks():
+            if nu:
+                blob = np.memmap(self._fname("layouts"), dtype=np.int8, mode="r")
+            for k0 in range(0, len(rows), chunksize):
+                idx = rows[k0 : k0 + chunksize]
+                chunk = {}
+                for key, dtype in columns:
+                    if not key.startswith("kw_nu"):
+                        chunk[key] = np.asarray(self[key][idx], dtype=dtype)
+                if nu:
+                    Q, NL = self["Q"][idx], self["layers"][idx]
+                    offsets = self["layout_offset"][idx]
+                    layouts = [
+                        np.asarray(blob[o : o + n * q]).reshape(n, q)
+                        for o, n, q in zip(offsets, NL, Q)
+                    ]
+                    windings = [
+                        (int(q), _get_phases(layout, int(m)), 1, int(P) // 2)
+                        for q, layout, m, P in zip(
+                            Q, layouts, self["m"][idx], self["P"][idx]
+                        )
+                    ]
+                    _add_spectra(chunk, windings, nu)
+                yield chunk
+
+        _write_chunks(chunks(), fname, columns)
+
+
+class _query_parser:
+    """
+    Recursive descent parser for query expressions:
+
+    expr       := term ('|' term)*
+    term       := factor ('&' factor)*
+    factor     := '~' factor | '(' expr ')' | comparison
+    comparison := column op number | number op column
+    """
+
+    _token = re.compile(
+        r"\s*(?:(<=|>=|==|!=|<|>|&|\||~|\(|\))|([A-Za-z_]\w*)"
+        r"|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?))"
+    )
+    _flip = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+    def __init__(self, store, expr):
+        self.store = store
+        self.expr = expr
+        self.tokens = []
+        pos = 0
+        expr = expr.rstrip()
+        while pos < len(expr):
+            m = self._token.match(expr, pos)
+            if m is None:
+                raise ValueError("Invalid query at '{}'".format(expr[pos:]))
+            op, name, num = m.groups()
+            if op is not None:
+                self.tokens.append(("op", op))
+            elif name is not None:
+                if name.lower() in ["and", "or", "not"]:
+                    self.tokens.append(
+                        ("op", {"and": "&", "or": "|", "not": "~"}[name.lower()])
+                    )
+                else:
+                    self.tokens.append(("name", name))
+            else:
+                self.tokens.append(("num", float(num)))
+            pos = m.end()
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def next(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        rows = self.expr_()
+        if self.pos != len(self.tokens):
+            raise ValueError("Invalid query '{}'".format(self.expr))
+        return rows
+
+    def expr_(self):
+        rows = self.term()
+        while self.peek() == ("op", "|"):
+            self.next()
+            rows = np.union1d(rows, self.term())
+        return rows
+
+    def term(self):
+        rows = self.factor()
+        while self.peek() == ("op", "&"):
+            self.next()
+            rows = np.intersect1d(rows, self.factor(), assume_unique=True)
+        return rows
+
+    def factor(self):
+        tok = self.next()
+        if tok == ("op", "~"):
+            return np.setdiff1d(
+                np.arange(len(self.store)), self.factor(), assume_unique=True
+            )
+        if tok == ("op", "("):
+            rows = self.expr_()
+            if self.next() != ("op", ")"):
+                raise ValueError("Missing ')' in query '{}'".format(self.expr))
+            return rows
+        op = self.next()
+        other = self.next()
+        if op[0] != "op" or op[1] not in self._flip:
+            raise ValueError("Invalid query '{}'".format(self.expr))
+        if tok[0] == "name" and other[0] == "num":
+            return self.store.select(tok[1], op[1], other[1])
+        if tok[0] == "num" and other[0] == "name":
+            return self.store.select(other[1], self._flip[op[1]], tok[1])
+        raise ValueError("Invalid query '{}'".format(self.expr))
+
+
+def pareto_front(data, objectives, rows=None):
+    """
+    Returns the Pareto front (non-dominated rows) for the given
+    objectives.
+
+    Parameters
+    ----------
+    data :        resultstore or dict of arrays
+                  columns
+    objectives :  dict or list of tuples
+                  column name and 'max' or 'min'
+    rows :        array_like
+                  rows to take into account, default: all rows
+
+    Returns
+    -------
+    rows :   numpy array
+             sorted row numbers of the Pareto front
+    """
+    if hasattr(objectives, "items"):
+        objectives = list(objectives.items())
+    cols = []
+    for key, direction in objectives:
+        if direction not in ["max", "min"]:
+            raise ValueError("Direction must be 'max' or 'min'")
+        col = np.asarray(data[key], dtype=float)
+        cols.append(-col if direction == "max" else col)  # minimize all
+    X = np.column_stack(cols)
+    if rows is None:
+        rows = np.arange(len(X))
+    rows = np.asarray(rows, dtype=int)
+    X = X[rows]
+
+    # the lexicographic smallest remaining point is always non-dominated
+    remaining = np.lexsort(X.T[::-1])
+    front = []
+    while remaining.size > 0:
+        p = remaining[0]
+        front.append(p)
+        Xr = X[remaining]
+        dominated = np.all(Xr >= X[p], axis=1) & np.any(Xr > X[p], axis=1)
+        dominated[0] = True
+        remaining = remaining[~dominated]
+    return np.sort(rows[front])
+
+
+def sweep(
+    path,
+    Qrange,
+    Prange,
+    m,
+    layers,
+    empty_slots=0,
+    workers=1,
+    chunksize=64,
+    callback=None,
+    skip_duplicates=True,
+):
+    """
+    Generates and analyses all windings of the given parameter ranges
+    and saves the valid, symmetric windings in a result store. The
+    windings are analysed in parallel by 'workers' processes, the
+    results are appended chunkwise.
+
+    Parameters
+    ----------
+    path :         string
+                   directory of the result store (gets overwritten)
+    Qrange :       list of integers
+                   numbers of slots
+    Prange :       list of integers
+                   numbers of poles
+    m :            integer
+                   number of phases
+    layers :       list of integers
+                   numbers of layers
+    empty_slots :  integer
+                   see datamodel.genwdg
+    workers :      integer
+                   number of processes, None: number of cpus
+    chunksize :    integer
+                   number of combinations per chunk
+    callback :     function
+                   called after every chunk with the progress in percent
+    skip_duplicates : Bool
+                      If True equivalent windings (see datamodel.get_hash)
+                      are analysed and stored only once
+
+    Returns
+    -------
+    store : resultstore
+    """
+    rows = iter_combinations(
+        Qrange,
+        Prange,
+        m,
+        layers,
+        empty_slots=empty_slots,
+        workers=workers,
+        chunksize=chunksize,
+        skip_duplicates=skip_duplicates,
+        callback=callback,
+    )
+    store = to_store(rows, path, mode="w", skip_duplicates=skip_duplicates)
+    return store
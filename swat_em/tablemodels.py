@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+Provides table models for the Qt item views. The models read directly
+from numpy arrays (results of sweeps, winding layouts) instead of
+creating one item per cell. The text, the colors and the sort order
+are computed on demand, only for the cells which are shown.
+"""
+from qtpy import QtCore
+from qtpy import QtGui
+import numpy as np
+from swat_em.config import get_phase_color
+from swat_em.report import num2str
+from swat_em.analyse import _get_float
+
+
+def _bold_font():
+    font = QtGui.QFont()
+    font.setBold(True)
+    return font
+
+
+def _get_int(txt):
+    """
+    Returns the integer of the string or 0 if txt is not a number
+    """
+    try:
+        return int(str(txt).strip())
+    except ValueError:
+        return 0
+
+
+class _colorcache:
+    """
+    Creates the QColor objects only once per color string
+    """
+
+    def __init__(self):
+        self._colors = {}
+
+    def __call__(self, col):
+        if col not in self._colors:
+            self._colors[col] = QtGui.QColor(col)
+        return self._colors[col]
+
+
+class columntablemodel(QtCore.QAbstractTableModel):
+    """
+    Read-only table with one numpy array per column, for example the
+    results of a winding sweep. The rows can be sorted by the view.
+
+    Parameters
+    ----------
+    keys :    list of strings
+              names of the columns to show
+    columns : dict
+              numpy arrays (same length) for every key
+    maxlen :  integer
+              max. number of characters of the numbers
+    """
+
+    def __init__(self, keys=None, columns=None, maxlen=8, parent=None):
+        super().__init__(parent)
+        self._maxlen = maxlen
+        self._font = _bold_font()
+        self._keys = []
+        self._columns = {}
+        self._num_rows = 0
+        self._order = None  # view row -> source row
+        self._inverse = None  # source row -> view row
+        self._sort = None
+        if keys is not None:
+            self.set_data(keys, columns)
+
+    def set_data(self, keys, columns):
+        """
+        Replaces the data of the table, the sort order is kept
+        """
+        self.beginResetModel()
+        self._keys = list(keys)
+        self._columns = {key: np.asarray(columns[key]) for key in self._keys}
+        self._num_rows = len(self._columns[self._keys[0]]) if self._keys else 0
+        self._order = None
+        self._inverse = None
+        if self._sort is not None and self._sort[0] < len(self._keys):
+            self._order = self._get_order(*self._sort)
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._num_rows
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def source_row(self, row):
+        """
+        Returns the row of the data arrays for the row of the view
+        """
+        return int(self._order[row]) if self._order is not None else row
+
+    def view_row(self, source_row):
+        """
+        Returns the row of the view for the row of the data arrays
+        """
+        if self._order is None:
+            return source_row
+        if self._inverse is None:
+            self._inverse = np.empty_like(self._order)
+            self._inverse[self._order] = np.arange(len(self._order))
+        return int(self._inverse[source_row])
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            value = self._columns[self._keys[index.column()]][
+                self.source_row(index.row())
+            ]
+            return num2str(value, maxlen=self._maxlen)
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal:
+            if role == QtCore.Qt.DisplayRole and section < len(self._keys):
+                return self._keys[section]
+            if role == QtCore.Qt.FontRole:
+                return self._font
+        elif role == QtCore.Qt.DisplayRole:
+            return str(section + 1)
+        return None
+
+    def flags(self, index):
+        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+
+    def _get_order(self, column, order):
+        idx = np.argsort(self._columns[self._keys[column]], kind="stable")
+        if order == QtCore.Qt.DescendingOrder:
+            idx = idx[::-1]
+        return idx
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        if column < 0 or column >= len(self._keys):
+            return
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        old_rows = [self.source_row(i.row()) for i in old]
+        self._sort = (column, order)
+        self._order = self._get_order(column, order)
+        self._inverse = None
+        new = [self.index(self.view_row(r), i.column()) for r, i in zip(old_rows, old)]
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+
+
+class layouttablemodel(QtCore.QAbstractTableModel):
+    """
+    Winding layout as table (layers x slots). Every cell contains the
+    phase number, negative for negative coil sides and 0 for no coil
+    side. The cells are colored by the phase colors.
+
+    Parameters
+    ----------
+    editable : Bool
+               If True the user can edit the phase numbers
+    """
+
+    def __init__(self, editable=False, parent=None):
+        super().__init__(parent)
+        self.editable = editable
+        self._layers = np.zeros((0, 0), dtype=int)
+        self._color = _colorcache()
+
+    def set_layout(self, layers):
+        """
+        Sets the layout (array with the phase numbers, layers x slots)
+        """
+        self.beginResetModel()
+        self._layers = np.array(layers, dtype=int, ndmin=2)
+        self.endResetModel()
+
+    def set_winding(self, data, layers=None):
+        """
+        Sets the layout of the datamodel 'data'. If 'layers' is given,
+        the layout is padded/truncated to this number of layers.
+        """
+        l, _, _ = data.get_layers()
+        if layers is not None:
+            l2 = np.zeros((layers, data.get_num_slots()), dtype=int)
+            n = min(layers, l.shape[0])
+            l2[:n, :] = l[:n, :]
+            l = l2
+        self.set_layout(l)
+
+    def clear(self):
+        self.set_layout(np.zeros((0, 0), dtype=int))
+
+    def get_layout(self):
+        """
+        Returns the layout (array with the phase numbers, layers x slots)
+        """
+        return self._layers
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._layers.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._layers.shape[1]
+
+    def get_color(self, row, column):
+        num = self._layers[row, column]
+        col = get_phase_color(abs(num) - 1) if num != 0 else "#FFFFFF"
+        return self._color(col)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        num = self._layers[index.row(), index.column()]
+        if role == QtCore.Qt.DisplayRole:
+            return "{:+d}".format(num) if num != 0 else "0"
+        if role == QtCore.Qt.EditRole:
+            return str(num)
+        if role == QtCore.Qt.BackgroundRole:
+            return self.get_color(index.row(), index.column())
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        self._layers[index.row(), index.column()] = _get_int(value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Vertical:
+            return "Layer {}".format(section + 1)
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+        if self.editable:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+
+class turnstablemodel(QtCore.QAbstractTableModel):
+    """
+    Number of turns for every coil side of a winding layout. The table
+    has the same shape and colors as the layout table.
+
+    Parameters
+    ----------
+    layout : layouttablemodel
+             winding layout
+    """
+
+    def __init__(self, layout, parent=None):
+        super().__init__(parent)
+        self.layout = layout
+        self._turns = np.zeros((0, 0))
+        layout.modelReset.connect(self._layout_reset)
+        layout.dataChanged.connect(self._layout_changed)
+
+    def set_winding(self, data):
+        """
+        Sets the number of turns of the datamodel 'data'
+        """
+        turns = data.get_turns()
+        T = np.zeros(self.layout.get_layout().shape)
+        for km, ph in enumerate(data.get_phases()):
+            for kl, layer in enumerate(ph[: T.shape[0]]):
+                for i, cs in enumerate(layer):
+                    if hasattr(turns, "__iter__"):
+                        T[kl, abs(cs) - 1] = turns[km][kl][i]
+                    else:
+                        T[kl, abs(cs) - 1] = turns
+        self.beginResetModel()
+        self._turns = T
+        self.endResetModel()
+
+    def get_turns(self):
+        """
+        Returns the number of turns (array, layers x slots)
+        """
+        return self._turns
+
+    def _layout_reset(self):
+        # keep the existing values if the shape of the layout changes
+        shape = self.layout.get_layout().shape
+        T = np.zeros(shape)
+        n0 = min(shape[0], self._turns.shape[0])
+        n1 = min(shape[1], self._turns.shape[1])
+        T[:n0, :n1] = self._turns[:n0, :n1]
+        self.beginResetModel()
+        self._turns = T
+        self.endResetModel()
+
+    def _layout_changed(self, first, last):
+        # update the colors
+        self.dataChanged.emit(
+            self.index(first.row(), first.column()),
+            self.index(last.row(), last.column()),
+        )
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._turns.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._turns.shape[1]
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return num2str(self._turns[index.row(), index.column()])
+        if role == QtCore.Qt.BackgroundRole:
+            return self.layout.get_color(index.row(), index.column())
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        value = _get_float(str(value))
+        self._turns[index.row(), index.column()] = value if value is not None else 0.0
+        self.dataChanged.emit(index, index)
+        return True
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        return self.layout.headerData(section, orientation, role)
+
+    def flags(self, index):
+        return (
+            QtCore.Qt.ItemIsSelectable
+            | QtCore.Qt.ItemIsEnabled
+            | QtCore.Qt.ItemIsEditable
+        )
+
+
+class combinationtablemodel(QtCore.QAbstractTableModel):
+    """
+    Table of windings for different numbers of slots (rows) and poles
+    (columns). The shown value is selectable, the cells are colored by
+    the type of the winding.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._Qlist = []
+        self._Plist = []
+        self._rows = {}
+        self._value_func = str
+        self._font = _bold_font()
+        self._color = _colorcache()
+
+    def set_data(self, Qlist, Plist, rows, value_func):
+        """
+        Sets the windings
+
+        Parameters
+        ----------
+        Qlist :      list
+                     number of slots (rows)
+        Plist :      list
+                     number of poles (columns)
+        rows :       dict
+                     rows of a sweep (see sweep.get_row) with the key
+                     (Q, P), missing keys for no valid winding
+        value_func : function
+                     value_func(row) returns the text for the cell
+        """
+        self.beginResetModel()
+        self._Qlist = list(Qlist)
+        self._Plist = list(Plist)
+        self._rows = rows
+        self._value_func = value_func
+        self.endResetModel()
+
+    def set_value_func(self, value_func):
+        """
+        Changes the shown value, see 'set_data'
+        """
+        self._value_func = value_func
+        if self.rowCount() > 0 and self.columnCount() > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, self.columnCount() - 1),
+            )
+
+    def get_row(self, row, column):
+        """
+        Returns the row of the sweep or None if there is no valid
+        winding
+        """
+        return self._rows.get((self._Qlist[row], self._Plist[column]))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._Qlist)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._Plist)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.BackgroundRole):
+            return None
+        row = self.get_row(index.row(), index.column())
+        if row is None:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self._value_func(row)
+        if row["Qes"] != 0:
+            col = "#E9AEE2"
+        elif row["w"] == 1:
+            col = "#ADD8E6"
+        elif row["q_den"] == 1:
+            col = "#E6C3AD"
+        else:
+            col = "#BCFFBC"
+        return self._color(col)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.FontRole:
+            return self._font
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return "2p=" + str(self._Plist[section])
+        return "Q=" + str(self._Qlist[section])
+
+    def flags(self, index):
+        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# testcase for the asyncio interface
+
+import os
+import sys
+import time
+import signal
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from concurrent.futures.process import BrokenProcessPool
+from swat_em import aio
+from swat_em import sweep
+from swat_em.datamodel import datamodel
+
+
+def test_analyse():
+    async def run():
+        async with aio.workerpool(workers=2) as pool:
+            spec = {"Q": 12, "P": 10, "m": 3, "layers": 2, "w": 1}
+            wdgs = await asyncio.gather(*[pool.analyse(spec) for k in range(20)])
+            # identical requests are analysed only once
+            assert all(wdg is wdgs[0] for wdg in wdgs)
+            assert not pool._inflight
+
+            ref = datamodel()
+            ref.genwdg(Q=12, P=10, m=3, layers=2, w=1)
+            np.testing.assert_allclose(
+                wdgs[0].get_fundamental_windingfactor(),
+                ref.get_fundamental_windingfactor(),
+            )
+            ref.genwdg(Q=24, P=4, m=3, layers=2, w=5, analyse=False)
+            wdg = await pool.analyse(ref)
+            assert wdg is not ref
+            assert wdg.get_coilspan() == 5
+            assert wdg.results["kw_el"] is not None
+
+            try:
+                await pool.analyse({"Q": 13, "P": 10, "m": 3, "layers": 2})
+            except ValueError:
+                pass
+            else:
+                assert False
+
+    asyncio.run(run())
+
+
+def test_timeout():
+    async def run():
+        async with aio.workerpool(workers=1) as pool:
+            spec = {"Q": 12, "P": 10, "m": 3, "layers": 2, "w": 1}
+            task = asyncio.ensure_future(pool.analyse(spec))
+            try:
+                await pool.analyse(spec, timeout=1e-6)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                assert False
+            # the other request isn't cancelled by the timeout
+            wdg = await task
+            assert wdg.results["kw_el"] is not None
+
+            task = asyncio.ensure_future(pool.analyse(spec))
+            await asyncio.sleep(0)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            assert not pool._inflight
+            wdg = await pool.analyse(spec, timeout=60)
+            assert wdg.results["kw_el"] is not None
+
+    asyncio.run(run())
+
+
+def test_sweep():
+    async def run():
+        async with aio.workerpool(workers=2, max_pending=3) as pool:
+            rows = pool.sweep(range(6, 25, 3), [2, 4, 8], 3, [1, 2], chunksize=4)
+            return [row async for row in rows]
+
+    rows = asyncio.run(run())
+    ref = list(sweep.iter_combinations(range(6, 25, 3), [2, 4, 8], 3, [1, 2]))
+    assert [row["hash"] for row in rows] == [row["hash"] for row in ref]
+
+
+def test_broken_pool():
+    async def run():
+        async with aio.workerpool(workers=1) as pool:
+            await pool.start()
+            executor = pool._executor
+            task = asyncio.ensure_future(pool.run(time.sleep, 60))
+            await asyncio.sleep(0)
+            for pid in list(executor._processes):
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            try:
+                await task
+            except BrokenProcessPool:
+                pass
+            else:
+                assert False
+            # a new pool is started for the next request
+            assert pool._executor is not executor
+            spec = {"Q": 12, "P": 10, "m": 3, "layers": 2, "w": 1}
+            wdg = await pool.analyse(spec, timeout=60)
+            assert wdg.results["kw_el"] is not None
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_analyse()
+    test_timeout()
+    test_sweep()
+    test_broken_pool()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# testcase for the analysis of periodic windings by the base winding
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import analyse
+from swat_em.config import config
+from swat_em.datamodel import datamodel
+
+
+def full_reference(data):
+    """results calculated for the full winding without reduction"""
+    Q, S, p = data.get_num_slots(), data.get_phases(), data.get_num_polepairs()
+    turns = data.get_turns()
+    ref = {}
+    ref["el"] = analyse.calc_kw(Q, S, turns, p, config["N_nu_el"], config)
+    ref["mech"] = analyse.calc_kw(Q, S, turns, 1.0, config["N_nu_mech"], config)
+    return ref
+
+
+def test_base_winding():
+    # 12 slots / 4 poles: zero sequence harmonics with in-phase phases
+    windings = [(36, 4, 2), (24, 20, 2), (48, 8, 1), (576, 96, 2), (12, 4, 1)]
+    for Q, P, layers in windings:
+        data = datamodel()
+        data.genwdg(Q=Q, P=P, m=3, w=-1, layers=layers)
+        t, S_b, Q_b, p_b = data.get_base_winding()
+        assert t > 1
+        assert Q_b * t == Q and p_b * t == P // 2
+        ref = full_reference(data)
+
+        for key in ["el", "mech"]:
+            nu, Ei, kw, phase = ref[key]
+            assert data.results["nu_" + key] == nu
+            # identical results, also the sign of the zero sequence harmonics
+            np.testing.assert_array_equal(data.results["kw_" + key], kw)
+            np.testing.assert_array_equal(data.results["phaseangle_" + key], phase)
+            np.testing.assert_array_equal(data.results["Ei_" + key], np.array(Ei))
+
+
+def test_no_base_winding():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    t, S_b, Q_b, p_b = data.get_base_winding()
+    assert t == 1 and Q_b == 12 and p_b == 5
+    nu, Ei, kw, phase = full_reference(data)["el"]
+    np.testing.assert_array_equal(data.results["kw_el"], kw)
+
+
+def test_no_relevant_harmonics():
+    # periodic layout (t = 2) without any winding factor above kw_min
+    S = [[[1, 7], [-1, -7]], [[3, 9], [-3, -9]], [[5, 11], [-5, -11]]]
+    ref = analyse.calc_kw(12, S, 1, 2, config["N_nu_el"], config)
+    ret = analyse.calc_kw(12, S, 1, 2, config["N_nu_el"], config, t=2)
+    assert ret[0] == ref[0] == []
+
+
+if __name__ == "__main__":
+    test_base_winding()
+    test_no_base_winding()
+    test_no_relevant_harmonics()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# testcase for the canonical form and hash of winding layouts
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import analyse
+from swat_em.datamodel import datamodel, project
+
+
+def transform(S, Q, shift=0, mirror=False, invert=False):
+    """rotates, mirrors and/or inverts a winding layout"""
+    S2 = []
+    for ph in S:
+        S2.append([])
+        for layer in ph:
+            S2[-1].append([])
+            for cs in layer:
+                slot = abs(cs) - 1
+                if mirror:
+                    slot = -slot
+                slot = (slot + shift) % Q + 1
+                sign = np.sign(cs) * (-1 if invert else 1)
+                S2[-1][-1].append(int(sign * slot))
+    return S2
+
+
+def test_canonical_layout():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    S = data.get_phases()
+    h = analyse.winding_hash(S, 12, 5)
+    c = analyse.canonical_layout(S, 12)
+    for S2 in [
+        transform(S, 12, shift=5),
+        transform(S, 12, mirror=True),
+        transform(S, 12, invert=True),
+        [S[1], S[2], S[0]],
+        transform([S[2], S[0], S[1]], 12, shift=7, mirror=True, invert=True),
+    ]:
+        np.testing.assert_array_equal(analyse.canonical_layout(S2, 12), c)
+        assert analyse.winding_hash(S2, 12, 5) == h
+
+    # different winding, different number of poles or turns
+    data2 = datamodel()
+    data2.genwdg(Q=12, P=10, m=3, w=1, layers=1)
+    assert data2.get_hash() != data.get_hash()
+    assert analyse.winding_hash(S, 12, 7) != h
+    assert analyse.winding_hash(S, 12, 5, turns=2) != h
+
+
+def test_project_skip_duplicates():
+    proj = project()
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    assert proj.add_model(data) == 0
+    data2 = datamodel()
+    data2.set_machinedata(Q=12, p=5, m=3)
+    data2.set_phases(transform(data.get_phases(), 12, shift=3), w=1)
+    assert proj.add_model(data2, skip_duplicates=True) == 0
+    assert proj.get_num_models() == 1
+    assert proj.add_model(data2) == 1
+
+
+if __name__ == "__main__":
+    test_canonical_layout()
+    test_project_skip_duplicates()
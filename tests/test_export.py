@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import sys
+import zipfile
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -11,6 +14,7 @@ from swat_em.wdggenerator import genwdg
 #  from swat_em.datamodel import datamodel
 from swat_em import datamodel
 from swat_em.config import config, get_phase_color
+from swat_em.report import export_xlsx
 
 
 def clean_up():
@@ -33,8 +37,50 @@ def test_xlsx_export():
     clean_up()
 
 
+def test_xlsx_export_models():
+    models = []
+    for Q, P in [(12, 10), (24, 22), (36, 4)]:
+        data = datamodel()
+        data.genwdg(Q=Q, P=P, m=3, w=1 if Q < 36 else 8, layers=2)
+        data.set_title("{}-{}".format(Q, P))
+        models.append(data)
+    # individual number of turns
+    U = [[1, 2, -11, -12], [5, 6, -7, -8]]
+    V = [[-3, -4, 5, 6], [9, 10, -11, -12]]
+    W = [[-7, -8, 9, 10], [1, 2, -3, -4]]
+    turns = [[[1, 2, 2, 1], [2, 1, 1, 2]]] * 3
+    data = datamodel()
+    data.set_machinedata(Q=12, p=1, m=3)
+    data.set_phases([U, V, W], turns=turns)
+    data.analyse_wdg()
+    models.append(data)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "export.xlsx")
+        export_xlsx(fname, models)
+        with zipfile.ZipFile(fname) as f:
+            workbook = f.read("xl/workbook.xml").decode()
+            styles = f.read("xl/styles.xml").decode()
+            sheet = f.read("xl/worksheets/sheet2.xml").decode()
+        names = re.findall(r'<sheet name="([^"]+)"', workbook)
+        assert names[0] == "summary"
+        assert len(names) == 1 + 4 * len(models)
+        assert names[1:5] == [
+            "1_layout",
+            "1_phasors",
+            "1_Winding_factor_el",
+            "1_Winding_factor_mech",
+        ]
+        # formats are shared: one per (color, alignment)
+        num_formats = int(re.search(r'<cellXfs count="(\d+)"', styles).group(1))
+        assert num_formats < 15
+        # all slots of the first winding are written
+        assert sheet.count('<c r="L3"') == 1
+
+
 if __name__ == "__main__":
     test_xlsx_export()
+    test_xlsx_export_models()
 
 
 #  import os
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# testcase for the geometry of the plots
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import geometry
+from swat_em.datamodel import datamodel
+
+
+def test_coil_paths():
+    Q = 24
+    data = datamodel()
+    data.genwdg(Q=Q, P=4, m=3, w=5, layers=2)
+    for phase in data.get_wdg_overhang():
+        x, y, connect = geometry.gen_coil_paths(phase, Q, h1=0.6, db1=0.1, Np1=21)
+        assert len(x) == len(y) == len(connect) == 43 * len(phase)
+        assert np.all(np.isfinite(x)) and np.all(x <= Q - 0.5)
+
+        # compare with the lines of the single coils
+        for k, coil in enumerate(phase):
+            xr, yr = geometry.gen_coil_lines(coil[1], h1=0.6, h2=0.5 + coil[1] / 6)
+            xr = np.array(xr) + (coil[0][0] if coil[2] > 0 else coil[0][1]) - 1
+            xr[xr > Q - 0.5] -= Q
+            i = slice(43 * k, 43 * (k + 1))
+            np.testing.assert_allclose(x[i], xr)
+            np.testing.assert_allclose(y[i], yr)
+            # no line between the coils or over the border
+            assert not connect[i][-1]
+            assert np.all(connect[i][:-1] == (np.abs(np.diff(xr)) < Q / 2))
+
+
+def test_tooth_rects():
+    x0, x1 = geometry.gen_tooth_rects(12, 0.5)
+    x, y, y_neg = geometry.gen_slot_filling(12, 0.5, 0.5)
+    np.testing.assert_allclose(x0, x[0::3])
+    np.testing.assert_allclose(x1, x[1::3])
+    assert np.all(np.isnan(x[2::3]))
+    np.testing.assert_allclose(y_neg[:2], [-0.5, -0.5])
+
+    x, y = geometry.gen_slot_lines(12, 0.5, 0.5)
+    np.testing.assert_allclose(x[:6], [-0.5, -0.5, -0.25, -0.25, -0.5, np.nan])
+    np.testing.assert_allclose(x[-6:], [11.25, 11.25, 11.5, 11.5, 11.25, np.nan])
+    np.testing.assert_allclose(y[6:12], [-0.5, 0.5, 0.5, -0.5, -0.5, np.nan])
+
+    # cached and read-only
+    assert geometry.gen_tooth_rects(12, 0.5)[0] is x0
+    assert not x0.flags.writeable
+
+
+def test_poles_linear():
+    Q, P, alpha_m, Qxmax, dy = 30, 4, 0.7, 12, 1.7
+    lines = geometry.gen_poles_linear(Q, P, alpha_m, Qxmax, dy)
+    for kpole, (x, y, connect) in enumerate(lines):
+        assert len(x) == 50 * P // 2
+        assert np.all((x >= 0) & (x <= Qxmax))
+        # position in the slots without rows
+        row = np.round((1.1 - y) / dy)
+        xs = x + row * Qxmax
+        ref = np.linspace(0, Q / P * alpha_m, 50) + (1 - alpha_m) * Q / P / 2
+        ref = np.concatenate([ref + 2 * Q / P * kp + kpole * Q / P for kp in range(2)])
+        np.testing.assert_allclose(xs, ref)
+        # lines are separated at the end of the magnets and rows
+        same_magnet = np.append(np.diff(xs), 1) < 0.5
+        same_row = np.append(np.diff(row), 1) == 0
+        np.testing.assert_array_equal(connect, same_magnet & same_row)
+
+
+def test_slot_rows():
+    x, y, connect = geometry.gen_slot_rows(30, 12, 0.8, 0.75, 0.2, 1.7)
+    assert len(x) == 300
+    assert np.sum(~connect) == 3
+    assert np.max(x) == 12 and np.min(y) == -2 * 1.7
+    xs, ys = geometry.gen_slot_positions([1, 12, 13, 30], 12, 1.7)
+    np.testing.assert_allclose(xs, [0.5, 11.5, 0.5, 5.5])
+    np.testing.assert_allclose(ys, [0, 0, -1.7, -3.4])
+
+
+def test_star():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    ei = data.results["Ei_el"][0]
+    dangle = np.angle(np.sum(ei[0]))
+    for vek in ei:
+        pts, angle = geometry.gen_star(vek, dangle)
+        assert pts[0] == 0
+        np.testing.assert_allclose(pts[-1], np.sum(vek) * np.exp(-1j * dangle))
+        np.testing.assert_allclose(np.diff(pts), vek * np.exp(-1j * dangle))
+        np.testing.assert_allclose(angle, np.angle(np.diff(pts), deg=True))
+    pts, angle = geometry.gen_star(ei[0], dangle)
+    assert abs(np.angle(pts[-1])) < 1e-9
+
+
+if __name__ == "__main__":
+    test_coil_paths()
+    test_tooth_rects()
+    test_poles_linear()
+    test_slot_rows()
+    test_star()
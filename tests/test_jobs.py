@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# testcase for the background job queue
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from swat_em import jobs
+from swat_em.datamodel import datamodel
+
+
+def test_stale_jobs():
+    queue = jobs.jobqueue()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def blocking(token):
+        started.set()
+        release.wait(5)
+        return "old"
+
+    token_old = queue.submit("model", blocking, callback=results.append)
+    started.wait(5)
+    queue.submit("model", lambda token: "skipped", callback=results.append)
+    queue.submit("model", lambda token: "new", callback=results.append)
+    assert token_old.cancelled
+    release.set()
+    queue.wait()
+    assert results == ["new"]
+
+    errors = []
+    queue.submit("model", lambda token: 1 / 0, error_callback=errors.append)
+    queue.wait()
+    assert isinstance(errors[0], ZeroDivisionError)
+    queue.shutdown(wait=True)
+
+
+def test_render_products():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    assert not jobs.has_render_products(data)
+    products = jobs.render_products(data)
+    # the job doesn't change the datamodel
+    assert not jobs.has_render_products(data)
+    assert jobs.store_render_products(data, products)
+    assert jobs.has_render_products(data)
+    assert products["report"] == data.get_text_report()
+    assert products["bc"]["t"] == data.get_periodicity_t()
+
+    data.set_title("new title")  # invalidates the text report
+    assert not jobs.has_render_products(data)
+    assert "new title" in data.get_text_report()
+
+    token = jobs.canceltoken(lambda: True)
+    assert jobs.render_products(data, token) is None
+
+
+def test_render_products_outdated():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    products = jobs.render_products(data)
+    data.genwdg(Q=24, P=4, m=3, w=5, layers=2)  # new results object
+    assert not jobs.store_render_products(data, products)
+    assert not jobs.has_render_products(data)
+    assert data.get_text_report() != products["report"]
+
+    # changes which keep the results object
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    products = jobs.render_products(jobs.rendersnapshot(data))
+    data.set_title("NEWTITLE")
+    data.set_coilspan(2)
+    assert not jobs.store_render_products(data, products)
+    assert "NEWTITLE" in data.get_text_report()
+    assert "1" not in data.results["wdg_overhang"]
+
+
+if __name__ == "__main__":
+    test_stale_jobs()
+    test_render_products()
+    test_render_products_outdated()
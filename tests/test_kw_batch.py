@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# testcase for the batch calculation of winding factors
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import analyse
+from swat_em.datamodel import datamodel
+
+
+def get_windings():
+    wdgs = []
+    for Q, P, layers, w in [
+        (12, 10, 2, 1),
+        (12, 10, 1, 1),
+        (36, 4, 2, 7),
+        (24, 22, 2, 1),
+        (9, 8, 2, 1),
+        (48, 8, 1, -1),
+    ]:
+        wdg = datamodel()
+        wdg.genwdg(Q=Q, P=P, m=3, w=w, layers=layers, analyse=False)
+        wdgs.append(wdg)
+    # 2 phases and individual number of turns
+    wdg = datamodel()
+    wdg.genwdg(Q=8, P=6, m=2, w=1, layers=2, analyse=False)
+    wdgs.append(wdg)
+    wdg = datamodel()
+    wdg.genwdg(Q=12, P=10, m=3, w=1, layers=2, turns=1, analyse=False)
+    wdg.set_turns([[[1, 2, 3, 4], [2, 2, 2, 2]] for k in range(3)])
+    wdgs.append(wdg)
+    return wdgs
+
+
+def test_kw_batch():
+    wdgs = get_windings()
+    nu = [1, 5, 7, 11]
+    kw = analyse.calc_kw_batch(wdgs, nu, signed=False)
+    assert kw.shape == (len(wdgs), len(nu), 3)
+    for k, wdg in enumerate(wdgs):
+        m = wdg.get_num_phases()
+        for j, n in enumerate(nu):
+            ref = np.abs(wdg.get_windingfactor_el_by_nu(n))
+            np.testing.assert_allclose(kw[k, j, :m], ref, atol=1e-12)
+        assert np.all(np.isnan(kw[k, :, m:]))
+
+    # chunked calculation gives the same result
+    layouts = analyse.compile_layouts(wdgs)
+    kw2 = analyse.calc_kw_batch(layouts, nu, signed=False, max_elements=100)
+    np.testing.assert_array_equal(kw, kw2)
+
+
+def test_kw_batch_signed():
+    wdg = datamodel()
+    wdg.genwdg(Q=12, P=10, m=3, w=1, layers=2, analyse=False)
+    kw = analyse.calc_kw_batch([wdg], [1, 5, 7])
+    for j, n in enumerate([1, 5, 7]):
+        np.testing.assert_allclose(kw[0, j], wdg.get_windingfactor_el_by_nu(n))
+
+    # zero sequence harmonics: same magnitude, the sign is always negative
+    wdg.genwdg(Q=12, P=4, m=3, w=-1, layers=1, analyse=False)
+    nu = [1, 3, 5, 9]
+    kw = analyse.calc_kw_batch([wdg], nu)
+    for j, n in enumerate(nu):
+        ref = np.array(wdg.get_windingfactor_el_by_nu(n))
+        if n % 3 == 0:
+            np.testing.assert_allclose(kw[0, j], -np.abs(ref))
+        else:
+            np.testing.assert_allclose(kw[0, j], ref)
+
+
+if __name__ == "__main__":
+    test_kw_batch()
+    test_kw_batch_signed()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# testcase for the optimization of individual number of turns
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from swat_em.datamodel import datamodel
+from swat_em import analyse
+import numpy as np
+
+
+def test_phasor_matrix():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2, turns=3)
+    S = data.get_phases(flatten=True)
+    for nu in [1, 5, 7]:
+        A = analyse.calc_phasor_matrix(12, S[0], 5, [nu])
+        ei, kw = analyse.calc_star(12, [np.array(S[0])], 3, 5, nu)
+        np.testing.assert_allclose(3 * A[0], ei[0])
+
+
+def test_optimize_turns():
+    data = datamodel()
+    data.genwdg(Q=24, P=22, m=3, w=1, layers=2, turns=10)
+    kw5_old = np.abs(data.get_windingfactor_el_by_nu(5))
+    kw1_old = data.get_fundamental_windingfactor()
+
+    turns = data.optimize_turns(nu=[5, 7], kw1_min=0.9)
+
+    kw5 = np.abs(data.get_windingfactor_el_by_nu(5))
+    kw1 = data.get_fundamental_windingfactor()
+    assert np.all(kw5 < kw5_old)
+    assert np.all(np.array(kw1) >= 0.9)
+    assert kw1[0] <= kw1_old[0]
+
+    for km, phase in enumerate(data.get_phases()):
+        pos, neg = 0, 0
+        for kl, layer in enumerate(phase):
+            for j, cs in enumerate(layer):
+                t = turns[km][kl][j]
+                assert isinstance(t, int)
+                assert t >= 1
+                if cs > 0:
+                    pos += t
+                else:
+                    neg += t
+        assert pos == neg == 80  # total number of turns is kept
+
+
+def test_optimize_turns_keeps_kw1():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2, turns=1.4)
+    kw1_old = data.get_fundamental_windingfactor()
+    data.optimize_turns(nu=[5, 7], mmf=True)
+    kw1 = data.get_fundamental_windingfactor()
+    assert np.all(np.array(kw1) >= np.array(kw1_old) - 1e-6)
+
+
+if __name__ == "__main__":
+    test_phasor_matrix()
+    test_optimize_turns()
+    test_optimize_turns_keeps_kw1()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# testcase for the assignment based winding overhang
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import numpy as np
+from swat_em import analyse
+from swat_em.datamodel import datamodel
+
+
+def test_linear_sum_assignment():
+    rng = np.random.default_rng(0)
+    for n in range(1, 7):
+        for _ in range(10):
+            C = rng.integers(0, 10, (n, n))
+            row, col = analyse._linear_sum_assignment(C)
+            assert sorted(col) == list(range(n))
+            best = min(
+                sum(C[i, perm[i]] for i in range(n))
+                for perm in itertools.permutations(range(n))
+            )
+            assert C[row, col].sum() == best
+
+
+def test_dist_matrix():
+    ovh = analyse.create_wdg_overhang([], 12, 1)
+    Sp = np.array([1, 4, 7, 12])
+    Sn = np.array([2, 6, 10, 12])
+    diff, direct = ovh.get_dist_matrix(Sp, Sn)
+    for i in range(len(Sp)):
+        for j in range(len(Sn)):
+            assert (diff[i, j], direct[i, j]) == ovh.diff_and_direct(Sp[i], Sn[j])
+
+
+def test_overhang():
+    data = datamodel()
+    data.genwdg(Q=36, P=4, m=3, w=7, layers=2)
+    head = data.get_wdg_overhang()
+    for ph in head:
+        assert len(ph) == 12
+        for con in ph:
+            assert con[1] == 7
+    # tooth coil winding
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    head = data.get_wdg_overhang(optimize_overhang=True)
+    assert all(con[1] == 1 for ph in head for con in ph)
+
+
+def test_multi_layer():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    S = [[list(ph[0]), list(ph[1])] * 2 for ph in data.get_phases()]
+    data.set_phases(S)
+    assert data.get_num_layers() == 4
+    layers, _, _ = data.get_layers()
+    assert layers.shape == (4, 12)
+    head = data.get_wdg_overhang()
+    for ph in head:
+        assert len(ph) == 8
+        assert {con[3] for con in ph} == {(0, 1), (1, 0), (2, 3), (3, 2)}
+    assert "Layer_4" in data.get_text_report()
+
+
+def test_overhang_cache():
+    data = datamodel()
+    data.genwdg(Q=12, P=2, m=3, w=5, layers=2)
+    head = data.get_wdg_overhang()
+    assert data.get_wdg_overhang() is head
+    head_opt = data.get_wdg_overhang(optimize_overhang=True)
+    assert head_opt is not head
+    assert data.get_wdg_overhang(optimize_overhang=True) is head_opt
+
+    data.set_coilspan(6)
+    head2 = data.get_wdg_overhang()
+    assert head2 is not head
+
+    data.set_phases(data.get_phases(), w=5)
+    assert data.get_wdg_overhang() is not head2
+
+
+if __name__ == "__main__":
+    test_linear_sum_assignment()
+    test_dist_matrix()
+    test_overhang()
+    test_multi_layer()
+    test_overhang_cache()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# testcase for the grid index of scatter plots
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em.plots import pointindex
+
+
+def test_pointindex():
+    rng = np.random.RandomState(0)
+    x = rng.rand(5000) * 10
+    y = rng.rand(5000)
+    x[:10] = 5.0  # identical points
+    y[:10] = 0.5
+    x[10] = np.nan
+    index = pointindex(x, y)
+
+    idx = index.query_rect(2.0, 4.0, 0.1, 0.3)
+    ref = np.flatnonzero((x >= 2) & (x <= 4) & (y >= 0.1) & (y <= 0.3))
+    assert set(idx) == set(ref)
+
+    hits = index.pick(5.0, 0.5, 0.05, 0.005)
+    assert set(range(10)) <= set(hits)
+    dist = ((x[hits] - 5.0) / 0.05) ** 2 + ((y[hits] - 0.5) / 0.005) ** 2
+    assert np.all(np.diff(dist) >= 0) and np.all(dist <= 1)
+    assert len(index.pick(20.0, 0.5, 0.1, 0.1)) == 0
+
+    # all points at the same position
+    index = pointindex(np.ones(5), np.ones(5))
+    assert set(index.pick(1.0, 1.0, 0.1, 0.1)) == set(range(5))
+
+
+if __name__ == "__main__":
+    test_pointindex()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import struct
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from swat_em.datamodel import datamodel
+from swat_em import render
+
+
+def get_wdg():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    return data
+
+
+def test_png():
+    data = get_wdg()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in render.FIGURES:
+            fname = os.path.join(tmpdir, name + ".png")
+            render.save_figure(data, name, fname, res=[400, 300])
+            with open(fname, "rb") as f:
+                png = f.read()
+            assert png[:8] == b"\x89PNG\r\n\x1a\n"
+            assert png[12:16] == b"IHDR"
+            assert struct.unpack(">II", png[16:24]) == (400, 300)
+
+
+def test_svg():
+    data = get_wdg()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in render.FIGURES:
+            fname = os.path.join(tmpdir, name + ".svg")
+            render.save_figure(data, name, fname)
+            root = ET.parse(fname).getroot()
+            assert root.tag.endswith("svg")
+            assert len(root) > 1
+
+
+def test_export_figures():
+    data = get_wdg()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        figures = [
+            (name, os.path.join(tmpdir, "{}{}.png".format(name, k)), {})
+            for k in range(2)
+            for name in render.FIGURES
+        ]
+        figures.append(
+            ("windingfactor", os.path.join(tmpdir, "wf.svg"), {"mechanical": True})
+        )
+        render.export_figures(data, figures, workers=4)
+        for name, fname, kwargs in figures:
+            assert os.path.getsize(fname) > 0
+
+
+def test_no_qt():
+    """
+    The figure export must not import Qt
+    """
+    code = (
+        "import sys\n"
+        "from swat_em.datamodel import datamodel\n"
+        "from swat_em import render\n"
+        "mods = [m for m in sys.modules if m.split('.')[0] in "
+        "('PyQt5', 'PySide2', 'qtpy', 'pyqtgraph')]\n"
+        "assert not mods, mods\n"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+
+if __name__ == "__main__":
+    test_png()
+    test_svg()
+    test_export_figures()
+    test_no_qt()
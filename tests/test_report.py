@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import shutil
 import sys
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import swat_em
-from swat_em.datamodel import datamodel
-from swat_em.report import HtmlReport
+from swat_em.datamodel import datamodel, project
+from swat_em.report import HtmlReport, template
 
 
 def clean_up():
@@ -51,6 +53,39 @@ def test_text_report():
     clean_up()
 
 
+def test_template():
+    tmpl = template("<h1>{{ TITLE }}</h1>\n<p>{{NOTES}} {{ unknown }}</p>{{ TITLE }}")
+    assert tmpl.names == ["TITLE", "NOTES", "unknown", "TITLE"]
+    for k in range(2):  # the compiled template is reused
+        f = io.StringIO()
+        tmpl.render(f, {"TITLE": "T" + str(k), "NOTES": "N"})
+        txt = "<h1>T{0}</h1>\n<p>N {{{{ unknown }}}}</p>T{0}".format(k)
+        assert f.getvalue() == txt
+
+
+def test_export_reports():
+    proj = project()
+    for Q, P in [(12, 10), (12, 14), (9, 8)]:
+        data = datamodel()
+        data.genwdg(Q, P, m=3, w=1, layers=2, turns=1)
+        data.set_title("{}-{} machine".format(Q, P))
+        proj.add_model(data)
+    proj.analyse_all_models()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = proj.export_reports(tmpdir, formats=["html", "txt"], workers=2)
+        assert os.path.isfile(index)
+        with open(index) as f:
+            txt = f.read()
+        for k, title in enumerate(proj.get_titles()):
+            assert title in txt
+            name = "{}_{}".format(k + 1, title.replace(" ", "_"))
+            assert os.path.isfile(os.path.join(tmpdir, name + ".html"))
+            assert os.path.isfile(os.path.join(tmpdir, name + ".txt"))
+            assert name + ".html" in txt
+
+
 if __name__ == "__main__":
     test_html_report()
     test_text_report()
+    test_template()
+    test_export_reports()
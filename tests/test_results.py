@@ -6,7 +6,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import numpy as np
-from swat_em.datamodel import datamodel
+from swat_em.datamodel import datamodel, resultdata
 
 
 def test_is_symmetric():
@@ -53,6 +53,25 @@ def test_lcmQP():
     assert wdg.get_lcmQP() == 12
 
 
+def test_resultdata():
+    wdg = datamodel()
+    wdg.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    nu, kw = wdg.get_windingfactor_el()
+    assert kw.shape == (len(nu), 3)
+    assert isinstance(wdg.results["nu_el"], list)
+    assert wdg.results["Ei_el"].shape == (len(nu), 3, 8)
+    assert "MMK" in wdg.results
+    assert "wdg_overhang" not in wdg.results
+    assert wdg == wdg.copy()
+
+    res = resultdata(single_precision=True)
+    res["kw_el"] = kw
+    res["Ei_el"] = [[np.ones(2), np.ones(1)]]
+    assert res["kw_el"].dtype == np.float32
+    assert [len(ei) for ei in res["Ei_el"][0]] == [2, 1]
+    assert res["Ei_el"][0][0].dtype == np.complex64
+
+
 if __name__ == "__main__":
     test_is_symmetric()
     test_fundamental_winding_factor()
@@ -61,3 +80,4 @@ if __name__ == "__main__":
     test_periodicity()
     test_parallel_connections()
     test_lcmQP()
+    test_resultdata()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# testcase for the local analysis server
+
+import os
+import sys
+import json
+import asyncio
+import http.client
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import aio
+from swat_em import server
+from swat_em import sweep
+from swat_em import wdggenerator
+from swat_em.datamodel import datamodel
+
+
+def request(conn, method, path, body=None, headers=None):
+    data = None if body is None else json.dumps(body)
+    if headers is None:
+        headers = {"Content-Type": "application/json"}
+    conn.request(method, path, body=data, headers=headers)
+    res = conn.getresponse()
+    text = res.read().decode()
+    if res.getheader("Content-Type", "").startswith("application/json"):
+        return res.status, json.loads(text)
+    return res.status, text
+
+
+def run_client(client, routes=None, **kwargs):
+    async def run():
+        srv = server.server(workers=2, **kwargs)
+        srv.routes.update(routes or {})
+        host, port = await srv.start("127.0.0.1", 0)
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, client, conn)
+            conn.close()
+        finally:
+            await srv.close()
+
+    asyncio.run(run())
+
+
+def test_analyse():
+    spec = {"Q": 12, "P": 10, "m": 3, "layers": 2, "w": 1}
+
+    def client(conn):
+        status, ret = request(conn, "GET", "/health")
+        assert status == 200 and ret["status"] == "ok"
+
+        ref = datamodel()
+        ref.genwdg(**spec)
+        for k in range(2):
+            # the same connection is used (keep-alive)
+            status, ret = request(conn, "POST", "/analyse", spec)
+            assert status == 200
+            np.testing.assert_allclose(
+                ret["kw1"], ref.get_fundamental_windingfactor()
+            )
+            assert ret["phases"] == ref.get_phases()
+            assert ret["q"] == "2/5"
+
+        batch = {
+            "windings": [spec, {"Q": 13, "P": 10, "m": 3, "layers": 2}],
+            "results": ["kw1", "sigma_d"],
+        }
+        status, ret = request(conn, "POST", "/analyse", batch)
+        assert status == 200
+        assert sorted(ret["windings"][0]) == ["kw1", "sigma_d"]
+        assert "error" in ret["windings"][1]
+
+        status, ret = request(conn, "POST", "/genwdg", spec)
+        assert ret["phases"] == wdggenerator.genwdg(12, 10, 3, 1, 2)["phases"]
+
+        status, ret = request(conn, "POST", "/report", spec)
+        assert status == 200 and "Number of slots" in ret["report"]
+
+        assert request(conn, "POST", "/analyse", {"Q": 12})[0] == 400
+        assert request(conn, "POST", "/unknown", spec)[0] == 404
+        assert request(conn, "GET", "/analyse")[0] == 405
+
+        status, text = request(conn, "GET", "/metrics")
+        assert status == 200
+        assert 'swat_em_cache_total{result="hit"} 2' in text
+        assert (
+            'swat_em_request_duration_seconds_count{endpoint="/analyse"} 5' in text
+        )
+
+    run_client(client)
+
+
+def test_disk_cache(tmp_path):
+    spec = {"Q": 24, "P": 4, "m": 3, "layers": 2, "w": 5}
+    results = []
+
+    def client(conn):
+        status, ret = request(conn, "POST", "/analyse", spec)
+        assert status == 200
+        results.append(ret)
+        status, text = request(conn, "GET", "/metrics")
+        results.append(text)
+
+    run_client(client, cache_dir=str(tmp_path))
+    run_client(client, cache_dir=str(tmp_path))
+    assert results[0] == results[2]
+    assert 'swat_em_cache_total{result="miss"} 1' in results[1]
+    assert 'swat_em_cache_total{result="disk_hit"} 1' in results[3]
+
+
+def test_cache_version():
+    key = ("analyse", aio.request_key({"Q": 12, "P": 10, "m": 3, "layers": 2}))
+    digest = server.resultcache.digest(key)
+    version, cache_version = server.__version__, server.CACHE_VERSION
+    try:
+        server.__version__ = "0.0.0"
+        assert server.resultcache.digest(key) != digest
+        server.__version__ = version
+        server.CACHE_VERSION += 1
+        assert server.resultcache.digest(key) != digest
+    finally:
+        server.__version__, server.CACHE_VERSION = version, cache_version
+
+
+def test_sweep():
+    body = {"Qrange": list(range(6, 25, 3)), "Prange": [2, 4, 8], "m": 3}
+    body["layers"] = [1, 2]
+    ret = []
+
+    def client(conn):
+        status, text = request(conn, "POST", "/sweep", dict(body, chunksize=4))
+        assert status == 200
+        ret.extend(json.loads(line) for line in text.splitlines())
+
+    run_client(client)
+    ref = list(sweep.iter_combinations(range(6, 25, 3), [2, 4, 8], 3, [1, 2]))
+    assert [row["hash"] for row in ret] == [row["hash"] for row in ref]
+    assert ret[0]["layout"] == ref[0]["layout"].tolist()
+
+
+def test_sweep_errors():
+    body = {"Qrange": [6, 9], "Prange": [2, 4], "m": 3, "layers": [1, 2]}
+
+    async def failing(request):
+        async def lines():
+            yield "{}\n"
+            raise RuntimeError("failed")
+
+        return lines()
+
+    def client(conn):
+        # invalid arguments are reported before the response is streamed
+        for key, value in [
+            ("w_policy", "none"),
+            ("w_policy", 0),
+            ("chunksize", 0),
+            ("chunksize", "4"),
+            ("Qrange", 12),
+            ("layers", [1.5]),
+        ]:
+            status, ret = request(conn, "POST", "/sweep", dict(body, **{key: value}))
+            assert status == 400 and key in ret["error"]
+
+        # errors while streaming close the connection
+        try:
+            request(conn, "POST", "/fail", {})
+        except http.client.HTTPException:
+            pass
+        else:
+            assert False
+        conn.close()
+        status, text = request(conn, "GET", "/metrics")
+        assert 'swat_em_requests_total{endpoint="/fail",status="200"} 1' in text
+
+    run_client(client, routes={"/fail": ("POST", failing)})
+
+
+def test_report_files(tmp_path):
+    spec = {"Q": 12, "P": 10, "m": 3, "layers": 2, "w": 1}
+    outdir = tmp_path / "reports"
+    victim = tmp_path / "victim.html"
+
+    def client_disabled(conn):
+        body = dict(spec, fname=str(victim))
+        # simple cross-origin request of a web page
+        headers = {"Content-Type": "text/plain", "Origin": "http://evil.example"}
+        assert request(conn, "POST", "/report", body, headers)[0] == 403
+        headers = {"Content-Type": "text/plain"}
+        assert request(conn, "POST", "/report", body, headers)[0] == 415
+        # report files are disabled without output directory
+        assert request(conn, "POST", "/report", body)[0] == 403
+        headers = {"Content-Type": "application/json"}
+        headers["Origin"] = "http://{}:{}".format(conn.host, conn.port)
+        status, ret = request(conn, "POST", "/report", spec, headers)
+        assert status == 200 and "Number of slots" in ret["report"]
+
+    def client_output_dir(conn):
+        for fname in [str(victim), "../victim.html", "sub/../../victim.html"]:
+            status, ret = request(conn, "POST", "/report", dict(spec, fname=fname))
+            assert status == 403
+        status, ret = request(conn, "POST", "/report", dict(spec, fname="wdg.html"))
+        assert status == 200 and ret["fname"] == "wdg.html"
+
+    run_client(client_disabled)
+    run_client(client_output_dir, output_dir=str(outdir))
+    assert not victim.exists()
+    assert (outdir / "wdg.html").exists()
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    test_analyse()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_disk_cache(pathlib.Path(tmpdir))
+    test_cache_version()
+    test_sweep()
+    test_sweep_errors()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_report_files(pathlib.Path(tmpdir))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# testcase for the transport of results by shared memory
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import sharedresults
+from swat_em.datamodel import datamodel, project
+
+
+def get_models():
+    models = []
+    for Q, P, w in [(12, 10, 1), (36, 4, 8), (48, 8, 5), (15, 4, -1)]:
+        wdg = datamodel()
+        wdg.genwdg(Q=Q, P=P, m=3, w=w, layers=2)
+        models.append(wdg)
+    return models
+
+
+def assert_results_equal(r1, r2):
+    for key in ["kw_el", "kw_mech", "phaseangle_el", "nu_el", "nu_mech", "t", "a"]:
+        np.testing.assert_array_equal(r1[key], r2[key])
+    for ei1, ei2 in zip(r1["Ei_el"], r2["Ei_el"]):
+        for e1, e2 in zip(ei1, ei2):
+            np.testing.assert_array_equal(e1, e2)
+    for key in ["MMK", "HA", "phi"]:
+        np.testing.assert_array_equal(r1["MMK"][key], r2["MMK"][key])
+    assert r1["basic_char"]["q"] == r2["basic_char"]["q"]
+
+
+def test_export_import():
+    for wdg in get_models():
+        desc = sharedresults.export_results(wdg.results)
+        # only the descriptor is transported
+        assert desc["size"] > 0
+        results = sharedresults.import_results(desc)
+        assert_results_equal(results, wdg.results)
+        assert not results["kw_el"].flags.writeable
+
+
+def test_analyse_all_models():
+    ref = project()
+    par = project()
+    for wdg in get_models():
+        ref.add_model(wdg)
+        par.add_model(wdg.copy())
+    ref.analyse_all_models()
+    par.analyse_all_models(workers=2)
+    for m1, m2 in zip(ref.models, par.models):
+        assert_results_equal(m1.results, m2.results)
+        bc, bc_str = m2.get_basic_characteristics()
+        assert bc_str == m1.get_basic_characteristics()[1]
+
+
+if __name__ == "__main__":
+    test_export_import()
+    test_analyse_all_models()
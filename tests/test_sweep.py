@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# testcase for the result store of winding sweeps
+
+import os
+import json
+import tempfile
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from swat_em import sweep
+from swat_em.datamodel import datamodel
+
+
+def test_resultstore(tmp_path):
+    path = str(tmp_path / "store")
+    store = sweep.sweep(path, [12, 18, 24], [2, 4, 8, 10], 3, [1, 2])
+    assert len(store) > 0
+    assert store["kw1"].dtype == np.float64
+    assert np.all(store["kw1"] > 0.01)
+
+    # reopen without recomputation
+    store2 = sweep.resultstore(path)
+    assert len(store2) == len(store)
+    np.testing.assert_array_equal(store2["sigma_d"], store["sigma_d"])
+
+    idx = int(np.where((store2["Q"] == 12) & (store2["P"] == 10))[0][0])
+    wdg = store2.get_datamodel(idx)
+    ref = datamodel()
+    ref.genwdg(Q=12, P=10, m=3, layers=int(store2["layers"][idx]), w=1)
+    np.testing.assert_allclose(
+        wdg.get_fundamental_windingfactor(), ref.get_fundamental_windingfactor()
+    )
+    assert store2.get_row(idx)["kw1"] == store2["kw1"][idx]
+
+
+def test_parallel_sweep(tmp_path):
+    s1 = sweep.sweep(str(tmp_path / "s1"), range(6, 25, 3), [2, 4, 8], 3, [1, 2])
+    s2 = sweep.sweep(
+        str(tmp_path / "s2"),
+        range(6, 25, 3),
+        [2, 4, 8],
+        3,
+        [1, 2],
+        workers=2,
+        chunksize=4,
+    )
+    for key in s1.keys():
+        np.testing.assert_array_equal(s1[key], s2[key])
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / "store")
+    store = sweep.resultstore(path, mode="a")
+    wdg = datamodel()
+    wdg.genwdg(Q=12, P=10, m=3, w=1, layers=2)
+    store.append([sweep.get_row(wdg)])
+    store = sweep.resultstore(path, mode="a")
+    store.append([sweep.get_row(wdg)])
+    assert len(sweep.resultstore(path)) == 2
+    np.testing.assert_array_equal(store.get_layout(1), wdg.get_layers()[0])
+
+
+def test_query(tmp_path):
+    path = str(tmp_path / "s")
+    store = sweep.sweep(path, range(6, 40, 3), range(2, 20, 2), 3, [1, 2])
+    rows = store.query("kw1 > 0.93 & sigma_d < 0.05 & r1 >= 4")
+    ref = (store["kw1"] > 0.93) & (store["sigma_d"] < 0.05) & (store["r1"] >= 4)
+    np.testing.assert_array_equal(rows, np.where(ref)[0])
+
+    rows = store.query("(Q == 12 | Q == 24) and not layers == 1")
+    ref = ((store["Q"] == 12) | (store["Q"] == 24)) & ~(store["layers"] == 1)
+    np.testing.assert_array_equal(rows, np.where(ref)[0])
+
+    rows = store.query("0.5 >= q")
+    np.testing.assert_array_equal(rows, np.where(store["q"] <= 0.5)[0])
+
+    # index is saved and reused
+    store2 = sweep.resultstore(path)
+    np.testing.assert_array_equal(store2.query("kw1 != 1"), store.query("~kw1 == 1"))
+
+
+def test_pareto(tmp_path):
+    path = str(tmp_path / "s")
+    store = sweep.sweep(path, range(6, 40, 3), range(2, 20, 2), 3, [1, 2])
+    front = store.pareto({"kw1": "max", "sigma_d": "min"})
+    X = np.column_stack([-store["kw1"], store["sigma_d"]])
+    ref = [
+        i
+        for i in range(len(X))
+        if not np.any(np.all(X <= X[i], axis=1) & np.any(X < X[i], axis=1))
+    ]
+    np.testing.assert_array_equal(front, ref)
+
+    rows = store.query("layers == 1")
+    front = store.pareto([("kw1", "max"), ("sigma_d", "min")], rows=rows)
+    assert set(front) <= set(rows)
+
+
+def test_skip_duplicates(tmp_path):
+    s1 = sweep.sweep(str(tmp_path / "s1"), [12], [2, 10, 14], 3, [1, 2])
+    s2 = sweep.sweep(
+        str(tmp_path / "s2"), [12], [2, 10, 14], 3, [1, 2], skip_duplicates=False
+    )
+    assert len(s1) <= len(s2)
+    assert len(set(s1["hash"].tolist())) == len(s1)
+    assert set(s1["hash"].tolist()) == set(s2["hash"].tolist())
+
+
+def test_iter_combinations(tmp_path):
+    store = sweep.sweep(str(tmp_path / "s"), range(6, 25, 3), [2, 4, 8], 3, [1, 2])
+    rows = sweep.iter_combinations(range(6, 25, 3), [2, 4, 8], 3, [1, 2])
+    assert not isinstance(rows, list)
+    table = sweep.to_table(rows, layouts=True)
+    assert len(table["Q"]) == len(store)
+    for key in store.keys():
+        if key in table:
+            np.testing.assert_array_equal(table[key], store[key])
+    np.testing.assert_array_equal(table["layout"][3], store.get_layout(3))
+
+    rows = sweep.iter_combinations(
+        range(6, 40, 3), range(2, 20, 2), 3, [2], w_policy="toothcoil"
+    )
+    assert all(row["w"] == 1 for row in rows)
+
+
+def test_iter_combinations_break():
+    # the generator can be closed before the sweep is finished
+    rows = sweep.iter_combinations(
+        range(6, 300, 3), range(2, 60, 2), 3, [1, 2], workers=2, chunksize=4
+    )
+    first = [row for row, k in zip(rows, range(5))]
+    rows.close()
+    assert len(first) == 5
+
+
+def test_iter_combinations_empty():
+    progress = []
+    rows = sweep.iter_combinations(
+        [], [2, 4], 3, [1, 2], workers=1, callback=progress.append
+    )
+    assert list(rows) == []
+    assert progress == [100.0]
+
+
+def test_to_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = sweep.sweep(
+            os.path.join(tmpdir, "s"), range(6, 25, 3), [2, 4, 8], 3, [1, 2]
+        )
+        rows = list(
+            sweep.iter_combinations(range(6, 25, 3), [2, 4, 8], 3, [1, 2], workers=2)
+        )
+        nu = [1, 5, 7]
+        for ext in [".csv", ".jsonl", ".npz"]:
+            fname = os.path.join(tmpdir, "rows" + ext)
+            sweep.to_file(iter(rows), fname, nu=nu, chunksize=7)
+            store.to_file(os.path.join(tmpdir, "store" + ext), nu=nu, chunksize=7)
+
+        npz = np.load(os.path.join(tmpdir, "store.npz"))
+        assert len(npz["Q"]) == len(store)
+        np.testing.assert_array_equal(npz["hash"], store["hash"])
+        np.testing.assert_allclose(npz["q"], store["q"])
+        np.testing.assert_allclose(npz["kw_nu1"], store["kw1"])
+        npz2 = np.load(os.path.join(tmpdir, "rows.npz"))
+        np.testing.assert_allclose(np.sort(npz2["kw_nu5"]), np.sort(npz["kw_nu5"]))
+        npz.close()
+        npz2.close()
+
+        with open(os.path.join(tmpdir, "store.csv")) as f:
+            lines = f.read().splitlines()
+        header = sweep.EXPORT_COLUMNS + ["kw_nu1", "kw_nu5", "kw_nu7"]
+        assert lines[0].split(",") == header
+        assert len(lines) == len(store) + 1
+        with open(os.path.join(tmpdir, "rows.jsonl")) as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == len(rows)
+        assert lines[0]["kw1"] == rows[0]["kw1"]
+
+
+def test_to_file_turns():
+    # winding factors of windings with individual number of turns
+    models = []
+    for Q, P in [(12, 10), (24, 4)]:
+        wdg = datamodel()
+        wdg.genwdg(Q=Q, P=P, m=3, layers=2, w=-1)
+        models.append(wdg)
+    S = models[1].get_phases()
+    turns = [[[1 + k % 3 for k in range(len(l))] for l in ph] for ph in S]
+    models[1].set_turns(turns)
+    models[1].analyse_wdg()
+
+    nu = [1, 5, 7]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "models.npz")
+        sweep.to_file(sweep.iter_models(models), fname, nu=nu)
+        with np.load(fname) as npz:
+            for k, wdg in enumerate(models):
+                for n in nu:
+                    kw = abs(wdg.get_windingfactor_el_by_nu(n)[0])
+                    np.testing.assert_allclose(npz["kw_nu" + str(n)][k], kw)
+
+
+if __name__ == "__main__":
+    test_iter_combinations_break()
+    test_iter_combinations_empty()
+    test_to_file()
+    test_to_file_turns()
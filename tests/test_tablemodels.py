@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# testcase for the table models of the GUI
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from qtpy import QtCore
+from swat_em import tablemodels
+from swat_em.datamodel import datamodel
+
+
+def test_columntablemodel():
+    columns = {"idx": np.arange(5), "kw1": np.array([0.5, 0.9, 0.1, 0.9, 0.7])}
+    model = tablemodels.columntablemodel(["idx", "kw1"], columns)
+    assert model.rowCount() == 5 and model.columnCount() == 2
+    assert model.headerData(1, QtCore.Qt.Horizontal) == "kw1"
+
+    model.sort(1, QtCore.Qt.AscendingOrder)
+    rows = [model.source_row(r) for r in range(5)]
+    assert list(columns["kw1"][rows]) == sorted(columns["kw1"])
+    for r in range(5):
+        assert model.view_row(model.source_row(r)) == r
+    assert model.data(model.index(0, 0)).strip() == "2"
+
+    # the sort order is kept for new data
+    model.set_data(["idx", "kw1"], {"idx": np.arange(2), "kw1": np.array([1, 0])})
+    assert model.source_row(0) == 1
+
+
+def test_layouttablemodel():
+    data = datamodel()
+    data.genwdg(Q=12, P=10, m=3, w=1, layers=2, turns=3)
+    model = tablemodels.layouttablemodel(editable=True)
+    model.set_winding(data)
+    l, ls, lcol = data.get_layers()
+    assert model.rowCount() == 2 and model.columnCount() == 12
+    for k1 in range(2):
+        for k2 in range(12):
+            index = model.index(k1, k2)
+            assert model.data(index) == ls[k1, k2]
+            col = model.data(index, QtCore.Qt.BackgroundRole)
+            assert col.name().upper() == lcol[k1, k2].upper()
+
+    turns = tablemodels.turnstablemodel(model)
+    turns.set_winding(data)
+    assert np.all(turns.get_turns()[l != 0] == 3)
+
+    model.setData(model.index(0, 0), "-3")
+    assert model.get_layout()[0, 0] == -3
+    model.setData(model.index(0, 1), "abc")
+    assert model.get_layout()[0, 1] == 0
+
+
+if __name__ == "__main__":
+    test_columntablemodel()
+    test_layouttablemodel()